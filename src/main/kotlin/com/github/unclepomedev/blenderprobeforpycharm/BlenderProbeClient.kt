@@ -0,0 +1,252 @@
+package com.github.unclepomedev.blenderprobeforpycharm
+
+import com.google.gson.JsonObject
+import com.google.gson.JsonParser
+import java.io.BufferedOutputStream
+import java.io.ByteArrayOutputStream
+import java.io.Closeable
+import java.io.DataInputStream
+import java.io.IOException
+import java.io.InputStream
+import java.io.OutputStream
+import java.net.InetSocketAddress
+import java.net.Socket
+import java.net.StandardProtocolFamily
+import java.net.UnixDomainSocketAddress
+import java.nio.ByteBuffer
+import java.nio.channels.SocketChannel
+import java.nio.charset.StandardCharsets
+import java.util.concurrent.CompletableFuture
+import java.util.concurrent.ConcurrentHashMap
+import java.util.concurrent.atomic.AtomicLong
+import kotlin.concurrent.thread
+
+/**
+ * Long-lived, multiplexed connection to the in-Blender probe server.
+ * Keeps one socket open to the probe's Unix domain socket (Linux) or TCP port and tags
+ * every command with a request id, so several commands can be in flight at once and each
+ * reply is routed back to its caller.
+ */
+object BlenderProbeClient {
+    internal const val HEADER_SIZE = 64
+    private const val HOST = "127.0.0.1"
+    private const val CONNECT_TIMEOUT_MS = 3_000
+
+    private val nextId = AtomicLong(1)
+    private val lock = Any()
+    private var connection: Connection? = null
+
+    /**
+     * A completion record together with the binary body of its frame, if it had one
+     * (e.g. the raw array returned by `export_array`).
+     */
+    class Reply(val record: JsonObject, val body: ByteArray?)
+
+    /**
+     * Sends a command to the probe server over the shared connection.
+     *
+     * @param command The command object, e.g. `{"action": "ping"}`. An `id` is added to a copy of it.
+     * @return A future completed with the command's completion record (`status`, `duration_ms`,
+     *   `error`, `traceback`, `output`, `result`) once Blender's main thread has run it, or
+     *   completed exceptionally if Blender is not running or the connection drops first.
+     */
+    fun send(command: JsonObject): CompletableFuture<JsonObject> =
+        sendForReply(command).thenApply { it.record }
+
+    /**
+     * Like [send], but also returns the binary body of the reply. Use it for commands that
+     * return bulk data, such as `export_array`, whose `result` describes the body's dtype and shape.
+     */
+    fun sendForReply(command: JsonObject): CompletableFuture<Reply> {
+        val endpoint = currentEndpoint()
+            ?: return CompletableFuture.failedFuture(IllegalStateException("Blender Probe is not connected."))
+
+        val id = nextId.getAndIncrement()
+        val frame = encodeFrame(command.deepCopy().apply { addProperty("id", id) }.toString())
+
+        synchronized(lock) {
+            // A pooled connection may have been closed by Blender (e.g. a restart on the
+            // same port); retry once on a fresh socket before giving up.
+            var lastError = IOException("Could not reach Blender Probe at $endpoint.")
+            repeat(2) {
+                try {
+                    val conn = connectionFor(endpoint)
+                    val future = conn.register(id)
+                    try {
+                        conn.write(frame)
+                        return future
+                    } catch (e: IOException) {
+                        conn.close(e)
+                        connection = null
+                        throw e
+                    }
+                } catch (e: IOException) {
+                    lastError = e
+                }
+            }
+            return CompletableFuture.failedFuture(lastError)
+        }
+    }
+
+    /** Closes the shared connection, failing any commands still awaiting a reply. */
+    fun disconnect() {
+        synchronized(lock) {
+            connection?.close(IOException("Blender Probe connection closed."))
+            connection = null
+        }
+    }
+
+    /** Encodes a JSON body as a probe frame: a space-padded 64-byte length header plus the body. */
+    internal fun encodeFrame(json: String): ByteArray {
+        val body = json.toByteArray(StandardCharsets.UTF_8)
+        val header = String.format("%-${HEADER_SIZE}s", body.size.toString()).toByteArray(StandardCharsets.US_ASCII)
+        return header + body
+    }
+
+    /** Where the probe server listens: a loopback TCP port, or a Unix domain socket on Linux. */
+    private sealed interface Endpoint {
+        fun open(): Streams
+
+        data class Tcp(val port: Int) : Endpoint {
+            override fun open(): Streams {
+                val socket = Socket()
+                socket.tcpNoDelay = true
+                socket.connect(InetSocketAddress(HOST, port), CONNECT_TIMEOUT_MS)
+                return Streams(socket.getInputStream(), socket.getOutputStream(), socket)
+            }
+
+            override fun toString() = "port $port"
+        }
+
+        data class Unix(val path: String) : Endpoint {
+            override fun open(): Streams {
+                val channel = SocketChannel.open(StandardProtocolFamily.UNIX)
+                try {
+                    channel.connect(UnixDomainSocketAddress.of(path))
+                } catch (e: IOException) {
+                    channel.close()
+                    throw e
+                }
+                // Not Channels.newInputStream/newOutputStream: on a SocketChannel those can
+                // serialize a blocked read against writes from another thread.
+                val input = object : InputStream() {
+                    override fun read(): Int {
+                        val one = ByteArray(1)
+                        return if (read(one, 0, 1) < 0) -1 else one[0].toInt() and 0xff
+                    }
+
+                    override fun read(b: ByteArray, off: Int, len: Int): Int =
+                        if (len == 0) 0 else channel.read(ByteBuffer.wrap(b, off, len))
+                }
+                val output = object : OutputStream() {
+                    override fun write(b: Int) = write(byteArrayOf(b.toByte()), 0, 1)
+
+                    override fun write(b: ByteArray, off: Int, len: Int) {
+                        val buffer = ByteBuffer.wrap(b, off, len)
+                        while (buffer.hasRemaining()) channel.write(buffer)
+                    }
+                }
+                return Streams(input, output, channel)
+            }
+
+            override fun toString() = path
+        }
+    }
+
+    /** The byte streams of one open connection and the handle that closes it. */
+    private class Streams(val input: InputStream, val output: OutputStream, val handle: Closeable)
+
+    private fun currentEndpoint(): Endpoint? =
+        BlenderProbeManager.activeSocketPath?.let { Endpoint.Unix(it) }
+            ?: BlenderProbeManager.activePort?.let { Endpoint.Tcp(it) }
+
+    private fun connectionFor(endpoint: Endpoint): Connection {
+        val current = connection
+        if (current != null && current.endpoint == endpoint && current.isOpen) return current
+
+        current?.close(IOException("Blender Probe address changed."))
+        return Connection(endpoint, endpoint.open()).also { connection = it }
+    }
+
+    private class Connection(val endpoint: Endpoint, private val streams: Streams) {
+        private val out = BufferedOutputStream(streams.output)
+        private val pending = ConcurrentHashMap<Long, CompletableFuture<Reply>>()
+
+        @Volatile
+        var isOpen = true
+            private set
+
+        init {
+            thread(isDaemon = true, name = "Blender Probe client reader") { readLoop() }
+        }
+
+        fun register(id: Long): CompletableFuture<Reply> =
+            CompletableFuture<Reply>().also { pending[id] = it }
+
+        fun write(frame: ByteArray) {
+            out.write(frame)
+            out.flush()
+        }
+
+        fun close(cause: Throwable) {
+            isOpen = false
+            try {
+                streams.handle.close()
+            } catch (_: IOException) {
+                // Already closed.
+            }
+            pending.values.forEach { it.completeExceptionally(cause) }
+            pending.clear()
+        }
+
+        private fun readLoop() {
+            val input = DataInputStream(streams.input)
+            try {
+                while (true) {
+                    val (reply, body) = readFrame(input)
+                    // Acks only confirm the command was queued; callers wait for its result.
+                    if (reply.get("type")?.asString != "result") continue
+                    val id = reply.get("id")?.takeUnless { it.isJsonNull }?.asLong ?: continue
+                    pending.remove(id)?.complete(Reply(reply, body))
+                }
+            } catch (e: Exception) {
+                close(e)
+            }
+        }
+    }
+
+    /**
+     * Reads one frame: a 64-byte header (`<json_len>`, `<json_len> <body_len>` or
+     * `<json_len> *` for a chunked body), the JSON section, then any binary body.
+     */
+    internal fun readFrame(input: DataInputStream): Pair<JsonObject, ByteArray?> {
+        val fields = readHeader(input)
+        val json = ByteArray(fields[0].toInt())
+        input.readFully(json)
+        val reply = JsonParser.parseString(String(json, StandardCharsets.UTF_8)).asJsonObject
+
+        val body = when {
+            fields.size < 2 -> null
+            fields[1] == "*" -> {
+                val out = ByteArrayOutputStream()
+                while (true) {
+                    val chunkLength = readHeader(input)[0].toInt()
+                    if (chunkLength == 0) break
+                    val chunk = ByteArray(chunkLength)
+                    input.readFully(chunk)
+                    out.write(chunk)
+                }
+                out.toByteArray()
+            }
+
+            else -> ByteArray(fields[1].toInt()).also { input.readFully(it) }
+        }
+        return reply to body
+    }
+
+    private fun readHeader(input: DataInputStream): List<String> {
+        val header = ByteArray(HEADER_SIZE)
+        input.readFully(header)
+        return String(header, StandardCharsets.US_ASCII).trim().split(Regex("\\s+"))
+    }
+}
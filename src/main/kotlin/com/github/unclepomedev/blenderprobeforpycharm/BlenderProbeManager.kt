@@ -3,8 +3,35 @@ package com.github.unclepomedev.blenderprobeforpycharm
 object BlenderProbeManager {
     var activePort: Int? = null
 
+    /** Unix domain socket the probe server listens on instead of a TCP port (Linux only). */
+    var activeSocketPath: String? = null
+
+    /** Whether a running probe server has announced where it can be reached. */
+    val isConnected: Boolean
+        get() = activePort != null || activeSocketPath != null
+
     fun updatePort(port: Int) {
+        if (activePort != port) {
+            // A new port means a new Blender process; the old session is dead.
+            BlenderProbeClient.disconnect()
+        }
         activePort = port
+        activeSocketPath = null
         println("Blender Probe: Port updated to $port")
     }
-}
\ No newline at end of file
+
+    fun updateSocketPath(path: String) {
+        if (activeSocketPath != path) {
+            BlenderProbeClient.disconnect()
+        }
+        activeSocketPath = path
+        activePort = null
+        println("Blender Probe: Socket updated to $path")
+    }
+
+    /** Forgets the server's address once its Blender process has exited. */
+    fun clear() {
+        activePort = null
+        activeSocketPath = null
+    }
+}
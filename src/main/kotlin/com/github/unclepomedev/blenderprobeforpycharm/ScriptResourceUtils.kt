@@ -36,8 +36,9 @@ object ScriptResourceUtils {
 
     /**
      * Extracts several scripts from the `/python/` resources into a single shared
-     * temporary directory, preserving their file names so the entry-point script
-     * can import its siblings at runtime (e.g. `probe_server.py` importing `wheels.py`).
+     * temporary directory, preserving their relative paths so the entry-point script
+     * can import its siblings at runtime (e.g. `probe_server.py` importing `wheels.py`
+     * and the `blender_probe` package).
      *
      * @param scriptNames The script file names to extract; the first is treated as the
      *   entry point and its extracted file is returned.
@@ -1,12 +1,12 @@
 package com.github.unclepomedev.blenderprobeforpycharm.actions
 
+import com.github.unclepomedev.blenderprobeforpycharm.BlenderProbeClient
 import com.github.unclepomedev.blenderprobeforpycharm.BlenderProbeManager
+import com.google.gson.JsonObject
 import com.intellij.openapi.actionSystem.AnAction
 import com.intellij.openapi.actionSystem.AnActionEvent
 import com.intellij.openapi.ui.Messages
-import java.io.OutputStreamWriter
-import java.net.Socket
-import java.nio.charset.StandardCharsets
+import java.util.concurrent.TimeUnit
 
 /**
  * Action to send a ping command to the running Blender instance.
@@ -19,30 +19,22 @@ class PingBlenderAction : AnAction() {
      * @param e The action event.
      */
     override fun actionPerformed(e: AnActionEvent) {
-        val port = BlenderProbeManager.activePort
-        if (port == null) {
+        if (!BlenderProbeManager.isConnected) {
             Messages.showErrorDialog("Blender is not running or Probe server is not ready.", "Connection Error")
             return
         }
 
         com.intellij.openapi.application.ApplicationManager.getApplication().executeOnPooledThread {
             try {
-                val socket = Socket()
-                socket.connect(java.net.InetSocketAddress("127.0.0.1", port), 3_000)
-                socket.use {
-                    val writer = OutputStreamWriter(it.getOutputStream(), StandardCharsets.UTF_8)
+                val command = JsonObject().apply { addProperty("action", "ping") }
+                val result = BlenderProbeClient.send(command).get(3, TimeUnit.SECONDS)
+                val queuedMs = result.get("queued_ms")?.asDouble ?: 0.0
 
-                    val json = """{"action": "ping"}"""
-                    val jsonBytes = json.toByteArray(StandardCharsets.UTF_8)
-
-                    val header = String.format("%-64s", jsonBytes.size.toString())
-
-                    writer.write(header)
-                    writer.write(json)
-                    writer.flush()
-                }
                 com.intellij.openapi.application.ApplicationManager.getApplication().invokeLater {
-                    Messages.showInfoMessage("Ping sent to Blender!", "Blender Probe")
+                    Messages.showInfoMessage(
+                        "Blender answered the ping (picked up after ${"%.1f".format(queuedMs)} ms).",
+                        "Blender Probe"
+                    )
                 }
             } catch (ex: Exception) {
                 com.intellij.openapi.application.ApplicationManager.getApplication().invokeLater {
@@ -1,7 +1,10 @@
 package com.github.unclepomedev.blenderprobeforpycharm.actions
 
+import com.github.unclepomedev.blenderprobeforpycharm.BlenderProbeClient
 import com.github.unclepomedev.blenderprobeforpycharm.BlenderProbeManager
 import com.github.unclepomedev.blenderprobeforpycharm.BlenderProbeUtils
+import com.github.unclepomedev.blenderprobeforpycharm.settings.BlenderSettings
+import com.google.gson.JsonObject
 import com.intellij.notification.NotificationGroupManager
 import com.intellij.notification.NotificationType
 import com.intellij.openapi.actionSystem.AnAction
@@ -12,9 +15,8 @@ import com.intellij.openapi.progress.ProgressManager
 import com.intellij.openapi.progress.Task
 import com.intellij.openapi.project.Project
 import com.intellij.openapi.ui.Messages
-import java.io.BufferedOutputStream
-import java.net.Socket
-import java.nio.charset.StandardCharsets
+import java.util.concurrent.TimeUnit
+import kotlin.math.roundToLong
 
 /**
  * Action to reload the Blender add-on.
@@ -22,6 +24,11 @@ import java.nio.charset.StandardCharsets
  */
 class ReloadAddonAction : AnAction() {
 
+    companion object {
+        // A reload runs the add-on's import and register() code, which can be slow.
+        private const val RELOAD_TIMEOUT_SECONDS = 60L
+    }
+
     /**
      * Executes the reload action.
      *
@@ -29,33 +36,37 @@ class ReloadAddonAction : AnAction() {
      */
     override fun actionPerformed(e: AnActionEvent) {
         val project = e.project ?: return
-        val port = BlenderProbeManager.activePort
-
-        if (port == null) {
+        if (!BlenderProbeManager.isConnected) {
             Messages.showErrorDialog(project, "Blender Probe is not connected.", "Connection Error")
             return
         }
 
         val addonName = BlenderProbeUtils.detectAddonModuleName(project)
+        val mode = if (BlenderSettings.getInstance(project).state.incrementalReload) "incremental" else "full"
 
         ProgressManager.getInstance().run(object : Task.Backgroundable(project, "Reloading blender addon", false) {
             override fun run(indicator: ProgressIndicator) {
                 try {
-                    Socket("127.0.0.1", port).use { socket ->
-                        val out = BufferedOutputStream(socket.getOutputStream())
-
-                        val safeName = addonName.replace("\\", "\\\\").replace("\"", "\\\"")
-                        val json = """{"action": "reload", "module_name": "$safeName"}"""
-                        val jsonBytes = json.toByteArray(StandardCharsets.UTF_8)
-                        val header = String.format("%-64s", jsonBytes.size.toString())
-                        val headerBytes = header.toByteArray(StandardCharsets.UTF_8)
-
-                        out.write(headerBytes)
-                        out.write(jsonBytes)
-                        out.flush()
+                    val command = JsonObject().apply {
+                        addProperty("action", "reload")
+                        addProperty("module_name", addonName)
+                        addProperty("mode", mode)
                     }
+                    val result = BlenderProbeClient.send(command).get(RELOAD_TIMEOUT_SECONDS, TimeUnit.SECONDS)
 
-                    showNotification(project, "Reload command sent to Blender: $addonName")
+                    val duration = result.get("duration_ms")?.asDouble ?: 0.0
+                    val status = result.get("status")?.asString
+                    if (status == "superseded") {
+                        // A newer reload replaced this one before it ran; that one reports.
+                        return
+                    }
+                    if (status == "ok") {
+                        val breakdown = describeTimings(result.getAsJsonObject("result"))
+                        showNotification(project, "Reloaded $addonName in ${duration.roundToLong()} ms$breakdown")
+                    } else {
+                        val error = result.get("error")?.takeUnless { it.isJsonNull }?.asString ?: "unknown error"
+                        showNotification(project, "Reload of $addonName failed: $error", NotificationType.ERROR)
+                    }
 
                 } catch (ex: Exception) {
                     ApplicationManager.getApplication().invokeLater {
@@ -66,10 +77,33 @@ class ReloadAddonAction : AnAction() {
         })
     }
 
-    private fun showNotification(project: Project, content: String) {
+    /**
+     * Summarizes the reload's timing breakdown as " (import 120 ms, register 8 ms; slowest: addon.ops)",
+     * or an empty string when the server did not report one.
+     */
+    internal fun describeTimings(reloadResult: JsonObject?): String {
+        val timings = reloadResult?.getAsJsonObject("timings") ?: return ""
+        val phases = timings.getAsJsonObject("phases") ?: return ""
+        val parts = phases.entrySet()
+            .filter { it.value.asDouble >= 1.0 }
+            .joinToString(", ") { "${it.key} ${it.value.asDouble.roundToLong()} ms" }
+        val slowest = timings.getAsJsonArray("imports")
+            ?.firstOrNull()
+            ?.asJsonObject
+            ?.get("module")
+            ?.asString
+        val details = listOfNotNull(parts.ifEmpty { null }, slowest?.let { "slowest: $it" })
+        return if (details.isEmpty()) "" else details.joinToString("; ", prefix = " (", postfix = ")")
+    }
+
+    private fun showNotification(
+        project: Project,
+        content: String,
+        type: NotificationType = NotificationType.INFORMATION
+    ) {
         NotificationGroupManager.getInstance()
             .getNotificationGroup("Blender Probe Notification Group")
-            ?.createNotification(content, NotificationType.INFORMATION)
+            ?.createNotification(content, type)
             ?.notify(project)
     }
 }
\ No newline at end of file
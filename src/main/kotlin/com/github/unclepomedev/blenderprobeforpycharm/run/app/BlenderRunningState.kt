@@ -1,5 +1,6 @@
 package com.github.unclepomedev.blenderprobeforpycharm.run.app
 
+import com.github.unclepomedev.blenderprobeforpycharm.BlenderProbeClient
 import com.github.unclepomedev.blenderprobeforpycharm.BlenderProbeManager
 import com.github.unclepomedev.blenderprobeforpycharm.BlenderProbeUtils
 import com.github.unclepomedev.blenderprobeforpycharm.ScriptResourceUtils
@@ -15,6 +16,7 @@ import com.intellij.execution.runners.ExecutionEnvironment
 import com.intellij.execution.runners.ProgramRunner
 import com.intellij.openapi.project.Project
 import com.intellij.openapi.util.Key
+import com.intellij.openapi.util.SystemInfo
 import com.intellij.openapi.util.io.FileUtil
 import com.intellij.util.io.BaseOutputReader
 import java.io.File
@@ -35,6 +37,43 @@ class BlenderRunningState(
     var cachedSourceRoot: String? = null
 
     companion object {
+        /**
+         * Python resources extracted into one temp dir, keeping their relative paths; the
+         * first one is the entry point. Everything but the entry point, wheels.py and
+         * probe_cache.py (which addons import by name) lives in the `blender_probe` package.
+         */
+        internal val PROBE_SCRIPTS = arrayOf(
+            "probe_server.py",
+            "wheels.py",
+            "probe_cache.py",
+            "blender_probe/__init__.py",
+            "blender_probe/protocol.py",
+            "blender_probe/transport.py",
+            "blender_probe/import_graph.py",
+            "blender_probe/reload_timing.py",
+            "blender_probe/rna_export.py",
+            "blender_probe/preflight.py",
+            "blender_probe/profiling.py",
+            "blender_probe/sampler.py",
+            "blender_probe/callbacks.py",
+            "blender_probe/leak_tracker.py",
+            "blender_probe/metrics.py",
+            "blender_probe/output_pump.py",
+        )
+
+        // sun_path holds 108 bytes on Linux, including the terminating NUL.
+        private const val MAX_SOCKET_PATH_LENGTH = 107
+
+        /**
+         * Unix domain socket path for the probe server inside [tempDir], or null where TCP
+         * must be used (non-Linux systems, or a temp dir too deep for a socket path).
+         */
+        internal fun socketPathFor(tempDir: File, isLinux: Boolean = SystemInfo.isLinux): String? {
+            if (!isLinux) return null
+            val path = File(tempDir, "probe.sock").absolutePath
+            return path.takeIf { it.toByteArray(StandardCharsets.UTF_8).size <= MAX_SOCKET_PATH_LENGTH }
+        }
+
         internal fun buildParameters(useFactoryStartup: Boolean, scriptPath: String): List<String> = buildList {
             if (useFactoryStartup) {
                 add("--factory-startup")
@@ -69,11 +108,12 @@ class BlenderRunningState(
         val project = environment.project
         val blenderPath = resolveBlenderPathOrThrow(project)
 
-        val scriptFile = ScriptResourceUtils.extractScriptsToTempDir("probe_server.py", "wheels.py")
+        val scriptFile = ScriptResourceUtils.extractScriptsToTempDir(*PROBE_SCRIPTS)
         val tempDir = scriptFile.parentFile
 
         try {
             val cmd = buildCommandLine(project, blenderPath, scriptFile.absolutePath)
+            socketPathFor(tempDir)?.let { cmd.withEnvironment("BLENDER_PROBE_SOCKET_PATH", it) }
             return createProcessHandler(cmd, tempDir)
         } catch (e: Exception) {
             FileUtil.delete(tempDir)
@@ -135,12 +175,15 @@ internal class ProbeProcessListener(private val tempDir: File) : ProcessListener
                 } catch (e: NumberFormatException) {
                     e.printStackTrace()
                 }
+            } else if (cleanLine.startsWith("BLENDER_PROBE_SOCKET::")) {
+                BlenderProbeManager.updateSocketPath(cleanLine.removePrefix("BLENDER_PROBE_SOCKET::"))
             }
         }
     }
 
     override fun processTerminated(event: ProcessEvent) {
-        BlenderProbeManager.activePort = null
+        BlenderProbeManager.clear()
+        BlenderProbeClient.disconnect()
         try {
             FileUtil.delete(tempDir)
         } catch (_: Exception) {
@@ -31,7 +31,7 @@ class BlenderAutoReloadService(private val project: Project) : Disposable {
     }
 
     private fun performReload() {
-        if (BlenderProbeManager.activePort == null) return
+        if (!BlenderProbeManager.isConnected) return
 
         val actionManager = ActionManager.getInstance()
         val action = actionManager.getAction("com.github.unclepomedev.blenderprobeforpycharm.actions.ReloadAddonAction")
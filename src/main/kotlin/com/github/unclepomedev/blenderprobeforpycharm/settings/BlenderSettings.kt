@@ -27,10 +27,13 @@ class BlenderSettings(private val project: Project) : PersistentStateComponent<B
      *   Defaults to true to mirror the standard, supported behavior. Disabling it lets Blender
      *   load third-party add-ons and modules from the user environment, which can crash Blender
      *   on startup (use at your own risk, outside the supported scope).
+     * @property incrementalReload Whether hot reload re-executes only the changed modules and the
+     *   modules that import them, instead of the whole add-on. Defaults to false (full reload).
      */
     data class State(
         var blenderPath: String = "",
-        var useFactoryStartup: Boolean = true
+        var useFactoryStartup: Boolean = true,
+        var incrementalReload: Boolean = false
     )
 
     private var myState = State()
@@ -11,8 +11,8 @@ import com.intellij.ui.dsl.builder.AlignX
 
 /**
  * Provides the configuration UI for Blender Probe settings.
- * Lets users specify the Blender executable path and whether to launch
- * Blender with `--factory-startup`.
+ * Lets users specify the Blender executable path, whether to launch
+ * Blender with `--factory-startup`, and how hot reload purges modules.
  */
 class BlenderSettingsConfigurable(private val project: Project) : BoundConfigurable("Blender Probe") {
 
@@ -48,6 +48,18 @@ class BlenderSettingsConfigurable(private val project: Project) : BoundConfigura
                         )
                 }
             }
+            group("Hot Reload") {
+                row {
+                    checkBox("Reload only changed modules")
+                        .bindSelected(settings.state::incrementalReload)
+                        .comment(
+                            "Re-executes only the modules whose source changed, plus the modules that import them, " +
+                                "instead of the whole add-on. Falls back to a full reload when needed.<br>" +
+                                "Imports made through <code>importlib</code> or <code>__import__</code> are not tracked; " +
+                                "disable this if your add-on loads its own modules dynamically."
+                        )
+                }
+            }
         }
     }
 }
@@ -0,0 +1,7 @@
+"""Modules of the probe server, kept in one package so their names cannot
+shadow modules or wheels of the addon under development (probe_server.py puts
+this directory first on ``sys.path``).
+
+None of them import ``bpy``; what they need from Blender is passed in, so the
+tests under src/test/python run them under a plain interpreter.
+"""
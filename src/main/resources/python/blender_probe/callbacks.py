@@ -0,0 +1,335 @@
+"""Latency instrumentation of the callbacks an addon hooks into Blender.
+
+Timers (``bpy.app.timers``), application handlers (``bpy.app.handlers.*``)
+and space draw handlers (``Space*.draw_handler_add``) run on Blender's main
+thread between frames, so a slow one makes the whole UI feel sluggish.
+:class:`CallbackInstrumentation` wraps the ones registered by the addon under
+development and records, per callback, a call count and a latency histogram.
+
+How each kind of callback is wrapped:
+
+* timers and draw handlers -- ``register`` / ``draw_handler_add`` are patched
+  to register a wrapper instead; ``unregister`` / ``is_registered`` map the
+  addon's own function to its wrapper, so the addon's code keeps working;
+* application handlers -- the handler lists are plain lists, so after the
+  addon registers, its entries are replaced by wrappers, and they are put back
+  before the addon's ``unregister()`` runs (which would otherwise fail to find
+  them). While a handler runs its own function is in the list, so it can
+  remove itself. Removing a handler at any other time (outside both its own
+  call and ``unregister()``) raises ``ValueError`` while it is wrapped.
+
+Wrappers are real functions created with ``functools.wraps``, so attributes
+such as ``@bpy.app.handlers.persistent`` carry over; Blender only keeps
+functions carrying that mark across file loads, which is why wrappers cannot
+be callable objects comparing equal to the function they wrap.
+"""
+
+import bisect
+import functools
+import threading
+import time
+
+from .reload_timing import owned_by
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open.
+BUCKETS_MS = (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100)
+
+_MARKER = "_blender_probe_instrumented"
+
+
+def _describe(func):
+    target = getattr(func, "func", func)  # functools.partial
+    module = getattr(target, "__module__", None) or "?"
+    name = (
+        getattr(target, "__qualname__", None)
+        or getattr(target, "__name__", None)
+        or repr(target)
+    )
+    return f"{module}.{name}"
+
+
+def _index_of(entries, item):
+    """Index of ``item`` itself (not just an equal object) in ``entries``, or None."""
+    for i, entry in enumerate(entries):
+        if entry is item:
+            return i
+    return None
+
+
+class _Stats:
+    __slots__ = ("calls", "total", "max", "buckets", "errors")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds, failed):
+        self.calls += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.errors += failed
+        self.buckets[bisect.bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+
+    def percentile(self, fraction):
+        """Upper bound (ms) of the bucket holding the given fraction of calls."""
+        rank = fraction * self.calls
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return round(self.max * 1000, 3)
+
+
+class CallbackInstrumentation:
+    """Wraps an addon's timers, handlers and draw callbacks to time them."""
+
+    def __init__(self):
+        self.enabled = False
+        self.packages = set()
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._timer_wrappers = {}  # addon function -> registered wrapper
+        self._patches = []  # (owner, attribute, original value or None if inherited)
+
+    # --- what to instrument -------------------------------------------------
+
+    def owns(self, func):
+        module = getattr(getattr(func, "func", func), "__module__", None) or ""
+        return any(owned_by(module, p) for p in self.packages)
+
+    def wrap(self, kind, func):
+        """A function calling ``func`` that records its latency under ``kind``."""
+        key = f"{kind}:{_describe(func)}"
+
+        @functools.wraps(func)
+        def instrumented(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            failed = True
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                self._record(key, time.perf_counter() - started, failed)
+
+        setattr(instrumented, _MARKER, True)
+        return instrumented
+
+    def _record(self, key, seconds, failed):
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _Stats()
+            stats.add(seconds, failed)
+
+    # --- timers and draw handlers -------------------------------------------
+
+    def install(self, timers, space_types=()):
+        """Patch ``timers`` (``bpy.app.timers``) and each space type's draw_handler_add.
+
+        The patches stay in place once installed (they are transparent while
+        disabled), because wrapped timers must remain unregisterable by the
+        addon's own function.
+        """
+        if self._patches:
+            return
+        register = timers.register
+        unregister = timers.unregister
+        is_registered = timers.is_registered
+
+        def patched_register(function, *args, **kwargs):
+            # Blender also drops timers that raised or ran when a file was
+            # loaded; forget their wrappers so they do not pin old generations.
+            for original, wrapper in list(self._timer_wrappers.items()):
+                if not is_registered(wrapper):
+                    del self._timer_wrappers[original]
+            if self.enabled and self.owns(function):
+                wrapper = self._timer_wrappers.get(function)
+                if wrapper is None:
+                    wrapper = self._timer_wrappers[function] = self._wrap_timer(
+                        function
+                    )
+                function = wrapper
+            return register(function, *args, **kwargs)
+
+        def patched_unregister(function):
+            return unregister(self._timer_wrappers.pop(function, function))
+
+        def patched_is_registered(function):
+            return is_registered(self._timer_wrappers.get(function, function))
+
+        self._patch(timers, "register", patched_register)
+        self._patch(timers, "unregister", patched_unregister)
+        self._patch(timers, "is_registered", patched_is_registered)
+
+        for space_type in space_types:
+            add = getattr(space_type, "draw_handler_add", None)
+            if add is None:
+                continue
+
+            def patched_add(
+                callback,
+                args,
+                region_type,
+                draw_type,
+                *rest,
+                _add=add,
+                _space=space_type,
+            ):
+                if self.enabled and self.owns(callback):
+                    kind = f"draw:{_space.__name__}/{region_type}/{draw_type}"
+                    callback = self.wrap(kind, callback)
+                return _add(callback, args, region_type, draw_type, *rest)
+
+            try:
+                self._patch(space_type, "draw_handler_add", staticmethod(patched_add))
+            except (AttributeError, TypeError):
+                pass  # a type that refuses new attributes is simply not instrumented
+
+    def _wrap_timer(self, function):
+        """A wrapper for the timer ``function`` that forgets itself once done."""
+        timed = self.wrap("timer", function)
+
+        @functools.wraps(function)
+        def instrumented(*args, **kwargs):
+            interval = timed(*args, **kwargs)
+            # Returning None ends the timer, so Blender releases the wrapper;
+            # the registry must release it (and the addon's function) too.
+            if interval is None and self._timer_wrappers.get(function) is instrumented:
+                del self._timer_wrappers[function]
+            return interval
+
+        setattr(instrumented, _MARKER, True)
+        return instrumented
+
+    def _patch(self, owner, attribute, value):
+        own = getattr(owner, "__dict__", {})
+        original = own.get(attribute) if attribute in own else None
+        setattr(owner, attribute, value)
+        self._patches.append((owner, attribute, original))
+
+    def uninstall(self):
+        """Restore everything :meth:`install` patched (used by tests and shutdown)."""
+        for owner, attribute, original in reversed(self._patches):
+            try:
+                if original is None:
+                    delattr(owner, attribute)
+                else:
+                    setattr(owner, attribute, original)
+            except (AttributeError, TypeError):
+                pass
+        self._patches.clear()
+
+    # --- application handlers -----------------------------------------------
+
+    @staticmethod
+    def _handler_lists(handlers):
+        for name in dir(handlers):
+            if name.startswith("_"):
+                continue
+            value = getattr(handlers, name, None)
+            if isinstance(value, list):
+                yield name, value
+
+    def wrap_handlers(self, handlers):
+        """Replace the addon's entries in every ``handlers`` list by wrappers."""
+        if not self.enabled:
+            return 0
+        wrapped = 0
+        for name, entries in self._handler_lists(handlers):
+            for i, func in enumerate(entries):
+                if not getattr(func, _MARKER, False) and self.owns(func):
+                    entries[i] = self._wrap_handler(name, entries, func)
+                    wrapped += 1
+        return wrapped
+
+    def _wrap_handler(self, name, entries, func):
+        """A wrapper for ``func``, an entry of the handler list ``entries``.
+
+        While the handler runs, ``func`` itself is back in its slot, so a
+        handler that removes itself (``load_post.remove(on_load)``, the usual
+        one-shot pattern) finds itself; afterwards the wrapper takes the slot
+        back, unless the handler did remove itself.
+        """
+        timed = self.wrap(f"handler:{name}", func)
+
+        @functools.wraps(func)
+        def instrumented(*args, **kwargs):
+            index = _index_of(entries, instrumented)
+            if index is not None:
+                entries[index] = func
+            try:
+                return timed(*args, **kwargs)
+            finally:
+                if index is not None:
+                    index = _index_of(entries, func)
+                    if index is not None:
+                        entries[index] = instrumented
+
+        setattr(instrumented, _MARKER, True)
+        return instrumented
+
+    def unwrap_handlers(self, handlers):
+        """Put the original functions back into every ``handlers`` list."""
+        for _name, entries in self._handler_lists(handlers):
+            for i, func in enumerate(entries):
+                if getattr(func, _MARKER, False):
+                    entries[i] = func.__wrapped__
+
+    def instrument_module(self, module, handlers):
+        """Wrap the handlers a just-registered addon module added.
+
+        The module's ``unregister`` is wrapped too, so the originals are back in
+        the handler lists whenever the addon unregisters, however that happens
+        (a probe reload or disabling it in Preferences).
+        """
+        count = self.wrap_handlers(handlers)
+        unregister = getattr(module, "unregister", None)
+        if unregister is not None and not getattr(unregister, _MARKER, False):
+
+            @functools.wraps(unregister)
+            def instrumented_unregister(*args, **kwargs):
+                self.unwrap_handlers(handlers)
+                return unregister(*args, **kwargs)
+
+            setattr(instrumented_unregister, _MARKER, True)
+            module.unregister = instrumented_unregister
+        return count
+
+    # --- reporting ----------------------------------------------------------
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def report(self, limit=20):
+        """Callbacks by total time spent in them, worst first."""
+        with self._lock:
+            items = list(self._stats.items())
+        rows = []
+        for key, stats in items:
+            kind, _, name = key.rpartition(":")
+            rows.append(
+                {
+                    "callback": name,
+                    "kind": kind,
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "total_ms": round(stats.total * 1000, 3),
+                    "mean_ms": round(stats.total * 1000 / stats.calls, 3),
+                    "max_ms": round(stats.max * 1000, 3),
+                    "p50_ms": stats.percentile(0.5),
+                    "p95_ms": stats.percentile(0.95),
+                    "histogram": dict(
+                        zip([f"<={b}ms" for b in BUCKETS_MS] + ["more"], stats.buckets)
+                    ),
+                }
+            )
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows[:limit] if limit else rows
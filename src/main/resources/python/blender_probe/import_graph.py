@@ -0,0 +1,225 @@
+"""Intra-package import graph for incremental addon reloads.
+
+After each (re)load the probe server records, for every loaded module of the
+addon package, its source fingerprint and the addon modules it imports (found
+by parsing the source, not by executing it). On the next reload the graph
+answers which modules actually changed on disk and which other modules must be
+re-executed because they imported them, directly or transitively. Everything
+else can stay in ``sys.modules`` untouched.
+
+Only static ``import`` / ``from ... import`` statements are seen; a module that
+loads siblings through ``importlib.import_module`` or ``__import__`` should be
+reloaded in full mode.
+"""
+
+import ast
+import hashlib
+import importlib.util
+import os
+import sys
+
+from .reload_timing import owned_by
+
+
+def _source_path(module):
+    path = getattr(module, "__file__", None)
+    if not path or not path.endswith(".py"):
+        return None  # namespace package, extension module, or bytecode-only
+    return path
+
+
+def stat_key(path):
+    """What a stat says about ``path`` that changes when it is saved, or None."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _digest(path):
+    try:
+        with open(path, "rb") as fh:
+            return hashlib.blake2b(fh.read(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
+
+def snapshot_sources(package):
+    """Stat keys of the package's ``.py`` files, keyed by path.
+
+    Taken right before the package's modules are (re-)executed and handed to
+    :meth:`AddonImportGraph.refresh`, so the graph records what was actually
+    run rather than what is on disk once the reload has finished.
+    """
+    try:
+        spec = importlib.util.find_spec(package)
+    except (ImportError, ValueError):
+        return {}
+    if spec is None:
+        return {}
+    if spec.submodule_search_locations is None:
+        paths = [spec.origin] if spec.origin else []
+    else:
+        paths = []
+        for location in spec.submodule_search_locations:
+            for dirpath, dirnames, filenames in os.walk(location):
+                dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+                paths.extend(
+                    os.path.join(dirpath, f) for f in filenames if f.endswith(".py")
+                )
+    return {path: stat_key(path) for path in paths}
+
+
+def module_imports(path, module_name, is_package, package):
+    """Return the raw imports of a source file that may refer into ``package``.
+
+    Each item is ``(target, name)``: ``import a.b`` gives ``("a.b", None)`` and
+    ``from a import b`` gives ``("a", "b")``, since ``b`` may be a submodule or
+    just an attribute of ``a``. :meth:`AddonImportGraph._edges` decides which
+    once the set of loaded modules is known.
+    """
+    try:
+        with open(path, "rb") as fh:
+            tree = ast.parse(fh.read(), filename=path)
+    except (OSError, SyntaxError, ValueError):
+        return frozenset()
+
+    # Relative imports resolve against the module's own package.
+    base_package = module_name if is_package else module_name.rpartition(".")[0]
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found.update((alias.name, None) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                parts = base_package.split(".")
+                if node.level > len(parts):
+                    continue
+                anchor = ".".join(parts[: len(parts) - node.level + 1])
+                target = f"{anchor}.{node.module}" if node.module else anchor
+            else:
+                target = node.module or ""
+            found.update((target, alias.name) for alias in node.names)
+
+    return frozenset(
+        (target, name) for target, name in found if owned_by(target, package)
+    )
+
+
+class _Entry:
+    __slots__ = ("path", "stat_key", "digest", "imports")
+
+    def __init__(self, path, stat_key, digest, imports):
+        self.path = path
+        self.stat_key = stat_key
+        self.digest = digest
+        self.imports = imports
+
+
+class AddonImportGraph:
+    """Source fingerprints and import edges for the modules of one package."""
+
+    def __init__(self, package):
+        self.package = package
+        self._entries = {}
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def _owned(self, name):
+        return owned_by(name, self.package)
+
+    def refresh(self, modules=None, executed=None):
+        """Record the current state of every loaded module of the package.
+
+        Unchanged files (same mtime and size as last time) reuse their recorded
+        digest and import list, so refreshing after a small edit only reads and
+        parses the files that changed.
+
+        ``executed`` is a :func:`snapshot_sources` taken before the modules ran.
+        A file saved since then (or missing from it) is recorded without a
+        digest, so the next reload treats it as changed instead of assuming
+        the new content is what was loaded.
+        """
+        modules = sys.modules if modules is None else modules
+        entries = {}
+        for name, module in list(modules.items()):
+            if module is None or not self._owned(name):
+                continue
+            path = _source_path(module)
+            if path is None:
+                continue
+            key = stat_key(path)
+            is_package = hasattr(module, "__path__")
+            if executed is not None and executed.get(path) != key:
+                entries[name] = _Entry(
+                    path,
+                    executed.get(path),
+                    None,
+                    module_imports(path, name, is_package, self.package),
+                )
+                continue
+            previous = self._entries.get(name)
+            if (
+                previous is not None
+                and previous.path == path
+                and previous.stat_key == key
+            ):
+                entries[name] = previous
+                continue
+            entries[name] = _Entry(
+                path,
+                key,
+                _digest(path),
+                module_imports(path, name, is_package, self.package),
+            )
+        self._entries = entries
+
+    def changed(self):
+        """Names of tracked modules whose source differs from the last refresh.
+
+        A changed mtime alone is not enough (editors touch files on save); the
+        content digest is compared before a module counts as changed.
+        """
+        changed = set()
+        for name, entry in self._entries.items():
+            key = stat_key(entry.path)
+            if key == entry.stat_key:
+                continue
+            if key is None or _digest(entry.path) != entry.digest:
+                changed.add(name)
+        return changed
+
+    def _edges(self, entry):
+        """Tracked modules that ``entry``'s module depends on."""
+        deps = set()
+        for target, name in entry.imports:
+            submodule = f"{target}.{name}" if name else None
+            deps.add(submodule if submodule in self._entries else target)
+        return deps
+
+    def importers(self, names):
+        """``names`` plus every tracked module that imports one of them, transitively."""
+        reverse = {}
+        for name, entry in self._entries.items():
+            for imported in self._edges(entry):
+                reverse.setdefault(imported, set()).add(name)
+
+        result = set(names)
+        stack = list(names)
+        while stack:
+            for importer in reverse.get(stack.pop(), ()):
+                if importer not in result:
+                    result.add(importer)
+                    stack.append(importer)
+        return result
+
+    def modules_to_reload(self):
+        """The minimal set of modules to purge and re-execute for the current edits."""
+        changed = self.changed()
+        return self.importers(changed) if changed else set()
+
+    def source_exists(self, name):
+        entry = self._entries.get(name)
+        return entry is not None and os.path.isfile(entry.path)
@@ -0,0 +1,196 @@
+"""Detection of addon code that survives hot reloads and of growing memory.
+
+A reload drops the addon's modules from ``sys.modules``, but anything Blender
+(or another addon) still references -- a class left registered, a handler or
+msgbus subscription that was never removed, a closure stored on a
+``bpy.types`` property -- keeps the old module generation alive, with every
+object it reaches. :class:`LeakTracker` finds both sides of that:
+
+* every load of the addon is a *generation*; weak references to its modules
+  and the classes they define show which generations are still alive after
+  they were replaced (the *stale* ones);
+* while tracing, ``tracemalloc`` snapshots taken around each reload are
+  diffed to list the allocation sites that keep growing.
+
+Tracing slows every allocation down, so it only runs between ``start`` and
+``stop``; generation tracking is a handful of weak references per reload and
+is always on.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+import weakref
+
+from .reload_timing import owned_by
+
+DEFAULT_FRAMES = 1
+
+# Allocations made by the import machinery and by tracing itself are noise.
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _kb(size):
+    return round(size / 1024, 1)
+
+
+class _Generation:
+    __slots__ = ("number", "package", "loaded_at", "modules", "classes")
+
+    def __init__(self, number, package):
+        self.number = number
+        self.package = package
+        self.loaded_at = time.time()
+        self.modules = []  # weak references
+        self.classes = []  # (module name, attribute, weak reference)
+
+
+class LeakTracker:
+    """Tracks addon generations and, while tracing, allocation growth."""
+
+    def __init__(self):
+        self.generations = []
+        self._seen = weakref.WeakSet()  # modules and classes already in a generation
+        self._baseline = None
+        self._before = None
+        self._after = None
+        self._started_tracing = False
+
+    # --- generations --------------------------------------------------------
+
+    def record_generation(self, package):
+        """Remember the addon's currently loaded modules and their classes.
+
+        Objects already tracked (modules an incremental reload kept, or a
+        rolled-back previous version) stay in the generation that loaded them.
+        """
+        generation = _Generation(len(self.generations) + 1, package)
+        for name, module in list(sys.modules.items()):
+            if module is None or not owned_by(name, package) or module in self._seen:
+                continue
+            self._seen.add(module)
+            generation.modules.append(weakref.ref(module))
+            for attribute, value in list(vars(module).items()):
+                if (
+                    isinstance(value, type)
+                    and getattr(value, "__module__", None) == name
+                    and value not in self._seen
+                ):
+                    self._seen.add(value)
+                    generation.classes.append((name, attribute, weakref.ref(value)))
+        if generation.modules or generation.classes:
+            self.generations.append(generation)
+        return generation
+
+    def stale(self):
+        """Replaced generations that are still (partly) alive, oldest first."""
+        gc.collect()
+        found = []
+        for generation in self.generations:
+            modules = []
+            for ref in generation.modules:
+                module = ref()
+                if (
+                    module is not None
+                    and sys.modules.get(module.__name__) is not module
+                ):
+                    modules.append(module.__name__)
+            classes = []
+            for module_name, attribute, ref in generation.classes:
+                cls = ref()
+                current = getattr(sys.modules.get(module_name), attribute, None)
+                if cls is not None and current is not cls:
+                    classes.append(f"{module_name}.{cls.__qualname__}")
+            if modules or classes:
+                found.append(
+                    {
+                        "generation": generation.number,
+                        "package": generation.package,
+                        "loaded_at": generation.loaded_at,
+                        "modules": sorted(modules),
+                        "classes": sorted(classes),
+                    }
+                )
+        return found
+
+    # --- allocation tracing -------------------------------------------------
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self, frames=DEFAULT_FRAMES):
+        """Start tracing (unless already on) and take the baseline snapshot."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(max(1, int(frames)))
+            self._started_tracing = True
+        self._baseline = self._snapshot()
+        self._before = self._after = None
+
+    def stop(self):
+        """Stop tracing, if it was started here, and drop the snapshots."""
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+        self._baseline = self._before = self._after = None
+
+    def _snapshot(self):
+        gc.collect()
+        return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+    def before_reload(self):
+        if self.tracing and self._baseline is not None:
+            self._before = self._snapshot()
+
+    def after_reload(self):
+        if self.tracing and self._baseline is not None:
+            self._after = self._snapshot()
+
+    @staticmethod
+    def _growth(new, old, limit):
+        rows = []
+        key = "traceback" if tracemalloc.get_traceback_limit() > 1 else "lineno"
+        for stat in new.compare_to(old, key):
+            if stat.size_diff <= 0:
+                continue
+            rows.append(
+                {
+                    "site": [
+                        f"{frame.filename}:{frame.lineno}" for frame in stat.traceback
+                    ],
+                    "size_diff_kb": _kb(stat.size_diff),
+                    "count_diff": stat.count_diff,
+                    "size_kb": _kb(stat.size),
+                }
+            )
+            if len(rows) == limit:
+                break
+        return rows
+
+    def report(self, limit=10):
+        stale = self.stale()
+        result = {
+            "tracing": self.tracing and self._baseline is not None,
+            "generations": len(self.generations),
+            "stale_generations": len(stale),
+            "stale_modules": sum(len(g["modules"]) for g in stale),
+            "stale_classes": sum(len(g["classes"]) for g in stale),
+            "stale": stale,
+        }
+        if result["tracing"]:
+            current = self._snapshot()
+            traced, peak = tracemalloc.get_traced_memory()
+            result["traced_kb"] = _kb(traced)
+            result["peak_kb"] = _kb(peak)
+            result["growth_since_start"] = self._growth(current, self._baseline, limit)
+            if self._before is not None and self._after is not None:
+                result["growth_last_reload"] = self._growth(
+                    self._after, self._before, limit
+                )
+        return result
@@ -0,0 +1,97 @@
+"""Counters and rolling latency samples collected inside the probe server.
+
+Every metric is either a counter or a :class:`RingBuffer` of recent samples:
+a fixed-size array overwritten in a circle, so recording a sample costs the
+same no matter how long Blender has been running, and memory stays bounded.
+Summaries (percentiles, mean) are only computed when the ``stats`` command
+asks for them.
+"""
+
+import array
+import collections
+import math
+import threading
+
+WINDOW = 1024
+# Series beyond this many (names can come from client-supplied actions) are
+# folded into one "<name prefix>.other" series.
+MAX_SERIES = 64
+
+
+class RingBuffer:
+    """The last ``size`` samples of one measurement, plus lifetime totals."""
+
+    def __init__(self, size=WINDOW):
+        self._samples = array.array("d", bytes(8 * size))
+        self._next = 0
+        self.count = 0  # samples ever recorded
+        self.total = 0.0
+
+    def add(self, value):
+        self._samples[self._next] = value
+        self._next = (self._next + 1) % len(self._samples)
+        self.count += 1
+        self.total += value
+
+    def window(self):
+        """The retained samples, oldest first."""
+        if self.count < len(self._samples):
+            return self._samples[: self.count].tolist()
+        return (self._samples[self._next :] + self._samples[: self._next]).tolist()
+
+    def summary(self):
+        values = sorted(self.window())
+        if not values:
+            return {"count": 0}
+
+        def percentile(fraction):
+            return round(
+                values[min(len(values) - 1, math.ceil(fraction * len(values)) - 1)], 3
+            )
+
+        return {
+            "count": self.count,
+            "window": len(values),
+            "last": round(self.window()[-1], 3),
+            "min": round(values[0], 3),
+            "mean": round(sum(values) / len(values), 3),
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "max": round(values[-1], 3),
+        }
+
+
+class Metrics:
+    """Thread-safe registry of named counters and sample series."""
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.counters = collections.Counter()
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def observe(self, name, value):
+        with self._lock:
+            buffer = self.series.get(name)
+            if buffer is None:
+                if len(self.series) >= MAX_SERIES:
+                    name = name.rsplit(".", 1)[0] + ".other"
+                    buffer = self.series.get(name)
+                if buffer is None:
+                    buffer = self.series[name] = RingBuffer(self.window)
+            buffer.add(value)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.series.clear()
+
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self.counters)
+            series = {name: buffer.summary() for name, buffer in self.series.items()}
+        return {"counters": counters, "series": dict(sorted(series.items()))}
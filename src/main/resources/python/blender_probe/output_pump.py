@@ -0,0 +1,172 @@
+"""Buffered stdout/stderr that never blocks the thread printing.
+
+Blender's stdout is a pipe read by the IDE. When the IDE falls behind, the
+pipe fills up and every ``print`` blocks until it drains; from the main
+thread that freezes Blender's UI. :class:`OutputPump` swaps ``sys.stdout``
+and ``sys.stderr`` for streams that only append to an in-memory buffer,
+which a background thread writes out to the original streams.
+
+The buffer is bounded (in characters): a write that does not fit is dropped
+(and counted), and once there is room again a note saying how much was lost
+is written first. Lines written with :meth:`OutputPump.write_line` (the
+``BLENDER_PROBE_*::`` lines the IDE parses) are never dropped. Output from
+both streams shares one queue, so everything arrives in the order it was
+written.
+"""
+
+import collections
+import io
+import threading
+
+
+class PumpedStream(io.TextIOBase):
+    """Text stream that hands every write to an :class:`OutputPump`."""
+
+    def __init__(self, pump, target):
+        self._pump = pump
+        self._target = target
+
+    def write(self, text):
+        self._pump.write(self._target, text)
+        return len(text)
+
+    def flush(self):
+        pass  # the pump thread flushes after every batch
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return False
+
+    @property
+    def encoding(self):
+        return getattr(self._target, "encoding", "utf-8")
+
+    @property
+    def errors(self):
+        return getattr(self._target, "errors", "strict")
+
+    def fileno(self):
+        return self._target.fileno()
+
+
+class OutputPump:
+    """Bounded queue of pending output plus the thread that writes it out."""
+
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        self.pending_chars = 0
+        self.dropped_writes = 0
+        self.dropped_chars = 0
+        self._unreported_drops = 0
+        self._queue = collections.deque()  # (target stream, text)
+        self._mid_line = set()  # ids of targets whose queued output ends mid-line
+        self._cond = threading.Condition()
+        self._busy = False  # the pump thread is writing a batch out
+        self._stopping = False
+        self._thread = None
+        self._saved = None
+
+    # --- producer side (any thread) -----------------------------------------
+
+    def write(self, target, text, force=False):
+        if not text:
+            return
+        size = len(text)
+        with self._cond:
+            if not force and self.pending_chars + size > self.max_chars:
+                self.dropped_writes += 1
+                self.dropped_chars += size
+                self._unreported_drops += size
+                return
+            if self._unreported_drops:
+                note = f"[BlenderProbe] ... {self._unreported_drops} characters of output dropped\n"
+                self._unreported_drops = 0
+                self._append(target, note, own_line=True)
+            self._append(target, text, own_line=force)
+            self._cond.notify()
+
+    def _append(self, target, text, own_line):
+        if own_line and id(target) in self._mid_line:
+            text = "\n" + text  # must start a line of its own to be recognised
+        self._queue.append((target, text))
+        self.pending_chars += len(text)
+        if text.endswith("\n"):
+            self._mid_line.discard(id(target))
+        else:
+            self._mid_line.add(id(target))
+
+    def write_line(self, line):
+        """Write one complete line to stdout that is never dropped."""
+        self.write(self._saved[0], line + "\n", force=True)
+
+    # --- lifecycle ----------------------------------------------------------
+
+    def install(self, sys_module):
+        """Replace ``sys_module.stdout``/``stderr`` and start the pump thread."""
+        self._saved = (sys_module.stdout, sys_module.stderr)
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="Blender Probe output", daemon=True
+        )
+        self._thread.start()
+        sys_module.stdout = PumpedStream(self, self._saved[0])
+        sys_module.stderr = PumpedStream(self, self._saved[1])
+
+    def uninstall(self, sys_module, timeout=2.0):
+        """Put the original streams back after writing out what is pending."""
+        if self._saved is None:
+            return
+        sys_module.stdout, sys_module.stderr = self._saved
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        self._saved = None
+
+    def drain(self, timeout=2.0):
+        """Wait until everything queued so far has been written out."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._queue and not self._busy, timeout
+            )
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._stopping)
+                if not self._queue and self._stopping:
+                    return
+                batch = list(self._queue)
+                self._queue.clear()
+                self._busy = True
+            # Blocking writes happen here, off the thread that printed.
+            touched = []
+            for target, text in batch:
+                try:
+                    target.write(text)
+                except Exception:
+                    pass  # a closed or broken stream must not kill the pump
+                if target not in touched:
+                    touched.append(target)
+            for target in touched:
+                try:
+                    target.flush()
+                except Exception:
+                    pass
+            with self._cond:
+                self.pending_chars -= sum(len(text) for _target, text in batch)
+                self._busy = False
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "max_chars": self.max_chars,
+                "pending_chars": self.pending_chars,
+                "dropped_writes": self.dropped_writes,
+                "dropped_chars": self.dropped_chars,
+            }
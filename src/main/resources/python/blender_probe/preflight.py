@@ -0,0 +1,143 @@
+"""Off-main-thread syntax check of an addon before it is reloaded.
+
+A reload unregisters and purges the addon before re-importing it, so a syntax
+error found during the import leaves Blender with no addon at all.
+:class:`PreflightCompiler` byte-compiles the addon's changed sources first, on
+a background thread; a ``SyntaxError`` is reported to the IDE and the reload
+is never queued, so the running addon is left untouched.
+
+Only sources the reload will import are checked: the addon's loaded modules,
+plus package modules they import statically that are not loaded yet (new
+files). Tests, scripts and other files in the addon directory that the addon
+never imports cannot block a reload.
+
+Bytecode is written where the import system will look for it
+(``importlib.util.cache_from_source``, which honours ``sys.pycache_prefix``),
+so the main thread then only executes already-compiled code.
+"""
+
+import collections
+import importlib.util
+import os
+import py_compile
+import sys
+import threading
+
+from .import_graph import module_imports, stat_key
+from .reload_timing import owned_by
+
+
+class PreflightError(Exception):
+    """A source file of the addon does not compile."""
+
+    def __init__(self, path, lineno, message):
+        self.path = path
+        self.lineno = lineno
+        self.message = message
+        location = f"{path}:{lineno}" if lineno else path
+        super().__init__(f"{location}: {message}")
+
+
+def _loaded_sources(module_name):
+    """``{name: path}`` of the addon's loaded source modules, or of its entry file."""
+    sources = {}
+    for name, module in list(sys.modules.items()):
+        if module is None or not owned_by(name, module_name):
+            continue
+        path = getattr(module, "__file__", None)
+        if path and path.endswith(".py"):
+            sources[name] = path
+    if module_name not in sys.modules:
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except (ImportError, ValueError):
+            spec = None
+        if spec is not None and spec.origin and spec.origin.endswith(".py"):
+            sources[module_name] = spec.origin
+    return sources
+
+
+def _module_file(package_dir, package, name):
+    """Source file of submodule ``name`` of the package in ``package_dir``."""
+    base = os.path.join(package_dir, *name[len(package) + 1 :].split("."))
+    for path in (base + ".py", os.path.join(base, "__init__.py")):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+class PreflightCompiler:
+    """Compiles addon sources that changed since they last compiled cleanly.
+
+    Safe to share between threads; compilation itself runs on the caller's
+    thread.
+    """
+
+    def __init__(self):
+        # source path -> (stat key when it last compiled, its package imports)
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def check(self, module_name):
+        """Compile the addon's changed sources; return how many were compiled.
+
+        Raises :class:`PreflightError` for the first file that fails. The
+        imports of every checked file are followed, so package modules that
+        are not loaded yet but will be imported are checked as well.
+        """
+        sources = _loaded_sources(module_name)
+        entry = sources.get(module_name)
+        package_dir = None
+        if entry is not None and os.path.basename(entry) == "__init__.py":
+            package_dir = os.path.dirname(entry)
+        pending = collections.deque(sorted(sources.items()))
+        compiled = 0
+        while pending:
+            name, path = pending.popleft()
+            key = stat_key(path)
+            if key is None:
+                continue
+            with self._lock:
+                known = self._compiled.get(path)
+            if known is not None and known[0] == key:
+                imports = known[1]
+            else:
+                self._compile(path)
+                is_package = os.path.basename(path) == "__init__.py"
+                imports = module_imports(path, name, is_package, module_name)
+                with self._lock:
+                    self._compiled[path] = (key, imports)
+                compiled += 1
+            if package_dir is None:
+                continue
+            for target, attr in imports:
+                for candidate in (f"{target}.{attr}" if attr else None, target):
+                    if not candidate or candidate in sources:
+                        continue
+                    candidate_path = _module_file(package_dir, module_name, candidate)
+                    if candidate_path is not None:
+                        sources[candidate] = candidate_path
+                        pending.append((candidate, candidate_path))
+        return compiled
+
+    @staticmethod
+    def _compile(path):
+        try:
+            py_compile.compile(
+                path, cfile=importlib.util.cache_from_source(path), doraise=True
+            )
+        except py_compile.PyCompileError as e:
+            error = e.exc_value
+            raise PreflightError(
+                path,
+                getattr(error, "lineno", None),
+                f"{e.exc_type_name}: {_describe(error)}",
+            ) from None
+        except OSError:
+            # e.g. a read-only tree: the source compiled, the cache just
+            # could not be written. The import will compile it instead.
+            pass
+
+
+def _describe(error):
+    return getattr(error, "msg", None) or str(error)
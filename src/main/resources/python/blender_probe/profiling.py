@@ -0,0 +1,92 @@
+"""cProfile capture for the ``profile`` probe command.
+
+A capture wraps one ``cProfile.Profile`` run on Blender's main thread. Its
+result is returned in two forms: the raw pstats data, marshalled exactly as
+``pstats.Stats.dump_stats`` writes a ``.prof`` file (so the IDE, ``snakeviz``
+or ``pstats`` can load it), and a short JSON summary of the most expensive
+functions for quick display.
+"""
+
+import cProfile
+import marshal
+import os
+import pstats
+import re
+import time
+
+# Functions listed in the JSON summary, most cumulative time first.
+SUMMARY_SIZE = 20
+
+
+class ProfilerBusy(RuntimeError):
+    """Another profiler (cProfile, a debugger's tracer, ...) is already active."""
+
+
+class Capture:
+    """One cProfile run that can be started and stopped across timer ticks."""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.started = None
+        self.elapsed = 0.0
+
+    def start(self):
+        try:
+            self.profile.enable()
+        except ValueError as e:
+            # Python 3.12+ refuses to stack profilers on one thread.
+            raise ProfilerBusy(f"Cannot start profiling: {e}") from None
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.profile.disable()
+        self.elapsed += time.perf_counter() - self.started
+
+    def run(self, func, *args, **kwargs):
+        """Profile one call of ``func``; return its result."""
+        self.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.stop()
+
+    def data(self):
+        """The pstats data, marshalled in the ``.prof`` file format."""
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)
+
+    def summary(self, limit=SUMMARY_SIZE):
+        stats = pstats.Stats(self.profile)
+        rows = []
+        for func, (cc, nc, tt, ct, _callers) in stats.stats.items():
+            rows.append(
+                {
+                    "function": pstats.func_std_string(func),
+                    "ncalls": nc,
+                    "primitive_calls": cc,
+                    "tottime_ms": round(tt * 1000, 3),
+                    "cumtime_ms": round(ct * 1000, 3),
+                }
+            )
+        rows.sort(key=lambda row: row["cumtime_ms"], reverse=True)
+        return {
+            "elapsed_ms": round(self.elapsed * 1000, 3),
+            "total_calls": stats.total_calls,
+            "total_tt_ms": round(stats.total_tt * 1000, 3),
+            "top": rows[:limit],
+        }
+
+
+def write_profile(data, directory, label):
+    """Write marshalled pstats ``data`` to a new ``.prof`` file; return its path."""
+    os.makedirs(directory, exist_ok=True)
+    safe_label = re.sub(r"[^\w.-]+", "_", label).strip("_") or "profile"
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(directory, f"{safe_label}-{stamp}.prof")
+    suffix = 1
+    while os.path.exists(path):
+        path = os.path.join(directory, f"{safe_label}-{stamp}-{suffix}.prof")
+        suffix += 1
+    with open(path, "wb") as fh:
+        fh.write(data)
+    return path
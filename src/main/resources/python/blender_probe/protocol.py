@@ -0,0 +1,263 @@
+"""Wire format spoken between the IDE and the in-Blender probe server.
+
+Every message is a *frame*: a fixed-size ASCII header, space-padded to
+:data:`HEADER_SIZE` bytes, followed by a UTF-8 JSON section and optionally a
+binary body. The header holds whitespace-separated fields:
+
+* ``"<json_len>"`` -- JSON only (the original format, still what most
+  commands use);
+* ``"<json_len> <body_len>"`` -- JSON followed by ``body_len`` raw bytes;
+* ``"<json_len> *"`` -- JSON followed by a chunked body: a sequence of
+  ``HEADER_SIZE``-byte chunk headers (``"<chunk_len>"``), each followed by that
+  many bytes, terminated by a zero-length chunk. This lets a sender stream a
+  payload of unknown or very large size.
+
+Every section (the JSON, a whole unchunked body, each chunk) is limited to
+``max_chunk_size`` bytes, so large payloads must be chunked but have no total
+cap. Binary bodies carry data that would be wasteful as JSON, such as vertex
+arrays, images or script bundles.
+
+A connection whose first frame carries an ``"id"`` is a long-lived session: the
+server answers each frame with a framed reply echoing that id and keeps reading
+until the client closes. Frames without an id keep the original one-shot
+behaviour (``ACK`` and close), so older clients continue to work unchanged.
+
+:class:`FrameDecoder` parses frames incrementally and without intermediate
+copies: the caller ``recv_into``-s :meth:`FrameDecoder.buffer`, which always
+points at the exact bytes still missing from the current section, so payload
+bytes land directly in their final preallocated buffer. :func:`read_frame` is
+the blocking equivalent for simple clients.
+"""
+
+import collections
+import json
+
+HEADER_SIZE = 64
+MAX_CHUNK_SIZE = 10 * 1024 * 1024
+
+# Header marker for a chunked body.
+CHUNKED = "*"
+
+Frame = collections.namedtuple("Frame", ["message", "body"])
+Frame.__doc__ = """A decoded frame: its JSON value and binary body (or ``None``)."""
+
+
+class ProtocolError(Exception):
+    """Raised when a peer sends something that is not a valid frame."""
+
+
+def _header(*fields):
+    text = " ".join(str(f) for f in fields)
+    if len(text) > HEADER_SIZE:
+        raise ProtocolError(f"Header too long: {text!r}")
+    return f"{text:<{HEADER_SIZE}}".encode("ascii")
+
+
+def encode_frame(message, body=None):
+    """Serialize ``message`` (plus an optional binary ``body``) as one frame.
+
+    Returns ``bytes`` for a JSON-only frame. With a body, returns a list of
+    buffers ``[header_and_json, memoryview(body)]`` so the body is never copied;
+    send them in order.
+    """
+    payload = json.dumps(message).encode("utf-8")
+    if body is None:
+        return _header(len(payload)) + payload
+    view = memoryview(body).cast("B")
+    return [_header(len(payload), view.nbytes) + payload, view]
+
+
+def encode_chunked_frame(message, body, chunk_size=MAX_CHUNK_SIZE):
+    """Encode ``message`` with ``body`` split into chunks of ``chunk_size``.
+
+    Returns a list of buffers; body chunks are memoryview slices, not copies.
+    """
+    payload = json.dumps(message).encode("utf-8")
+    view = memoryview(body).cast("B")
+    parts = [_header(len(payload), CHUNKED) + payload]
+    for start in range(0, view.nbytes, chunk_size):
+        chunk = view[start : start + chunk_size]
+        parts.append(_header(chunk.nbytes))
+        parts.append(chunk)
+    parts.append(_header(0))
+    return parts
+
+
+def _parse_length(token, what, max_chunk_size):
+    try:
+        length = int(token)
+    except ValueError:
+        raise ProtocolError(f"Invalid {what} length header received.") from None
+    if length < 0:
+        raise ProtocolError(f"Invalid {what} length: {length}")
+    if length > max_chunk_size:
+        raise ProtocolError(f"Message too large: {what} of {length} bytes.")
+    return length
+
+
+def parse_header(raw, max_chunk_size=MAX_CHUNK_SIZE):
+    """Return ``(json_len, body_len)`` from a raw frame header.
+
+    ``body_len`` is ``None`` for a JSON-only frame and :data:`CHUNKED` for a
+    chunked body.
+    """
+    try:
+        fields = bytes(raw).decode("ascii").split()
+    except UnicodeDecodeError:
+        raise ProtocolError("Invalid message length header received.") from None
+    if not 1 <= len(fields) <= 2:
+        raise ProtocolError("Invalid message length header received.")
+
+    json_len = _parse_length(fields[0], "message", max_chunk_size)
+    if len(fields) == 1:
+        return json_len, None
+    if fields[1] == CHUNKED:
+        return json_len, CHUNKED
+    return json_len, _parse_length(fields[1], "body", max_chunk_size)
+
+
+def decode_body(body):
+    """Decode a frame's JSON section."""
+    try:
+        return json.loads(bytes(body).decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ProtocolError(f"Invalid JSON body: {e}") from None
+
+
+class FrameDecoder:
+    """Incremental, copy-free frame parser.
+
+    Use it as ``n = sock.recv_into(decoder.buffer()); frame = decoder.advance(n)``.
+    :meth:`buffer` is a writable view of exactly the bytes the current section
+    still needs, so one ``recv_into`` never reads past the end of a frame and
+    body bytes are received straight into their preallocated destination.
+    Memory held is bounded by ``max_chunk_size`` per section plus whatever a
+    chunked body has accumulated so far.
+    """
+
+    _HEADER, _JSON, _BODY, _CHUNK_HEADER, _CHUNK = range(5)
+
+    def __init__(self, max_chunk_size=MAX_CHUNK_SIZE):
+        self.max_chunk_size = max_chunk_size
+        self._header_buf = bytearray(HEADER_SIZE)
+        self._start_frame()
+
+    def _start_frame(self):
+        self._message = None
+        self._chunks = []
+        self._body_len = None
+        self._expect(self._HEADER, self._header_buf)
+
+    def _expect(self, state, target):
+        self._state = state
+        self._target = target
+        self._view = memoryview(target)
+        self._filled = 0
+
+    @property
+    def buffered(self):
+        """Bytes received for the current, still incomplete, section."""
+        return self._filled
+
+    @property
+    def idle(self):
+        """True between frames."""
+        return self._state == self._HEADER and self._filled == 0
+
+    def buffer(self):
+        """Writable view of the bytes the current section still needs."""
+        return self._view[self._filled :]
+
+    def advance(self, nbytes):
+        """Account for ``nbytes`` written into :meth:`buffer`.
+
+        Returns the completed :class:`Frame`, or ``None`` if more bytes are
+        needed. At most one frame completes per call.
+        """
+        self._filled += nbytes
+        while self._filled == len(self._target):
+            frame = self._section_complete()
+            if frame is not None:
+                return frame
+        return None
+
+    def feed(self, data):
+        """Copy ``data`` in and return the list of frames it completed.
+
+        Convenience for push-style callers and tests; sockets should use
+        :meth:`buffer` / :meth:`advance` to avoid the copy.
+        """
+        frames = []
+        data = memoryview(data).cast("B")
+        while data:
+            view = self.buffer()
+            n = min(len(view), len(data))
+            view[:n] = data[:n]
+            data = data[n:]
+            frame = self.advance(n)
+            if frame is not None:
+                frames.append(frame)
+        return frames
+
+    def _section_complete(self):
+        state = self._state
+        if state == self._HEADER:
+            json_len, self._body_len = parse_header(
+                self._header_buf, self.max_chunk_size
+            )
+            self._expect(self._JSON, bytearray(json_len))
+        elif state == self._JSON:
+            self._message = decode_body(self._target)
+            if self._body_len is None:
+                return self._finish(None)
+            if self._body_len == CHUNKED:
+                self._expect(self._CHUNK_HEADER, self._header_buf)
+            else:
+                self._expect(self._BODY, bytearray(self._body_len))
+        elif state == self._BODY:
+            return self._finish(self._target)
+        elif state == self._CHUNK_HEADER:
+            chunk_len, extra = parse_header(self._header_buf, self.max_chunk_size)
+            if extra is not None:
+                raise ProtocolError("Invalid chunk header received.")
+            if chunk_len == 0:
+                return self._finish(self._join_chunks())
+            self._expect(self._CHUNK, bytearray(chunk_len))
+        else:
+            self._chunks.append(self._target)
+            self._expect(self._CHUNK_HEADER, self._header_buf)
+        return None
+
+    def _join_chunks(self):
+        if len(self._chunks) == 1:
+            return self._chunks[0]
+        return bytearray().join(self._chunks)
+
+    def _finish(self, body):
+        frame = Frame(self._message, body)
+        self._start_frame()
+        return frame
+
+
+def recv_frame(conn, max_chunk_size=MAX_CHUNK_SIZE):
+    """Read one :class:`Frame` from a blocking socket.
+
+    Returns ``None`` on a clean end of stream (the peer closed between frames);
+    a connection closed part-way through a frame raises :class:`ProtocolError`.
+    """
+    decoder = FrameDecoder(max_chunk_size)
+    while True:
+        n = conn.recv_into(decoder.buffer())
+        if n == 0:
+            if decoder.idle:
+                return None
+            raise ProtocolError("Connection closed mid-frame.")
+        frame = decoder.advance(n)
+        if frame is not None:
+            return frame
+
+
+def read_frame(conn):
+    """Read one frame from a blocking socket and return its JSON value."""
+    frame = recv_frame(conn)
+    return None if frame is None else frame.message
@@ -0,0 +1,251 @@
+"""High-resolution timing of the phases of an addon hot reload.
+
+:class:`ReloadTimer` measures the four phases of ``deep_reload_addon``
+(unregister, purge, import, register; plus rollback when a reload fails) and,
+within them, how long each addon submodule took to execute and how long each
+class took to register. The result is a plain dict, so it can go straight into
+a completion record and the server's rolling reload history.
+
+Per-module import times come from :class:`ImportTimer`, a ``sys.meta_path``
+hook that wraps the loader of every module imported while it is active (the
+addon's own submodules, wheel dependencies, stdlib modules loaded for the
+first time). Each module reports both its inclusive time and its *self* time
+(excluding nested imports), so a slow leaf module is not hidden behind the
+package that imported it, and :func:`format_importtime` renders the records as
+the tree ``python -X importtime`` prints. The hook is installed process-wide
+but only times imports made by the thread that installed it; imports on other
+threads (the socket thread, an addon's worker threads) pass straight through.
+
+The timing loader is a proxy, so while the hook is active a spec returned by
+``importlib.util.find_spec`` carries it as ``spec.loader`` until the module
+has been loaded. A module never sees it: the real loader is put back on
+``__loader__`` and ``__spec__.loader`` before the module's code runs.
+"""
+
+import contextlib
+import sys
+import threading
+import time
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+class _TimedLoader:
+    """Loader proxy that times ``exec_module`` and then gets out of the way."""
+
+    def __init__(self, loader, timer):
+        self._loader = loader
+        self._timer = timer
+        self._create_time = 0.0
+
+    def create_module(self, spec):
+        # Extension modules do their loading (dlopen, PyInit) here.
+        started = time.perf_counter()
+        try:
+            return self._loader.create_module(spec)
+        finally:
+            self._create_time = time.perf_counter() - started
+
+    def exec_module(self, module):
+        # Hand the real loader back before the module's code runs, so checks
+        # like isinstance(__loader__, SourceFileLoader) or importlib.resources
+        # lookups through __spec__.loader see what they would without the hook.
+        module.__loader__ = self._loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self._loader
+        with self._timer.measure(module.__name__, already=self._create_time):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportTimer:
+    """``sys.meta_path`` finder that times the loading of modules.
+
+    It never finds anything itself: it asks the finders after it for the spec
+    and swaps in a timing loader. Use it as a context manager around the
+    imports to measure. Every module imported while it is active is timed
+    (callers pick out their own package with :func:`owned_by`), but only
+    imports made by the thread that entered it.
+    """
+
+    def __init__(self):
+        # (name, inclusive seconds, self seconds, nesting depth), in finish order
+        self.records = []
+        self._stack = []  # child time accumulated by each module still executing
+        self._thread = None
+
+    def find_spec(self, name, path=None, target=None):
+        if threading.get_ident() != self._thread:
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    @contextlib.contextmanager
+    def measure(self, name, already=0.0):
+        """Time one module; ``already`` is time spent on it before this call."""
+        self._stack.append(0.0)
+        started = time.perf_counter() - already
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.records.append((name, elapsed, elapsed - children, len(self._stack)))
+
+    def __enter__(self):
+        self._thread = threading.get_ident()
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            sys.meta_path.remove(self)
+        except ValueError:
+            pass
+        return False
+
+
+@contextlib.contextmanager
+def time_calls(namespace, attribute, records, key):
+    """Temporarily wrap ``namespace.attribute`` to time each call.
+
+    Each call appends ``(key(first_arg), seconds)`` to ``records``. Does nothing
+    if ``namespace`` has no such attribute, so callers need not check first.
+    """
+    original = getattr(namespace, attribute, None)
+    if original is None:
+        yield
+        return
+
+    def timed(obj, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return original(obj, *args, **kwargs)
+        finally:
+            records.append((key(obj), time.perf_counter() - started))
+
+    setattr(namespace, attribute, timed)
+    try:
+        yield
+    finally:
+        setattr(namespace, attribute, original)
+
+
+class ReloadTimer:
+    """Collects the timing breakdown of one reload; see :meth:`report`."""
+
+    PHASES = ("unregister", "purge", "import", "register")
+
+    def __init__(self, module_name, mode):
+        self.module_name = module_name
+        self.mode = mode
+        self.status = "ok"
+        self.phases = {}
+        # Everything the reload imports, for the import profile; the report
+        # itself only lists the addon's own modules.
+        self.imports = ImportTimer()
+        self.classes = []  # (class, seconds) for each register_class call
+        self.rolled_back = False
+        self._started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = (
+                self.phases.get(name, 0.0) + time.perf_counter() - started
+            )
+
+    def report(self):
+        """The breakdown as JSON-serializable data, slowest entries first."""
+        imports = sorted(
+            (r for r in self.imports.records if owned_by(r[0], self.module_name)),
+            key=lambda r: r[2],
+            reverse=True,
+        )
+        classes = sorted(self.classes, key=lambda r: r[1], reverse=True)
+        phases = {name: _ms(self.phases.get(name, 0.0)) for name in self.PHASES}
+        if "rollback" in self.phases:
+            phases["rollback"] = _ms(self.phases["rollback"])
+        return {
+            "module": self.module_name,
+            "mode": self.mode,
+            "status": self.status,
+            "rolled_back": self.rolled_back,
+            "timestamp": time.time(),
+            "total_ms": _ms(time.perf_counter() - self._started),
+            "phases": phases,
+            "imports": [
+                {"module": name, "ms": _ms(inclusive), "self_ms": _ms(own)}
+                for name, inclusive, own, _depth in imports
+            ],
+            "classes": [
+                {"class": class_name(cls), "ms": _ms(seconds)}
+                for cls, seconds in classes
+            ],
+        }
+
+
+def owned_by(name, package):
+    return name == package or name.startswith(package + ".")
+
+
+def import_summary(records, limit=20):
+    """Totals of :class:`ImportTimer` ``records`` plus the slowest modules by self time."""
+    slowest = sorted(records, key=lambda r: r[2], reverse=True)[:limit]
+    return {
+        "modules": len(records),
+        "total_ms": _ms(sum(r[1] for r in records if r[3] == 0)),
+        "slowest": [
+            {"module": name, "self_ms": _ms(own), "ms": _ms(inclusive)}
+            for name, inclusive, own, _depth in slowest
+        ],
+    }
+
+
+def format_importtime(records):
+    """``records`` of an :class:`ImportTimer` in ``python -X importtime`` layout.
+
+    One line per module in finish order, so a module's imports are listed
+    (indented one level deeper) just above it; times are in microseconds.
+    """
+    lines = ["import time: self [us] | cumulative | imported package"]
+    for name, inclusive, own, depth in records:
+        lines.append(
+            f"import time: {round(own * 1e6):>9} | {round(inclusive * 1e6):>10} | "
+            f"{'  ' * depth}{name}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def class_name(cls):
+    return (
+        f"{getattr(cls, '__module__', '?')}.{getattr(cls, '__qualname__', repr(cls))}"
+    )
+
+
+def summarize(report, top=3):
+    """One log line naming the phase totals and the slowest modules."""
+    phases = ", ".join(f"{name} {ms:.1f} ms" for name, ms in report["phases"].items())
+    line = f"Reload took {report['total_ms']:.1f} ms ({phases})"
+    slowest = report["imports"][:top]
+    if slowest:
+        line += "; slowest imports: " + ", ".join(
+            f"{entry['module']} {entry['self_ms']:.1f} ms" for entry in slowest
+        )
+    return line
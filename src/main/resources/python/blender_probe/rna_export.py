@@ -0,0 +1,162 @@
+"""Bulk export of RNA array data as raw bytes.
+
+``export_array`` resolves a path below ``bpy.data`` (e.g.
+``meshes["Cube"].vertices``) and copies one attribute of every item into a
+single contiguous buffer with ``foreach_get``, which is what makes exporting a
+multi-million-vertex mesh practical. The probe server sends that buffer as the
+binary body of the completion record (see protocol.py), with the dtype and
+shape needed to interpret it in the JSON part, so the data is never turned
+into JSON.
+"""
+
+import array
+import ast
+import re
+import sys
+
+# RNA property type -> (buffer format, dtype name reported to the client).
+# These are the formats foreach_get copies straight into the buffer; any other
+# (e.g. "b" for a boolean) makes it fall back to converting item by item.
+_TYPES = {
+    "FLOAT": ("f", "float32"),
+    "INT": ("i", "int32"),
+    "BOOLEAN": ("?", "bool"),
+}
+
+# `meshes["Cube"]` or `meshes['Cube']`, then an optional RNA path such as
+# `.uv_layers["UVMap"].data`.
+_ID_PATH = re.compile(r"""^(\w+)\[("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')\](.*)$""")
+
+
+class ExportError(Exception):
+    """Raised for a path or attribute that cannot be exported."""
+
+
+def resolve(data, path):
+    """Resolve ``path`` (relative to ``bpy.data``, prefix optional) to an RNA value."""
+    path = path.strip()
+    if path.startswith("bpy.data."):
+        path = path[len("bpy.data.") :]
+    match = _ID_PATH.match(path)
+    if match is None:
+        raise ExportError(
+            f'Expected a path like meshes["Cube"].vertices, got {path!r}.'
+        )
+    collection, quoted, rest = match.groups()
+    name = ast.literal_eval(quoted)
+
+    ids = getattr(data, collection, None)
+    if ids is None:
+        raise ExportError(f"bpy.data has no collection {collection!r}.")
+    try:
+        target = ids[name]
+    except KeyError:
+        raise ExportError(f"bpy.data.{collection} has no item {name!r}.") from None
+
+    rest = rest.lstrip(".")
+    if not rest:
+        return target
+    try:
+        return target.path_resolve(rest)
+    except ValueError as e:
+        raise ExportError(
+            f"Cannot resolve {rest!r} on {collection}[{quoted}]: {e}"
+        ) from None
+
+
+def _rna_type(owner, attribute):
+    try:
+        return owner.bl_rna.properties[attribute].type
+    except (AttributeError, KeyError):
+        return None
+
+
+def _value_type(value):
+    while _is_sequence(value) and len(value):
+        value = value[0]
+    if isinstance(value, bool):
+        return "BOOLEAN"
+    if isinstance(value, int):
+        return "INT"
+    return "FLOAT"
+
+
+def _is_sequence(value):
+    return hasattr(value, "__len__") and not isinstance(value, (str, bytes))
+
+
+def _item_shape(value):
+    """Shape of one item's value: () for a scalar, (3,) for a vector, (4, 4) for a matrix."""
+    shape = []
+    while _is_sequence(value):
+        shape.append(len(value))
+        if not len(value):
+            break
+        value = value[0]
+    return tuple(shape)
+
+
+def _buffer(rna_type, length):
+    try:
+        typecode, dtype = _TYPES[rna_type]
+    except KeyError:
+        raise ExportError(
+            f"Properties of type {rna_type} cannot be exported as an array."
+        ) from None
+    if typecode == "?":  # array has no bool typecode; one byte per value
+        return memoryview(bytearray(length)).cast("?"), dtype
+    return array.array(typecode, [0]) * length, dtype
+
+
+def export_array(data, path, attribute):
+    """Export ``attribute`` of the RNA value at ``path``.
+
+    ``path`` is either a collection (``meshes["Cube"].vertices``), in which case
+    the attribute of every item is exported, or a single struct whose attribute
+    is itself an array (``images["Render"]`` / ``pixels``).
+
+    Returns ``(meta, buffer)``: ``meta`` holds ``dtype``, ``shape``, ``count``,
+    ``byteorder`` and ``nbytes``; ``buffer`` is the filled ``array.array`` (a
+    ``"?"`` memoryview for booleans).
+    """
+    target = resolve(data, path)
+
+    if hasattr(target, "foreach_get") and _is_sequence(target):
+        count = len(target)
+        if count:
+            if not hasattr(target[0], attribute):
+                raise ExportError(f"Items of {path} have no attribute {attribute!r}.")
+            sample = getattr(target[0], attribute)
+            rna_type = _rna_type(target[0], attribute) or _value_type(sample)
+            item_shape = _item_shape(sample)
+        else:
+            rna_type, item_shape = "FLOAT", ()
+        shape = (count,) + item_shape
+        source = target
+        source_args = (attribute,)
+    else:
+        value = getattr(target, attribute, None)
+        if not hasattr(value, "foreach_get"):
+            raise ExportError(f"{path}.{attribute} is not an exportable array.")
+        rna_type = _rna_type(target, attribute) or _value_type(value)
+        shape = (len(value),)
+        source = value
+        source_args = ()
+
+    length = 1
+    for n in shape:
+        length *= n
+    buffer, dtype = _buffer(rna_type, length)
+    if length:
+        source.foreach_get(*source_args, buffer)
+
+    meta = {
+        "path": path,
+        "attribute": attribute,
+        "dtype": dtype,
+        "shape": list(shape),
+        "count": shape[0],
+        "byteorder": sys.byteorder,
+        "nbytes": len(buffer) * buffer.itemsize,
+    }
+    return meta, buffer
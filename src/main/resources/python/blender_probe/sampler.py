@@ -0,0 +1,120 @@
+"""Low-overhead statistical profiler for one thread (Blender's main thread).
+
+:class:`StackSampler` runs a daemon thread that wakes every ``interval``
+seconds, reads the target thread's current frame from ``sys._current_frames()``
+and counts the stack. Nothing is hooked into the sampled thread, so modal
+operators, draw handlers and timers run at full speed; the cost is one stack
+walk per sample on the sampler thread (plus the GIL it briefly holds).
+
+Stacks are reported in the folded format used by ``flamegraph.pl``,
+speedscope and most flame graph viewers: one line per distinct stack,
+``outer;inner;leaf <count>``.
+"""
+
+import collections
+import os
+import sys
+import threading
+import time
+
+DEFAULT_INTERVAL = 0.01
+MIN_INTERVAL = 0.001
+# Deeper stacks are truncated at the root end, keeping the innermost frames.
+MAX_DEPTH = 128
+# Samples taken while the thread runs no Python code (idle in Blender's C event
+# loop, redrawing, ...) are counted under this pseudo-frame.
+IDLE_FRAME = "<no Python code>"
+
+
+def _frame_label(code):
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed rate while running."""
+
+    def __init__(self, thread_id, interval=DEFAULT_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self._counts = collections.Counter()  # tuple of code objects, root first
+        self._idle = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._sampling_time = 0.0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval=None):
+        """Start (or keep) sampling; samples accumulate until :meth:`reset`."""
+        if interval is not None:
+            self.interval = max(MIN_INTERVAL, float(interval))
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="Blender Probe sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self._thread = None
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._idle = 0
+            self._sampling_time = 0.0
+
+    def sample(self):
+        """Take one sample now; also what the background thread does."""
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None and len(stack) < MAX_DEPTH:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        del frame
+        with self._lock:
+            if stack:
+                stack.reverse()
+                self._counts[tuple(stack)] += 1
+            else:
+                self._idle += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            started = time.perf_counter()
+            self.sample()
+            with self._lock:
+                self._sampling_time += time.perf_counter() - started
+
+    def folded(self):
+        """The aggregated profile as folded-stack text, heaviest stacks first."""
+        with self._lock:
+            counts = list(self._counts.items())
+            idle = self._idle
+        merged = collections.Counter()
+        for stack, count in counts:
+            merged[";".join(_frame_label(code) for code in stack)] += count
+        if idle:
+            merged[IDLE_FRAME] += idle
+        return "".join(f"{stack} {count}\n" for stack, count in merged.most_common())
+
+    def status(self):
+        with self._lock:
+            samples = sum(self._counts.values()) + self._idle
+            return {
+                "running": self.running,
+                "interval_ms": round(self.interval * 1000, 3),
+                "samples": samples,
+                "idle_samples": self._idle,
+                "distinct_stacks": len(self._counts),
+                "sampling_ms": round(self._sampling_time * 1000, 3),
+            }
@@ -0,0 +1,314 @@
+"""Single-threaded, non-blocking network loop for the probe server.
+
+One background thread owns every socket: it accepts clients, reads and parses
+frames incrementally, and flushes queued replies, all driven by a ``selectors``
+loop. Other threads (in practice Blender's main thread delivering completion
+records) never touch a socket; they queue bytes with
+:meth:`ClientConnection.send` and the loop is woken through a socketpair.
+
+What a frame *means* is decided by the ``on_message(client, message, body)``
+callback supplied by ``probe_server.py``; this module only moves bytes.
+"""
+
+import collections
+import selectors
+import socket
+import threading
+import traceback
+
+from .protocol import (
+    MAX_CHUNK_SIZE,
+    FrameDecoder,
+    ProtocolError,
+    encode_chunked_frame,
+    encode_frame,
+)
+
+# Connections beyond this many are refused: the IDE needs one, plus a few for
+# scripts and file watchers.
+MAX_CLIENTS = 16
+# Replies queued for a client that stops reading are capped; past this the
+# client is disconnected rather than letting Blender's memory grow unbounded.
+# A single reply is always accepted by an otherwise drained client, however
+# large (e.g. a bulk array export), so the cap only bounds a backlog.
+MAX_PENDING_OUTPUT = 16 * 1024 * 1024
+# recv_into calls per readiness event before servicing other clients. Each call
+# reads at most one frame section, so this bounds one client's turn.
+MAX_READS_PER_EVENT = 32
+
+
+def log(message):
+    print(f"[BlenderProbe] {message}", flush=True)
+
+
+class ClientConnection:
+    """One accepted client.
+
+    Only the I/O thread reads from or writes to :attr:`sock`; :meth:`send` is
+    safe to call from any thread.
+    """
+
+    def __init__(self, transport, sock, addr):
+        self.transport = transport
+        self.sock = sock
+        self.addr = addr
+        self.decoder = FrameDecoder(transport.max_chunk_size)
+        # Set by the protocol layer from the first frame: True for a persistent
+        # session, False for a one-shot command.
+        self.session = None
+        self.closed = False
+        self._out = collections.deque()
+        self._out_bytes = 0
+        self._close_when_flushed = False
+        self._overflowed = False
+        self._lock = threading.Lock()
+
+    def send(self, data, close_after=False):
+        """Queue bytes for the client; optionally close once they are sent.
+
+        ``data`` is a bytes-like object or a list of them (as returned by
+        :func:`protocol.encode_frame` for frames with a binary body); buffers
+        are queued by reference, not copied.
+        """
+        parts = [
+            memoryview(p).cast("B")
+            for p in (data if isinstance(data, list) else [data])
+        ]
+        size = sum(p.nbytes for p in parts)
+        with self._lock:
+            if self.closed or self._overflowed:
+                raise ConnectionError("client is disconnected")
+            if (
+                self._out_bytes
+                and self._out_bytes + size > self.transport.max_pending_output
+            ):
+                self._overflowed = True
+            else:
+                self._out.extend(parts)
+                self._out_bytes += size
+                self._close_when_flushed = self._close_when_flushed or close_after
+        self.transport.wake(self)
+        if self._overflowed:
+            raise ConnectionError("client is not reading its replies")
+
+    def send_message(self, message, body=None):
+        """Queue one frame (JSON plus optional binary body) for the client.
+
+        Bodies larger than the transport's chunk limit are sent chunked, so a
+        peer enforcing the same limit can still receive them.
+        """
+        limit = self.transport.max_chunk_size
+        if body is not None and memoryview(body).nbytes > limit:
+            self.send(encode_chunked_frame(message, body, limit))
+        else:
+            self.send(encode_frame(message, body))
+
+    @property
+    def wants_write(self):
+        return bool(self._out)
+
+
+class ProbeTransport:
+    """Selector-driven server loop; run :meth:`serve_forever` on one thread."""
+
+    def __init__(
+        self,
+        listener,
+        on_message,
+        max_clients=MAX_CLIENTS,
+        max_pending_output=MAX_PENDING_OUTPUT,
+        max_chunk_size=MAX_CHUNK_SIZE,
+    ):
+        self.on_message = on_message
+        self.max_clients = max_clients
+        self.max_pending_output = max_pending_output
+        self.max_chunk_size = max_chunk_size
+        self.clients = set()
+
+        self._listener = listener
+        self._listener.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(listener, selectors.EVENT_READ, None)
+
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, self)
+
+        self._dirty = set()
+        self._dirty_lock = threading.Lock()
+        self._io_thread = None
+        self._running = False
+
+        # Lifetime I/O counters; only the I/O thread writes them.
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.accepted = 0
+        self.refused = 0
+
+    def serve_forever(self):
+        self._io_thread = threading.get_ident()
+        self._running = True
+        try:
+            while self._running:
+                for key, mask in self._selector.select():
+                    if key.data is None:
+                        self._accept()
+                    elif key.data is self:
+                        self._drain_wakeups()
+                    else:
+                        self._service(key.data, mask)
+        finally:
+            self._shutdown()
+
+    def stats(self):
+        return {
+            "connections": len(self.clients),
+            "accepted": self.accepted,
+            "refused": self.refused,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+    def stop(self):
+        """Ask the loop to exit; safe to call from any thread."""
+        self._running = False
+        self._signal()
+
+    def wake(self, client):
+        """Note that ``client`` has new output (or must be dropped)."""
+        if threading.get_ident() == self._io_thread:
+            self._refresh(client)
+            return
+        with self._dirty_lock:
+            self._dirty.add(client)
+        self._signal()
+
+    # --- I/O thread only ----------------------------------------------------
+
+    def _signal(self):
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # a wakeup is already pending, or we are shutting down
+
+    def _drain_wakeups(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
+        for client in dirty:
+            self._refresh(client)
+
+    def _accept(self):
+        try:
+            sock, addr = self._listener.accept()
+        except (BlockingIOError, OSError):
+            return
+        if len(self.clients) >= self.max_clients:
+            log(f"Refusing connection: {self.max_clients} clients already connected.")
+            sock.close()
+            self.refused += 1
+            return
+        self.accepted += 1
+        sock.setblocking(False)
+        client = ClientConnection(self, sock, addr)
+        self.clients.add(client)
+        self._selector.register(sock, selectors.EVENT_READ, client)
+
+    def _service(self, client, mask):
+        if mask & selectors.EVENT_READ:
+            self._read(client)
+        if mask & selectors.EVENT_WRITE and not client.closed:
+            self._flush(client)
+
+    def _read(self, client):
+        for _ in range(MAX_READS_PER_EVENT):
+            if client.closed or client._close_when_flushed:
+                return  # one-shot client already answered; ignore anything else
+            try:
+                n = client.sock.recv_into(client.decoder.buffer())
+            except BlockingIOError:
+                return
+            except OSError:
+                self._close(client)
+                return
+            if n == 0:
+                self._close(client)
+                return
+            self.bytes_in += n
+
+            try:
+                frame = client.decoder.advance(n)
+            except ProtocolError as e:
+                log(f"{e} Dropping connection.")
+                self._close(client)
+                return
+            if frame is None:
+                continue
+
+            try:
+                self.on_message(client, frame.message, frame.body)
+            except Exception as e:
+                log(f"Error handling client: {e}")
+                traceback.print_exc()
+
+    def _flush(self, client):
+        with client._lock:
+            while client._out:
+                chunk = client._out[0]
+                try:
+                    sent = client.sock.send(chunk)
+                except BlockingIOError:
+                    break
+                except OSError:
+                    client._out.clear()
+                    break
+                client._out_bytes -= sent
+                self.bytes_out += sent
+                if sent < len(chunk):
+                    client._out[0] = chunk[sent:]
+                    break
+                client._out.popleft()
+        self._refresh(client)
+
+    def _refresh(self, client):
+        """Re-evaluate what the selector should watch for ``client``."""
+        if client.closed:
+            return
+        if client._overflowed:
+            log("Client is not reading its replies; dropping connection.")
+            self._close(client)
+            return
+        if not client.wants_write:
+            if client._close_when_flushed:
+                self._close(client)
+                return
+            events = selectors.EVENT_READ
+        else:
+            events = selectors.EVENT_READ | selectors.EVENT_WRITE
+        self._selector.modify(client.sock, events, client)
+
+    def _close(self, client):
+        with client._lock:
+            if client.closed:
+                return
+            client.closed = True
+            client._out.clear()
+        self.clients.discard(client)
+        try:
+            self._selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+
+    def _shutdown(self):
+        for client in list(self.clients):
+            self._close(client)
+        self._selector.close()
+        self._listener.close()
+        self._wake_r.close()
+        self._wake_w.close()
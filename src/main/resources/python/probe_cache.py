@@ -0,0 +1,206 @@
+"""A cache for addon data that survives hot reloads.
+
+A reload purges every module of the addon, so anything computed at import
+time (lookup tables, parsed assets, shader sources) is computed again after
+each save, even when the inputs did not change. This module lives next to the
+probe server, outside the addon's package, so it is never purged: an addon
+can keep such data here between reloads::
+
+    try:
+        import probe_cache
+    except ImportError:  # not running under Blender Probe
+        probe_cache = None
+
+    def _load_tables():
+        if probe_cache is None:
+            return build_tables()
+        cache = probe_cache.get_cache(__package__)
+        return cache.get_or_compute("tables", TABLES_VERSION, build_tables)
+
+Entries are looked up by key *and* version: bump the version whenever the
+code producing the value changes, and the stale entry is dropped instead of
+returned. Store plain data (bytes, lists, dicts, arrays) rather than
+instances of the addon's classes; those would keep the old module generation
+alive after a reload. The cache is bounded: least recently used entries are
+evicted once all namespaces together hold more than ``max_bytes`` (sizes are
+estimated) or ``max_entries`` entries.
+"""
+
+import collections
+import os
+import sys
+import threading
+
+DEFAULT_MAX_MB = 256
+
+
+def _max_bytes_from_environment():
+    """The size budget from ``BLENDER_PROBE_CACHE_MB``; a bad value is ignored.
+
+    This runs when an addon first imports the module, so a typo in the setting
+    must not turn into an ImportError inside the addon.
+    """
+    raw = os.environ.get("BLENDER_PROBE_CACHE_MB", "").strip()
+    megabytes = DEFAULT_MAX_MB
+    if raw:
+        try:
+            megabytes = float(raw)
+        except ValueError:
+            print(
+                f"[BlenderProbe] Ignoring BLENDER_PROBE_CACHE_MB={raw!r}: "
+                f"not a number (using {DEFAULT_MAX_MB}).",
+                flush=True,
+            )
+    return int(megabytes * 1024 * 1024)
+
+
+MAX_BYTES = _max_bytes_from_environment()
+MAX_ENTRIES = 4096
+
+_MISSING = object()
+
+
+def estimate_size(value):
+    """Approximate memory held by ``value``; exact for buffers and arrays."""
+    nbytes = getattr(value, "nbytes", None)  # numpy arrays, memoryview
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+class _Store:
+    """All cached entries, in least- to most-recently-used order."""
+
+    def __init__(self, max_bytes=MAX_BYTES, max_entries=MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        # (namespace, key) -> (version, value, size)
+        self.entries = collections.OrderedDict()
+        self.bytes = 0
+        self.lock = threading.RLock()
+        # (namespace, "hits"/"misses"/"evictions") -> count
+        self.stats = collections.Counter()
+
+    def get(self, namespace, key, version):
+        with self.lock:
+            entry = self.entries.get((namespace, key))
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end((namespace, key))
+                self.stats[namespace, "hits"] += 1
+                return entry[1]
+            if entry is not None:
+                self._drop((namespace, key))
+            self.stats[namespace, "misses"] += 1
+            return _MISSING
+
+    def put(self, namespace, key, version, value, size):
+        if size is None:
+            size = estimate_size(value)
+        with self.lock:
+            if (namespace, key) in self.entries:
+                self._drop((namespace, key))
+            if size > self.max_bytes:
+                return False  # would evict everything else and still not fit
+            self.entries[namespace, key] = (version, value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes or len(self.entries) > self.max_entries:
+                oldest = next(iter(self.entries))
+                self._drop(oldest)
+                self.stats[oldest[0], "evictions"] += 1
+            return True
+
+    def _drop(self, full_key):
+        _version, _value, size = self.entries.pop(full_key)
+        self.bytes -= size
+
+    def clear(self, namespace=None):
+        with self.lock:
+            for full_key in [k for k in self.entries if namespace in (None, k[0])]:
+                self._drop(full_key)
+            if namespace is None:
+                self.stats.clear()
+            else:
+                for stat_key in [k for k in self.stats if k[0] == namespace]:
+                    del self.stats[stat_key]
+
+    def status(self):
+        with self.lock:
+            namespaces = {}
+            for (namespace, _key), (_version, _value, size) in self.entries.items():
+                info = namespaces.setdefault(namespace, {"entries": 0, "bytes": 0})
+                info["entries"] += 1
+                info["bytes"] += size
+            for (namespace, event), count in self.stats.items():
+                info = namespaces.setdefault(namespace, {"entries": 0, "bytes": 0})
+                info[event] = count
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                "namespaces": namespaces,
+            }
+
+
+_store = _Store()
+
+
+class PersistentCache:
+    """One addon's view of the shared store; see :func:`get_cache`."""
+
+    def __init__(self, namespace, store=None):
+        self.namespace = namespace
+        self._store = store if store is not None else _store
+
+    def get(self, key, version=None, default=None):
+        """The value stored under ``key`` with this ``version``, else ``default``."""
+        value = self._store.get(self.namespace, key, version)
+        return default if value is _MISSING else value
+
+    def put(self, key, value, version=None, size=None):
+        """Store ``value``; ``size`` in bytes is estimated when not given.
+
+        Returns False (and stores nothing) if the value alone exceeds the
+        cache's size limit.
+        """
+        return self._store.put(self.namespace, key, version, value, size)
+
+    def get_or_compute(self, key, version, compute, size=None):
+        """Return the cached value, or call ``compute()`` and cache its result."""
+        value = self._store.get(self.namespace, key, version)
+        if value is _MISSING:
+            value = compute()
+            self._store.put(self.namespace, key, version, value, size)
+        return value
+
+    def invalidate(self, key):
+        with self._store.lock:
+            if (self.namespace, key) in self._store.entries:
+                self._store._drop((self.namespace, key))
+
+    def clear(self):
+        self._store.clear(self.namespace)
+
+    def __contains__(self, key):
+        return (self.namespace, key) in self._store.entries
+
+
+def get_cache(namespace):
+    """The cache of ``namespace`` (use the addon's package name)."""
+    return PersistentCache(namespace)
+
+
+def status():
+    return _store.status()
+
+
+def clear(namespace=None):
+    _store.clear(namespace)
@@ -1,20 +1,36 @@
+import atexit
+import collections
 import importlib
-import json
+import inspect
+import io
 import os
 import queue
 import socket
 import sys
 import threading
+import time
 import traceback
 
 import bpy
 
-# probe_server.py is extracted alongside wheels.py into a shared temp directory
-# and launched via `blender --python`; Blender does not put that directory on
-# sys.path, so add it before importing our sibling module. This mirrors
-# generate_stubs.py, which imports its `generator` package the same way.
+# probe_server.py is extracted alongside wheels.py, probe_cache.py and the
+# blender_probe package into a shared temp directory and launched via
+# `blender --python`; Blender does not put that directory on sys.path, so add
+# it before importing them. This mirrors generate_stubs.py, which imports its
+# `generator` package the same way. Everything else lives in blender_probe/,
+# since this directory comes first on sys.path for the addon's imports too.
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import probe_cache
+from blender_probe import profiling, protocol, reload_timing, rna_export
+from blender_probe.callbacks import CallbackInstrumentation
+from blender_probe.import_graph import AddonImportGraph, snapshot_sources
+from blender_probe.leak_tracker import LeakTracker
+from blender_probe.metrics import Metrics
+from blender_probe.output_pump import OutputPump
+from blender_probe.preflight import PreflightCompiler, PreflightError
+from blender_probe.sampler import StackSampler
+from blender_probe.transport import ProbeTransport
 from wheels import setup_dependencies
 
 # When Blender is launched as a subprocess its stdout is a pipe, not a TTY, so
@@ -29,167 +45,1148 @@ try:
 except Exception:
     pass
 
+
+def log(message):
+    print(f"[BlenderProbe] {message}", flush=True)
+
+
+def _env_number(name, default):
+    """The number in environment variable ``name``, or ``default``.
+
+    Settings are read at import time, which must not fail for the same reason
+    as above: a malformed value is reported and ignored.
+    """
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        log(f"Ignoring {name}={raw!r}: not a number (using {default}).")
+        return default
+
+
 HOST = "127.0.0.1"
-HEADER_SIZE = 64
 
-execution_queue = queue.Queue()
+# With BLENDER_PROBE_OUTPUT_BUFFER_KB set, stdout/stderr become an in-memory
+# buffer of (about) that size, written out by a background thread, so printing
+# never blocks Blender's main thread on a slow pipe; see blender_probe/output_pump.py.
+OUTPUT_BUFFER_CHARS = int(_env_number("BLENDER_PROBE_OUTPUT_BUFFER_KB", 0) * 1024)
+_output_pump = None
+
+# Largest single frame section (JSON, unchunked body, or body chunk) accepted
+# from a client. Bigger payloads must be sent chunked; see blender_probe/protocol.py.
+MAX_CHUNK_SIZE = int(
+    _env_number("BLENDER_PROBE_MAX_CHUNK_SIZE", protocol.MAX_CHUNK_SIZE)
+)
+
+# Cadence of the main_thread_loop timer, in seconds. The loop ticks every
+# ACTIVE_INTERVAL while commands are arriving and for ACTIVE_WINDOW after the
+# last one (a reload is usually followed by more work), then backs off
+# exponentially to IDLE_INTERVAL. bpy.app.timers may only be touched from the
+# main thread, so the socket thread cannot re-register the timer itself; instead
+# enqueue_command() records the activity and the very next tick drops back to
+# the fast cadence. IDLE_INTERVAL therefore bounds the latency of the first
+# command after a quiet period; it defaults to the historical 100 ms, and
+# BLENDER_PROBE_IDLE_INTERVAL_MS raises it for fewer wake-ups of an idle Blender
+# (or lowers it for snappier first commands).
+ACTIVE_INTERVAL = 0.005
+IDLE_INTERVAL = max(
+    ACTIVE_INTERVAL, _env_number("BLENDER_PROBE_IDLE_INTERVAL_MS", 100) / 1000
+)
+ACTIVE_WINDOW = 0.5
+
 server_running = False
+_transport = None
 
+# Per-addon import graphs used by incremental reloads, keyed by module name.
+import_graphs = {}
 
-def log(message):
-    print(f"[BlenderProbe] {message}", flush=True)
+# Reload commands are syntax-checked off the main thread before being queued;
+# see blender_probe/preflight.py. The worker thread is started on first use.
+_preflight = PreflightCompiler()
+_preflight_jobs = queue.Queue()
+_preflight_thread = None
+_preflight_lock = threading.Lock()
+
+# Statistical profiler of Blender's main thread; see blender_probe/sampler.py and the
+# "sampler" command.
+_sampler = StackSampler(threading.main_thread().ident)
+
+# Addon generations that outlive their reload, and (while tracing) memory
+# growth across reloads; see blender_probe/leak_tracker.py and the "leaks" command.
+_leaks = LeakTracker()
+
+# Opt-in latency tracking of the dev addon's timers, handlers and draw
+# callbacks; see blender_probe/callbacks.py and the "callbacks" command.
+_callbacks = CallbackInstrumentation()
+
+# Timing breakdowns of the most recent reloads, oldest first; see
+# blender_probe/reload_timing.py and the "reload_history" command.
+RELOAD_HISTORY_SIZE = 50
+reload_history = collections.deque(maxlen=RELOAD_HISTORY_SIZE)
+
+# The modules imported by the most recent enable or reload of each addon,
+# keyed by module name; see reload_timing.ImportTimer and the "import_profile"
+# command.
+import_profiles = {}
+
+_last_activity = 0.0
+_dispatch_interval = IDLE_INTERVAL
+# When main_thread_loop last handed control back to Blender (perf_counter).
+_tick_returned_at = None
+
+# Counters and rolling samples for the "stats" command; see blender_probe/metrics.py.
+metrics = Metrics()
+_started_at = time.monotonic()
+
+# Main-thread time one main_thread_loop tick may spend on commands before it
+# hands control back to Blender (a 60 Hz frame is ~16 ms). A tick stops taking
+# new work once the budget is spent; a single command that overruns it cannot
+# be interrupted unless it is cooperative (see _CooperativeTask).
+TICK_BUDGET = _env_number("BLENDER_PROBE_TICK_BUDGET_MS", 8) / 1000
+
+# Cooperative commands that have yielded and wait for their next step.
+_active_tasks = collections.deque()
+
+# Completion records carry the tail of whatever the command printed; cap it so
+# a chatty reload cannot produce an oversized reply frame.
+MAX_CAPTURED_OUTPUT = 64 * 1024
+
+
+class BinaryResult:
+    """Command result with a binary payload.
+
+    ``value`` becomes the record's JSON ``result``; ``body`` (any buffer) is sent
+    as the frame's binary body instead of being serialized into the JSON.
+    """
+
+    def __init__(self, value, body):
+        self.value = value
+        self.body = body
+
+
+class Command:
+    """A queued probe command and the channel its completion record goes back on.
+
+    ``reply`` is a callable taking the completion record, or ``None`` for
+    one-shot clients that only get the legacy ``ACK``. ``body`` is the frame's
+    binary section, if it had one.
+    """
+
+    def __init__(self, message, reply=None, body=None):
+        self.message = message
+        self.reply = reply
+        self.body = body
+        self.id = message.get("id") if isinstance(message, dict) else None
+        self.enqueued_at = time.perf_counter()
+
+    @property
+    def action(self):
+        return self.message.get("action") if isinstance(self.message, dict) else None
+
+    def complete(self, status, started, result=None, error=None, tb=None, output=""):
+        """Build the completion record and deliver it to the client, if any."""
+        finished = time.perf_counter()
+        body = None
+        if isinstance(result, BinaryResult):
+            result, body = result.value, result.body
+        metrics.incr(f"commands.{status}")
+        metrics.observe(f"queued_ms.{self.action}", (started - self.enqueued_at) * 1000)
+        metrics.observe(f"duration_ms.{self.action}", (finished - started) * 1000)
+        record = {
+            "id": self.id,
+            "type": "result",
+            "action": self.action,
+            "status": status,
+            "queued_ms": round((started - self.enqueued_at) * 1000, 3),
+            "duration_ms": round((finished - started) * 1000, 3),
+            "result": result,
+            "error": error,
+            "traceback": tb,
+            "output": output,
+        }
+        if self.reply is not None:
+            try:
+                if body is None:
+                    self.reply(record)
+                else:
+                    self.reply(record, body)
+            except Exception as e:
+                log(f"Could not deliver result of command {self.id}: {e}")
+        return record
+
+
+class CommandQueue:
+    """Queue of pending Commands that merges redundant work.
+
+    Drop-in for the queue.Queue it replaces (put / get_nowait / empty), with two
+    twists. Pings skip ahead of everything else, so a liveness check is never
+    stuck behind a slow reload. And a reload replaces any still-pending reload
+    of the same module: the older command is completed straight away with
+    status "superseded", naming the command that replaced it, so a burst of
+    saves costs exactly one reload.
+    """
+
+    PRIORITY_ACTIONS = frozenset({"ping"})
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._priority = collections.deque()
+        self._normal = collections.deque()
+        # module_name -> the reload Command pending for it
+        self._pending_reloads = {}
+        self._superseded = set()  # ids of dropped Commands still in _normal
+        self._size = 0
+
+    def put(self, command):
+        replaced = None
+        with self._lock:
+            if command.action in self.PRIORITY_ACTIONS:
+                self._priority.append(command)
+            else:
+                key = self._reload_key(command)
+                if key is not None:
+                    replaced = self._pending_reloads.get(key)
+                    if replaced is not None:
+                        self._superseded.add(id(replaced))
+                        self._size -= 1
+                        if replaced.message.get("mode", "full") == "full":
+                            # A full reload also covers whatever an incremental one
+                            # would have done, never the other way round.
+                            command.message["mode"] = "full"
+                    self._pending_reloads[key] = command
+                self._normal.append(command)
+            self._size += 1
+        if replaced is not None:
+            log(f"Reload of {self._reload_key(command)} superseded by a newer request.")
+            replaced.complete(
+                "superseded", time.perf_counter(), result={"superseded_by": command.id}
+            )
+
+    def get_nowait(self):
+        with self._lock:
+            if self._priority:
+                self._size -= 1
+                return self._priority.popleft()
+            while self._normal:
+                command = self._normal.popleft()
+                if id(command) in self._superseded:
+                    self._superseded.discard(id(command))
+                    continue
+                key = self._reload_key(command)
+                if key is not None and self._pending_reloads.get(key) is command:
+                    del self._pending_reloads[key]
+                self._size -= 1
+                return command
+        raise queue.Empty
+
+    def empty(self):
+        with self._lock:
+            return self._size == 0
+
+    def qsize(self):
+        with self._lock:
+            return self._size
+
+    @staticmethod
+    def _reload_key(command):
+        if command.action != "reload":
+            return None
+        return command.message.get("module_name") or None
+
+
+# Filled by the socket thread, drained by main_thread_loop on Blender's main thread.
+execution_queue = CommandQueue()
+
+
+class _MainThreadTee:
+    """Stream wrapper that copies writes made by one thread into a buffer.
+
+    Output still reaches the original stream (and so the IDE console); only the
+    capturing thread's writes are recorded, so socket-thread logging does not
+    leak into a command's completion record. Recording stops once the command
+    is done (``active`` is cleared): code that kept a reference to the tee,
+    such as a ``logging.StreamHandler`` created during a reload, then only
+    writes through to the stream.
+    """
+
+    def __init__(self, stream, buffer):
+        self._stream = stream
+        self._buffer = buffer
+        self._thread_id = threading.get_ident()
+        self.active = True
+
+    def write(self, text):
+        if self.active and threading.get_ident() == self._thread_id:
+            self._buffer.write(text)
+        return self._stream.write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class _OutputCapture:
+    """Context manager tee-ing sys.stdout/sys.stderr while a command runs.
+
+    It may be entered repeatedly (once per step of a cooperative command); the
+    output of every step accumulates in the same buffer.
+    """
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+
+    def __enter__(self):
+        self._saved = (sys.stdout, sys.stderr)
+        self._tees = (
+            _MainThreadTee(sys.stdout, self._buffer),
+            _MainThreadTee(sys.stderr, self._buffer),
+        )
+        sys.stdout, sys.stderr = self._tees
+        return self
+
+    def __exit__(self, *exc):
+        for tee in self._tees:
+            tee.active = False
+        sys.stdout, sys.stderr = self._saved
+        return False
+
+    @property
+    def text(self):
+        return self._buffer.getvalue()[-MAX_CAPTURED_OUTPUT:]
+
+
+def _create_listener():
+    """Bind the listening socket; return it and the line announcing it to the IDE.
+
+    When the IDE passes BLENDER_PROBE_SOCKET_PATH (Linux), the server listens on
+    that Unix domain socket: no TCP stack per round trip and no port to scrape.
+    Otherwise, or if the Unix socket cannot be bound, it listens on an
+    ephemeral TCP port on HOST.
+    """
+    socket_path = os.environ.get("BLENDER_PROBE_SOCKET_PATH")
+    if socket_path and hasattr(socket, "AF_UNIX"):
+        server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            # A stale socket file from a crashed session would make bind() fail.
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            server_socket.bind(socket_path)
+            server_socket.listen()
+            log(f"Server listening on {socket_path}")
+            return server_socket, f"BLENDER_PROBE_SOCKET::{socket_path}"
+        except OSError as e:
+            server_socket.close()
+            log(f"Could not listen on {socket_path} ({e}); falling back to TCP.")
+
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+    log("Attempting to bind socket...")
+
+    server_socket.bind((HOST, 0))
+    server_socket.listen()
+
+    port = server_socket.getsockname()[1]
+    log(f"Server listening on {HOST}:{port}")
+    return server_socket, f"BLENDER_PROBE_PORT::{port}"
+
+
+def announce(line):
+    """Print a line the IDE parses (BLENDER_PROBE_*::); never dropped or reordered."""
+    if _output_pump is not None:
+        _output_pump.write_line(line)
+    else:
+        print(line, flush=True)
+
+
+def _install_output_pump():
+    global _output_pump
+    if OUTPUT_BUFFER_CHARS <= 0 or _output_pump is not None:
+        return
+    _output_pump = OutputPump(OUTPUT_BUFFER_CHARS)
+    _output_pump.install(sys)
+    # Write out what is still buffered when Blender quits.
+    atexit.register(_output_pump.drain)
+    log(f"Buffering stdout/stderr ({OUTPUT_BUFFER_CHARS // 1024} KB).")
 
 
 def start_socket_server():
-    global server_running
+    global server_running, _transport
     log("Debug: Socket thread started.")
 
     try:
-        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-
-        log("Attempting to bind socket...")
-
-        server_socket.bind((HOST, 0))
-        server_socket.listen()
+        server_socket, announcement = _create_listener()
+        unix_path = (
+            None
+            if server_socket.family == socket.AF_INET
+            else server_socket.getsockname()
+        )
         server_running = True
 
-        port = server_socket.getsockname()[1]
-
-        print(f"BLENDER_PROBE_PORT::{port}", flush=True)
-        log(f"Server listening on {HOST}:{port}")
+        _transport = ProbeTransport(
+            server_socket, on_message=handle_message, max_chunk_size=MAX_CHUNK_SIZE
+        )
+        announce(announcement)
 
     except Exception as e:
         log(f"FATAL ERROR in Socket Thread: {e}")
         traceback.print_exc()
         return
 
-    while server_running:
-        try:
-            conn, addr = server_socket.accept()
-            thread = threading.Thread(target=handle_client, args=(conn, addr))
-            thread.daemon = True
-            thread.start()
-        except Exception as e:
-            log(f"Socket accept error: {e}")
-            break
+    # This thread now owns every client socket; see blender_probe/transport.py.
+    try:
+        _transport.serve_forever()
+    except Exception as e:
+        log(f"Socket loop error: {e}")
+        traceback.print_exc()
+    finally:
+        server_running = False
+        if unix_path:
+            try:
+                os.unlink(unix_path)
+            except OSError:
+                pass
 
 
-def handle_client(conn, addr):
+def handle_message(client, message, body=None):
     """
-    Handles a single connection via simple JSON messaging.
-    Protocol: Header(Length of JSON, 64bytes) + JSON Body
+    Handles one frame received from a client (see blender_probe/protocol.py).
+    Protocol: Header(Length of JSON, 64bytes) + JSON Body [+ binary body]
+
+    A first frame without an "id" is a one-shot command: it is queued, "ACK" is
+    sent and the connection is closed. A first frame carrying an "id" opens a
+    persistent session: every frame is acknowledged with a framed reply echoing
+    its id, the command's completion record follows once the main thread has
+    run it, and further frames are read until the client disconnects.
     """
-    try:
-        msg_length_raw = conn.recv(HEADER_SIZE).decode("utf-8")
-        if not msg_length_raw:
-            return
+    if client.session is None:
+        client.session = isinstance(message, dict) and "id" in message
+
+    if not client.session:
+        _submit(Command(message, body=body))
+        client.send(b"ACK", close_after=True)
+        return
+
+    command = Command(message, reply=client.send_message, body=body)
+    _submit(command)
+    client.send_message({"id": command.id, "type": "ack"})
+
+
+def _submit(command):
+    """Queue a freshly received Command, pre-flighting reloads first."""
+    if command.action == "reload" and command.message.get("preflight", True):
+        _preflight_jobs.put(command)
+        _ensure_preflight_worker()
+    else:
+        enqueue_command(command)
 
+
+def _ensure_preflight_worker():
+    global _preflight_thread
+    with _preflight_lock:
+        if _preflight_thread is None or not _preflight_thread.is_alive():
+            _preflight_thread = threading.Thread(target=_preflight_worker, daemon=True)
+            _preflight_thread.start()
+
+
+def _preflight_worker():
+    while True:
+        command = _preflight_jobs.get()
         try:
-            msg_length = int(msg_length_raw.strip())
-        except ValueError:
-            log("Invalid message length header received.")
-            return
-
-        if msg_length > 10 * 1024 * 1024:
-            log(f"Message too large: {msg_length} bytes. Dropping connection.")
-            return
-
-        data = b""
-        while len(data) < msg_length:
-            packet = conn.recv(msg_length - len(data))
-            if not packet:
-                break
-            data += packet
-
-        message = json.loads(data.decode("utf-8"))
-        execution_queue.put(message)
-        conn.sendall(b"ACK")
+            preflight_reload(command)
+        except Exception as e:
+            # Never lose a reload to a bug in the check itself.
+            log(f"Pre-flight check failed unexpectedly ({e}); reloading anyway.")
+            enqueue_command(command)
+
+
+def preflight_reload(command):
+    """Compile the addon a reload targets; queue the reload only if it compiles.
+
+    A syntax error completes the command with status "error" straight away, and
+    the live addon is never unregistered.
+    """
+    module_name = command.message.get("module_name")
+    started = time.perf_counter()
+    if module_name:
+        try:
+            compiled = _preflight.check(module_name)
+        except PreflightError as e:
+            log(f"Reload of {module_name} skipped: {e}")
+            command.complete(
+                "error",
+                started,
+                result={"preflight": "failed", "file": e.path, "line": e.lineno},
+                error=str(e),
+            )
+            return False
+        if compiled:
+            log(f"Pre-compiled {compiled} changed file(s) of {module_name}.")
+    enqueue_command(command)
+    return True
 
-    except Exception as e:
-        log(f"Error handling client: {e}")
-        traceback.print_exc()
-    finally:
-        conn.close()
+
+def enqueue_command(command):
+    """Queue a Command for the main thread and wake the dispatcher."""
+    execution_queue.put(command)
+    note_activity()
+
+
+def note_activity():
+    """Switch main_thread_loop to its fast cadence for the next ACTIVE_WINDOW."""
+    global _last_activity
+    _last_activity = time.monotonic()
+
+
+def _next_interval():
+    global _dispatch_interval
+    if time.monotonic() - _last_activity < ACTIVE_WINDOW:
+        _dispatch_interval = ACTIVE_INTERVAL
+    else:
+        _dispatch_interval = min(IDLE_INTERVAL, _dispatch_interval * 2)
+    return _dispatch_interval
 
 
 def main_thread_loop():
     """
-    Checks the queue for pending actions and executes them in the main thread.
+    Runs pending commands in the main thread, within TICK_BUDGET.
+    Returns the delay until the next tick (see ACTIVE_INTERVAL / IDLE_INTERVAL).
     """
-    while not execution_queue.empty():
+    global _tick_returned_at
+    tick_started = time.perf_counter()
+    if _tick_returned_at is not None:
+        # How much later than requested Blender ran this tick.
+        lag = tick_started - _tick_returned_at - _dispatch_interval
+        metrics.observe("tick_lag_ms", lag * 1000)
+    metrics.observe("queue_depth", execution_queue.qsize())
+    deadline = tick_started + TICK_BUDGET
+    processed = False
+    # Each cooperative task is resumed at most once per tick; resuming one
+    # again straight away would spin on it until the budget is gone.
+    steps_left = len(_active_tasks)
+    while True:
         try:
-            cmd = execution_queue.get_nowait()
+            command = execution_queue.get_nowait()
         except queue.Empty:
+            command = None
+        if command is not None:
+            run_command(command)
+        elif steps_left:
+            steps_left -= 1
+            task = _active_tasks.popleft()
+            if not task.step():
+                _active_tasks.append(task)
+        else:
+            break
+        processed = True
+        if time.perf_counter() >= deadline:
+            # Leave the rest for the next tick so Blender can redraw.
             break
-        # Never let a failing command propagate out of the timer; if it did,
-        # Blender would unregister the timer and the queue would stop draining.
+    if processed:
+        note_activity()
+        metrics.observe("tick_busy_ms", (time.perf_counter() - tick_started) * 1000)
+    interval = _next_interval()
+    _tick_returned_at = time.perf_counter()
+    return interval
+
+
+class _CooperativeTask:
+    """A command whose handler returned a generator.
+
+    Every ``yield`` in the handler is a point where main_thread_loop may hand
+    control back to Blender; the generator's return value is the command's
+    result. Each tick resumes the task once, round-robin with other work.
+    """
+
+    def __init__(self, command, steps, started, capture):
+        self.command = command
+        self.steps = steps
+        self.started = started
+        self.capture = capture
+
+    def step(self):
+        """Run up to the next yield; return True once the command has completed."""
         try:
-            process_command(cmd)
+            with self.capture:
+                next(self.steps)
+        except StopIteration as done:
+            self.command.complete(
+                "ok", self.started, result=done.value, output=self.capture.text
+            )
+            return True
         except Exception as e:
             log(f"Error processing command: {e}")
             traceback.print_exc()
-    return 0.1
+            self.command.complete(
+                "error",
+                self.started,
+                error=str(e),
+                tb=traceback.format_exc(),
+                output=self.capture.text,
+            )
+            return True
+        return False
+
+
+def run_command(command):
+    """Execute a queued Command and deliver its completion record.
+
+    Returns the record, or None if the command is cooperative and was scheduled
+    to run in steps over the following ticks.
+    """
+    started = time.perf_counter()
+    capture = _OutputCapture()
+    # Never let a failing command propagate out of the timer; if it did,
+    # Blender would unregister the timer and the queue would stop draining.
+    try:
+        with capture:
+            result = process_command(command.message)
+    except Exception as e:
+        log(f"Error processing command: {e}")
+        traceback.print_exc()
+        return command.complete(
+            "error",
+            started,
+            error=str(e),
+            tb=traceback.format_exc(),
+            output=capture.text,
+        )
+    if inspect.isgenerator(result):
+        _active_tasks.append(_CooperativeTask(command, result, started, capture))
+        return None
+    return command.complete("ok", started, result=result, output=capture.text)
+
+
+def _refresh_import_graph(module_name, executed=None):
+    """Record the addon's loaded modules as the baseline for incremental reloads.
+
+    ``executed`` is the :func:`import_graph.snapshot_sources` taken before the
+    modules were imported; see :meth:`AddonImportGraph.refresh`.
+    """
+    graph = import_graphs.get(module_name)
+    if graph is None:
+        graph = import_graphs[module_name] = AddonImportGraph(module_name)
+    try:
+        graph.refresh(executed=executed)
+    except Exception as e:
+        # Only incremental reloads depend on the graph; never fail a reload over it.
+        log(f"Could not index imports of {module_name}: {e}")
+        import_graphs.pop(module_name, None)
 
 
-def deep_reload_addon(module_name):
+def _incremental_targets(module_name):
+    """Modules an incremental reload must purge, or None to fall back to full."""
+    graph = import_graphs.get(module_name)
+    if not graph:
+        log(f"No import graph for {module_name} yet; doing a full reload.")
+        return None
+    return graph.modules_to_reload()
+
+
+class ReloadRolledBack(RuntimeError):
+    """The new version failed to load; the previous one was restored instead."""
+
+
+def deep_reload_addon(module_name, mode="full"):
     """
     Performs a deep reload of the addon.
+
+    mode="full" purges every module of the addon. mode="incremental" purges only
+    the modules whose source changed since the last load plus the modules that
+    import them (see blender_probe/import_graph.py); untouched modules stay cached.
+    Returns a summary dict including a per-phase timing breakdown, which is also
+    appended to reload_history (failed reloads too); raises if the addon could
+    not be re-imported or re-registered.
+
+    The reload is transactional: purged modules are kept aside, and if the new
+    version fails to import or register, whatever it registered is unregistered
+    and the previous version is restored from memory and re-registered, then
+    ReloadRolledBack is raised.
     """
-    log(f"Deep Reload for: {module_name}")
+    log(f"Deep Reload for: {module_name} ({mode})")
 
-    # Try to Unregister existing
-    if module_name in sys.modules:
-        try:
-            mod = sys.modules[module_name]
-            if hasattr(mod, "unregister"):
+    # Taken before anything is compared or run: a file saved from here on was
+    # not loaded by this reload and must count as changed for the next one.
+    executed = snapshot_sources(module_name)
+    targets = _incremental_targets(module_name) if mode == "incremental" else None
+    if targets is not None and not targets:
+        log("No module sources changed; re-registering without purging.")
+    _leaks.before_reload()
+    timer = reload_timing.ReloadTimer(
+        module_name, "full" if targets is None else "incremental"
+    )
+
+    try:
+        # Try to Unregister existing
+        with timer.phase("unregister"):
+            if module_name in sys.modules:
                 try:
-                    mod.unregister()
-                    log("Unregistered successfully.")
+                    mod = sys.modules[module_name]
+                    if hasattr(mod, "unregister"):
+                        try:
+                            mod.unregister()
+                            log("Unregistered successfully.")
+                        except Exception as e:
+                            log(f"Warning during unregister: {e}")
                 except Exception as e:
-                    log(f"Warning during unregister: {e}")
+                    log(f"Error accessing module for unregister: {e}")
+
+        # Purge from sys.modules (The Magic Step)
+        with timer.phase("purge"):
+            if targets is None:
+                keys_to_purge = [
+                    k
+                    for k in sys.modules.keys()
+                    if reload_timing.owned_by(k, module_name)
+                ]
+            else:
+                keys_to_purge = sorted(k for k in targets if k in sys.modules)
+
+            owned_before = {
+                k for k in sys.modules if reload_timing.owned_by(k, module_name)
+            }
+            snapshot = {key: sys.modules.pop(key) for key in keys_to_purge}
+
+        log(f"Purged {len(keys_to_purge)} modules from memory.")
+
+        # Re-import and Register
+        try:
+            # Lazy imports made by register() belong in the import profile too.
+            with timer.imports:
+                with timer.phase("import"):
+                    new_mod = importlib.import_module(module_name)
+                    if targets is not None:
+                        # Purged modules nobody re-imported above (e.g. imported
+                        # lazily) must still be re-executed now, so their parents
+                        # bind the new versions.
+                        graph = import_graphs[module_name]
+                        for key in keys_to_purge:
+                            if key not in sys.modules and graph.source_exists(key):
+                                importlib.import_module(key)
+                with timer.phase("register"), _timed_class_registration(timer):
+                    if hasattr(new_mod, "register"):
+                        new_mod.register()
+                        log(f"Re-registered {module_name} successfully!")
+                    else:
+                        log(f"Warning: {module_name} has no register() function.")
+            _instrument_addon(module_name)
+
         except Exception as e:
-            log(f"Error accessing module for unregister: {e}")
+            log(f"CRITICAL FAIL during re-import: {e}")
+            timer.status = "error"
+            if module_name not in snapshot:
+                raise  # never loaded before: nothing to roll back to
+            with timer.phase("rollback"):
+                timer.rolled_back = _rollback(
+                    module_name, snapshot, owned_before, timer.classes
+                )
+            if timer.rolled_back:
+                raise ReloadRolledBack(
+                    f"{e} (rolled back to the previously loaded version)"
+                ) from e
+            raise
+    finally:
+        report = timer.report()
+        reload_history.append(report)
+        metrics.observe(f"reload_ms.{report['status']}", report["total_ms"])
+        _store_import_profile(module_name, "reload", timer.imports)
+        log(reload_timing.summarize(report))
+        _leaks.record_generation(module_name)
+        _leaks.after_reload()
 
-    # Purge from sys.modules (The Magic Step)
-    keys_to_purge = [
-        k
-        for k in sys.modules.keys()
-        if k == module_name or k.startswith(module_name + ".")
-    ]
+    _refresh_import_graph(module_name, executed)
+    return {
+        "module": module_name,
+        "mode": report["mode"],
+        "purged": len(keys_to_purge),
+        "reloaded": keys_to_purge,
+        "timings": report,
+    }
 
-    for key in keys_to_purge:
-        del sys.modules[key]
 
-    log(f"Purged {len(keys_to_purge)} modules from memory.")
+def _timed_class_registration(timer):
+    """Time (and remember) each bpy.utils.register_class call made while registering."""
+    return reload_timing.time_calls(
+        getattr(bpy, "utils", None),
+        "register_class",
+        timer.classes,
+        key=lambda cls: cls,
+    )
 
-    # Re-import and Register
-    try:
-        new_mod = importlib.import_module(module_name)
-        if hasattr(new_mod, "register"):
-            new_mod.register()
-            log(f"Re-registered {module_name} successfully!")
-        else:
-            log(f"Warning: {module_name} has no register() function.")
 
+def _rollback(module_name, snapshot, owned_before, attempted_classes):
+    """Put the pre-reload modules of an addon back and re-register them.
+
+    ``snapshot`` maps the purged module names to the module objects that were
+    purged, ``owned_before`` is every addon module loaded before the purge, and
+    ``attempted_classes`` holds the ``(class, seconds)`` register_class calls the
+    failed register() made. Returns True if the old version is registered again.
+    """
+    unregister_class = getattr(getattr(bpy, "utils", None), "unregister_class", None)
+    if unregister_class is not None:
+        for cls, _ in reversed(attempted_classes):
+            try:
+                unregister_class(cls)
+            except Exception:
+                pass  # the call that failed never registered its class
+
+    # Drop everything the failed import created or replaced, then restore.
+    for key in [k for k in sys.modules if reload_timing.owned_by(k, module_name)]:
+        if key in snapshot or key not in owned_before:
+            del sys.modules[key]
+    sys.modules.update(snapshot)
+    for key, module in snapshot.items():
+        # Importing a new submodule rebinds it on its parent package; undo that.
+        parent, _, child = key.rpartition(".")
+        if parent in sys.modules:
+            setattr(sys.modules[parent], child, module)
+
+    old_mod = sys.modules[module_name]
+    try:
+        if hasattr(old_mod, "register"):
+            old_mod.register()
     except Exception as e:
-        log(f"CRITICAL FAIL during re-import: {e}")
+        log(f"Rollback failed: the previous version could not be re-registered: {e}")
         traceback.print_exc()
+        return False
+    log(f"Rolled back {module_name} to the previously loaded version.")
+    return True
 
 
 def process_command(cmd):
+    """Run one command message and return its result payload."""
     action = cmd.get("action")
 
     if action == "ping":
         log("Pong! (Received Ping)")
+        return "pong"
 
     elif action == "reload":
         module_name = cmd.get("module_name")
         if module_name:
-            deep_reload_addon(module_name)
+            return deep_reload_addon(module_name, mode=cmd.get("mode", "full"))
         else:
             log("Reload command received but no module_name specified.")
 
+    elif action == "export_array":
+        path, attribute = cmd.get("path"), cmd.get("attribute")
+        if not path or not attribute:
+            raise ValueError("export_array needs both 'path' and 'attribute'.")
+        meta, buffer = rna_export.export_array(bpy.data, path, attribute)
+        log(f"Exported {meta['nbytes']} bytes of {meta['path']} / {meta['attribute']}.")
+        return BinaryResult(meta, buffer)
+
+    elif action == "profile":
+        return profile_command(cmd)
+
+    elif action == "sampler":
+        return sampler_command(cmd)
+
+    elif action == "callbacks":
+        return callbacks_command(cmd)
+
+    elif action == "import_profile":
+        return import_profile_command(cmd)
+
+    elif action == "leaks":
+        return leaks_command(cmd)
+
+    elif action == "cache":
+        # The reload-surviving cache addons use (see probe_cache.py).
+        op = cmd.get("op", "status")
+        if op == "clear":
+            probe_cache.clear(cmd.get("namespace"))
+        elif op != "status":
+            raise ValueError(f"Unknown cache op: {op!r} (use status or clear).")
+        return probe_cache.status()
+
+    elif action == "stats":
+        return stats_command(cmd)
+
+    elif action == "reload_history":
+        # Newest last; "limit" keeps only that many of the most recent reloads.
+        history = list(reload_history)
+        limit = cmd.get("limit")
+        return history[-limit:] if limit else history
+
+    return None
+
+
+# Longest "duration" capture accepted by the profile command, in seconds.
+MAX_PROFILE_SECONDS = 300
+
+
+def profile_command(cmd):
+    """Run a ``profile`` command: a target under cProfile on the main thread.
+
+    ``target`` is one of:
+
+    * ``"reload"`` -- the reload described by ``module_name`` / ``mode``;
+    * ``"operator"`` -- ``bpy.ops.<idname>(<context>, **properties)``;
+    * ``"duration"`` -- everything the main thread runs for ``seconds``
+      (draw handlers, timers, modal operators, ...), returned as a cooperative
+      command so Blender keeps running meanwhile.
+
+    The marshalled pstats are the reply's binary body and ``result`` holds a
+    summary. With ``"output": true`` (or a path) a ``.prof`` file is also
+    written, by default under the project's ``.blender_probe/profiles``.
+    """
+    target = cmd.get("target")
+    if target == "reload":
+        module_name = cmd.get("module_name")
+        if not module_name:
+            raise ValueError("profile target 'reload' needs a module_name.")
+        capture = profiling.Capture()
+        capture.run(deep_reload_addon, module_name, mode=cmd.get("mode", "full"))
+        return _profile_result(cmd, capture, f"reload-{module_name}")
+
+    if target == "operator":
+        idname = cmd.get("idname", "")
+        category, _, name = idname.partition(".")
+        operator = (
+            getattr(getattr(bpy.ops, category, None), name, None) if name else None
+        )
+        if operator is None:
+            raise ValueError(f"Unknown operator: {idname!r}")
+        capture = profiling.Capture()
+        outcome = capture.run(
+            operator, cmd.get("context", "EXEC_DEFAULT"), **cmd.get("properties", {})
+        )
+        result = _profile_result(cmd, capture, f"operator-{idname}")
+        result.value["operator_result"] = sorted(outcome) if outcome else []
+        return result
+
+    if target == "duration":
+        seconds = float(cmd.get("seconds", 5))
+        if not 0 < seconds <= MAX_PROFILE_SECONDS:
+            raise ValueError(f"seconds must be in (0, {MAX_PROFILE_SECONDS}].")
+        return _profile_duration(cmd, seconds)
+
+    raise ValueError(
+        f"Unknown profile target: {target!r} (use reload, operator or duration)."
+    )
+
+
+def _profile_duration(cmd, seconds):
+    # The profiler stays enabled between ticks, while control is back in
+    # Blender's event loop; that is the time being measured.
+    capture = profiling.Capture()
+    capture.start()
+    try:
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            yield
+    finally:
+        capture.stop()
+    return _profile_result(cmd, capture, "duration")
+
+
+def _profile_result(cmd, capture, label):
+    data = capture.data()
+    summary = capture.summary()
+    summary["target"] = cmd.get("target")
+    output = cmd.get("output")
+    if output:
+        project_root = os.environ.get("BLENDER_PROBE_PROJECT_ROOT") or os.getcwd()
+        if output is True:
+            directory = os.path.join(project_root, ".blender_probe", "profiles")
+            summary["file"] = profiling.write_profile(data, directory, label)
+        else:
+            path = os.path.join(project_root, output)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "wb") as fh:
+                fh.write(data)
+            summary["file"] = path
+        log(f"Profile written to {summary['file']}")
+    return BinaryResult(summary, data)
+
+
+def sampler_command(cmd):
+    """Control the main-thread sampler: ``op`` is start, stop, reset, status or dump.
+
+    ``start`` accepts ``interval_ms``. ``dump`` returns the folded stacks
+    (UTF-8 text, one ``stack count`` line per stack) as the binary body, and
+    clears them if ``reset`` is true.
+    """
+    op = cmd.get("op", "status")
+    if op == "start":
+        interval_ms = cmd.get("interval_ms")
+        _sampler.start(None if interval_ms is None else interval_ms / 1000)
+        log(f"Sampling the main thread every {_sampler.interval * 1000:g} ms.")
+    elif op == "stop":
+        _sampler.stop()
+    elif op == "reset":
+        _sampler.reset()
+    elif op == "dump":
+        folded = _sampler.folded().encode("utf-8")
+        status = _sampler.status()
+        if cmd.get("reset"):
+            _sampler.reset()
+        return BinaryResult(status, folded)
+    elif op != "status":
+        raise ValueError(
+            f"Unknown sampler op: {op!r} (use start, stop, reset, status or dump)."
+        )
+    return _sampler.status()
+
+
+def stats_command(cmd):
+    """Server health: queue, connections, I/O totals and rolling latency samples.
+
+    Series (each a summary of its last metrics.WINDOW samples) are in milliseconds
+    except ``queue_depth``: ``queued_ms.<action>`` (enqueue to start),
+    ``duration_ms.<action>`` (start to finish), ``tick_lag_ms`` (how late
+    Blender ran the dispatch timer), ``tick_busy_ms`` and ``reload_ms.<status>``.
+    ``"reset": true`` clears counters and samples after reading them.
+    """
+    transport = _transport
+    result = {
+        "uptime_s": round(time.monotonic() - _started_at, 3),
+        "queue_depth": execution_queue.qsize(),
+        "active_tasks": len(_active_tasks),
+        "dispatch_interval_ms": round(_dispatch_interval * 1000, 3),
+        "transport": transport.stats() if transport is not None else None,
+        "output": _output_pump.stats() if _output_pump is not None else None,
+        **metrics.snapshot(),
+    }
+    if cmd.get("reset"):
+        metrics.reset()
+    return result
+
+
+def leaks_command(cmd):
+    """Leak tracking across reloads: ``op`` is start, stop or report.
+
+    ``start`` turns on tracemalloc (``frames`` deep tracebacks, default 1) and
+    takes the baseline snapshot; from then on every reload is bracketed by
+    snapshots. ``report`` lists the replaced addon generations whose modules or
+    classes are still alive and, while tracing, the ``limit`` (default 10)
+    allocation sites that grew most since ``start`` and during the last reload.
+    """
+    op = cmd.get("op", "report")
+    if op == "start":
+        _leaks.start(cmd.get("frames", 1))
+        log("Tracing allocations across reloads.")
+    elif op == "stop":
+        _leaks.stop()
+    elif op != "report":
+        raise ValueError(f"Unknown leaks op: {op!r} (use start, stop or report).")
+    return _leaks.report(cmd.get("limit", 10))
+
+
+def _store_import_profile(module_name, source, imports):
+    import_profiles[module_name] = {
+        "module": module_name,
+        "source": source,
+        "timestamp": time.time(),
+        "records": list(imports.records),
+    }
+
+
+def import_profile_command(cmd):
+    """Report what the last enable or reload of an addon imported, and how long it took.
+
+    ``module_name`` defaults to the most recently profiled addon. The result
+    lists the ``limit`` (default 20) modules with the highest self time; the
+    binary body is the full ``python -X importtime``-style tree as UTF-8 text.
+    Dependencies already imported by an earlier load are not imported again,
+    so a cold profile comes from enabling the addon in a fresh Blender.
+    """
+    module_name = cmd.get("module_name")
+    if module_name is None and import_profiles:
+        module_name = max(import_profiles.values(), key=lambda p: p["timestamp"])[
+            "module"
+        ]
+    profile = import_profiles.get(module_name)
+    if profile is None:
+        raise ValueError(
+            f"No import profile recorded for {module_name or 'any addon'} yet."
+        )
+    meta = {
+        "module": module_name,
+        "source": profile["source"],
+        "timestamp": profile["timestamp"],
+        **reload_timing.import_summary(profile["records"], cmd.get("limit", 20)),
+    }
+    return BinaryResult(
+        meta, reload_timing.format_importtime(profile["records"]).encode("utf-8")
+    )
+
+
+def _space_types():
+    """The bpy.types.Space* classes that accept draw handlers."""
+    types_ = getattr(bpy, "types", None)
+    found = []
+    for name in dir(types_) if types_ is not None else ():
+        if name.startswith("Space"):
+            space_type = getattr(types_, name, None)
+            if hasattr(space_type, "draw_handler_add"):
+                found.append(space_type)
+    return found
+
+
+def enable_callback_instrumentation(module_name):
+    """Start timing the callbacks ``module_name`` registers from now on."""
+    _callbacks.packages.add(module_name)
+    _callbacks.enabled = True
+    _callbacks.install(bpy.app.timers, _space_types())
+    log(f"Instrumenting callbacks registered by {module_name}.")
+
+
+def _instrument_addon(module_name):
+    """Wrap the application handlers a just-registered addon added."""
+    module = sys.modules.get(module_name)
+    handlers = getattr(bpy.app, "handlers", None)
+    if not _callbacks.enabled or module is None or handlers is None:
+        return
+    if module_name in _callbacks.packages:
+        _callbacks.instrument_module(module, handlers)
+
+
+def callbacks_command(cmd):
+    """Control callback instrumentation: ``op`` is enable, disable, reset or report.
+
+    ``enable`` takes ``module_name`` (default: the dev addon). Timers and draw
+    handlers are wrapped when they are registered, so only those registered
+    after enabling (e.g. by the next reload) are measured; application
+    handlers already registered are wrapped straight away. ``report`` lists the
+    callbacks by total time, worst first, up to ``limit`` (default 20).
+
+    A wrapped application handler can remove itself while it runs, and the
+    addon's ``unregister()`` finds its handlers as usual, but
+    ``bpy.app.handlers.<list>.remove(fn)`` anywhere else raises ``ValueError``
+    until instrumentation is disabled (see blender_probe/callbacks.py).
+    """
+    op = cmd.get("op", "report")
+    if op == "enable":
+        module_name = cmd.get("module_name") or os.environ.get(
+            "BLENDER_PROBE_ADDON_NAME"
+        )
+        if not module_name:
+            raise ValueError("callbacks enable needs a 'module_name'.")
+        enable_callback_instrumentation(module_name)
+        _instrument_addon(module_name)
+    elif op == "disable":
+        _callbacks.enabled = False
+        handlers = getattr(bpy.app, "handlers", None)
+        if handlers is not None:
+            _callbacks.unwrap_handlers(handlers)
+    elif op == "reset":
+        _callbacks.reset()
+    elif op != "report":
+        raise ValueError(
+            f"Unknown callbacks op: {op!r} (use enable, disable, reset or report)."
+        )
+    return {
+        "enabled": _callbacks.enabled,
+        "modules": sorted(_callbacks.packages),
+        "callbacks": _callbacks.report(cmd.get("limit", 20)),
+    }
+
 
 def enable_dev_addon():
     """
@@ -201,11 +1198,26 @@ def enable_dev_addon():
 
     log(f"Auto-enabling dev addon: {addon_name}")
     try:
+        executed = None
         if addon_name not in bpy.context.preferences.addons:
-            bpy.ops.preferences.addon_enable(module=addon_name)
+            executed = snapshot_sources(addon_name)
+            imports = reload_timing.ImportTimer()
+            try:
+                with imports:
+                    bpy.ops.preferences.addon_enable(module=addon_name)
+            finally:
+                _store_import_profile(addon_name, "enable", imports)
             log(f"Successfully enabled addon: {addon_name}")
+            summary = reload_timing.import_summary(imports.records, limit=0)
+            log(
+                f"Enabling imported {summary['modules']} modules in {summary['total_ms']:.1f} ms"
+                " (import_profile command for the breakdown)."
+            )
         else:
             log(f"Addon {addon_name} is already enabled.")
+        _refresh_import_graph(addon_name, executed)
+        _leaks.record_generation(addon_name)
+        _instrument_addon(addon_name)
     except Exception as e:
         log(f"Failed to enable addon {addon_name}: {e}")
         traceback.print_exc()
@@ -236,6 +1248,7 @@ def attach_to_debugger():
 
 
 def register():
+    _install_output_pump()
     log("Register function called.")
 
     attach_to_debugger()
@@ -262,6 +1275,8 @@ def register():
         log("Main thread timer registered.")
 
     if addon_name:
+        if os.environ.get("BLENDER_PROBE_INSTRUMENT_CALLBACKS", "") not in ("", "0"):
+            enable_callback_instrumentation(addon_name)
         bpy.app.timers.register(enable_dev_addon, first_interval=0.5)
 
 
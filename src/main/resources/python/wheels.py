@@ -12,14 +12,28 @@ without a running Blender. ``probe_server.py`` extracts it alongside itself and
 imports :func:`setup_dependencies`.
 """
 
+import concurrent.futures
+import contextlib
 import glob
+import hashlib
+import json
 import os
 import platform
 import shutil
 import sys
+import threading
+import time
 import tomllib
 import zipfile
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+else:
+    msvcrt = None
+
 
 def log(message):
     print(f"[BlenderProbe] {message}", flush=True)
@@ -30,6 +44,15 @@ def log(message):
 # same wheel is already unpacked, so extraction can be skipped on the next launch.
 _WHEEL_MARKER = ".blender_probe_extracted"
 
+# Wheels are extracted concurrently (zlib releases the GIL while inflating), on
+# at most this many threads and never more than the machine has cores.
+MAX_EXTRACT_WORKERS = 8
+
+# Wheels are unpacked into "<dest><_TMP_INFIX><pid>-<thread>" and renamed into
+# place; a stale extraction is first renamed to "<dest><_OLD_INFIX>...".
+_TMP_INFIX = ".tmp-"
+_OLD_INFIX = ".old-"
+
 
 def _current_os_family():
     if sys.platform == "darwin":
@@ -139,51 +162,577 @@ def _wheel_signature(whl_path):
     return f"{st.st_size}:{int(st.st_mtime)}"
 
 
-def _extract_wheel(whl_path, cache_root):
+@contextlib.contextmanager
+def _file_lock(path, blocking=True):
+    """Hold an advisory, exclusive, inter-process lock on ``path``.
+
+    The lock file is created if needed and left in place afterwards: deleting
+    it could let a later process lock a fresh file while an earlier one still
+    holds the old. With ``blocking=False`` a lock held elsewhere raises
+    :class:`BlockingIOError` instead of waiting.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fh = open(path, "a+b")
+    try:
+        if msvcrt is not None:
+            # msvcrt only offers a bounded blocking wait, so poll instead.
+            while True:
+                try:
+                    fh.seek(0)
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if not blocking:
+                        raise BlockingIOError(f"{path} is locked") from None
+                    time.sleep(0.05)
+        else:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        try:
+            yield
+        finally:
+            if msvcrt is not None:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+    finally:
+        fh.close()
+
+
+def _lock_path(dest):
+    """Lock file guarding ``dest``: ``<parent>.locks/<name>.lock``.
+
+    Kept outside ``dest``'s parent so that directory lists only extractions.
+    """
+    parent, name = os.path.split(dest)
+    return os.path.join(parent + ".locks", name + ".lock")
+
+
+def _extract_atomically(whl_path, dest, is_current, write_marker, claim=None):
+    """Make ``dest`` a complete extraction of ``whl_path``; True if it already was.
+
+    Two Blender instances launching together for the same project (a run and
+    a test configuration, or test shards) must neither unpack into the same
+    directory nor delete one the other is importing from. So under an advisory
+    lock (see :func:`_lock_path`) the existing extraction is checked with
+    ``is_current(dest)``; only if that fails is the wheel unpacked into a
+    private sibling directory, its marker written there by
+    ``write_marker(tmp)``, and the result renamed onto ``dest``. ``dest`` is
+    therefore always absent or complete, and a process that waited on the
+    lock finds and reuses the extraction the first one just finished.
+    ``claim(dest)``, if given, runs before the lock is released, whether
+    ``dest`` was reused or just extracted. Failures raise; nothing partial is
+    left behind.
+    """
+    with _file_lock(_lock_path(dest)):
+        if is_current(dest):
+            if claim is not None:
+                claim(dest)
+            return True
+        suffix = f"{os.getpid()}-{threading.get_ident()}"
+        tmp = f"{dest}{_TMP_INFIX}{suffix}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        try:
+            os.makedirs(tmp)
+            with zipfile.ZipFile(whl_path) as zf:
+                zf.extractall(tmp)
+            write_marker(tmp)
+            if os.path.isdir(dest):
+                # Stale: a directory can't be renamed over a non-empty one, so
+                # move the old one aside first and delete it afterwards.
+                old = f"{dest}{_OLD_INFIX}{suffix}"
+                os.rename(dest, old)
+                os.rename(tmp, dest)
+                shutil.rmtree(old, ignore_errors=True)
+            else:
+                os.rename(tmp, dest)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)  # only still there on failure
+        if claim is not None:
+            claim(dest)
+        return False
+
+
+def _extract_wheel(whl_path, cache_root, resolution=None):
     """Extract a wheel into a per-wheel cache dir and return that dir (or None).
 
     Skips extraction when the identical wheel (same size + mtime) is already
     unpacked, so repeated launches don't re-unzip unchanged dependencies. The
     cache key is the wheel's filename, which encodes name + exact version +
-    platform, so a new version lands in its own directory.
+    platform, so a new version lands in its own directory. Extraction is
+    atomic and safe against concurrent launches (see :func:`_extract_atomically`).
+    If updating an earlier extraction fails, that one is still complete and is
+    returned; ``resolution`` is then marked incomplete so the next launch retries.
     """
     stem = os.path.basename(whl_path)
     if stem.lower().endswith(".whl"):
         stem = stem[:-4]
 
     dest = os.path.join(cache_root, stem)
-    marker = os.path.join(dest, _WHEEL_MARKER)
     signature = _wheel_signature(whl_path)
 
-    if signature and os.path.isfile(marker):
+    def is_current(path):
         try:
-            with open(marker, encoding="utf-8") as fh:
-                if fh.read().strip() == signature:
-                    log(f"Using cached wheel: {stem}")
-                    return dest
+            with open(os.path.join(path, _WHEEL_MARKER), encoding="utf-8") as fh:
+                return bool(signature) and fh.read().strip() == signature
         except OSError:
-            pass  # unreadable marker -> fall through and re-extract cleanly
+            return False  # missing or unreadable marker -> re-extract cleanly
 
-    # Missing, partial, or stale extraction: start from a clean directory.
-    if os.path.isdir(dest):
-        shutil.rmtree(dest, ignore_errors=True)
+    def write_marker(path):
+        with open(os.path.join(path, _WHEEL_MARKER), "w", encoding="utf-8") as fh:
+            fh.write(signature)
 
     try:
-        os.makedirs(dest, exist_ok=True)
-        with zipfile.ZipFile(whl_path) as zf:
-            zf.extractall(dest)
-        with open(marker, "w", encoding="utf-8") as fh:
-            fh.write(signature)
+        reused = _extract_atomically(whl_path, dest, is_current, write_marker)
     except Exception as e:
-        log(f"Failed to extract wheel {stem}: {e}")
-        shutil.rmtree(dest, ignore_errors=True)
+        if not os.path.isfile(os.path.join(dest, _WHEEL_MARKER)):
+            log(f"Failed to extract wheel {stem}: {e}")
+            return None
+        log(f"Failed to re-extract wheel {stem}: {e}; using the previous extraction.")
+        if resolution is not None:
+            resolution.complete = False
+        return dest
+
+    log(f"Using cached wheel: {stem}" if reused else f"Extracted wheel: {stem}")
+    return dest
+
+
+# --- shared, content-addressed cache ------------------------------------------
+#
+# Opt-in (BLENDER_PROBE_WHEEL_CACHE=<dir>): instead of each project unpacking
+# its wheels under its own .blender_probe/, wheels are unpacked once per
+# machine into <dir>/entries/<sha256 of the .whl>, whatever the project or file
+# name. Each entry keeps one reference file per project that mounts it,
+# written while the entry is still locked, so no other launch can see it
+# unreferenced in between. Entries no live project references stay cached for
+# reuse; after every launch that resolves dependencies (not one reusing the
+# saved resolution), the least recently used of them are evicted while the
+# cache exceeds its budget (BLENDER_PROBE_WHEEL_CACHE_MB). Referenced entries
+# are never evicted, since another running Blender may have them on sys.path,
+# and neither are entries used within the last few minutes.
+
+DEFAULT_SHARED_CACHE_MB = 4096
+_ENTRY_MARKER = ".blender_probe_entry"  # JSON: wheel file name, extracted bytes
+_REFS_DIR = ".blender_probe_refs"
+_HASHES_FILE = "hashes.json"  # wheel path -> [signature, sha256], to skip re-hashing
+# A temporary extraction dir younger than this may belong to a live launch.
+_PARTIAL_ENTRY_GRACE = 3600
+# An entry used more recently than this may be about to be mounted.
+_RECENT_ENTRY_GRACE = 600
+
+
+def _tree_size(path):
+    total = 0
+    for dirpath, _dirnames, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _is_complete_entry(path):
+    return os.path.isfile(os.path.join(path, _ENTRY_MARKER))
+
+
+def _project_ref(project_root):
+    real = os.path.normcase(os.path.realpath(project_root))
+    return hashlib.sha1(real.encode("utf-8")).hexdigest()[:16]
+
+
+class SharedWheelCache:
+    """Machine-wide cache of extracted wheels keyed by their content hash."""
+
+    def __init__(self, root, budget_bytes):
+        self.root = root
+        self.entries_root = os.path.join(root, "entries")
+        self.budget_bytes = budget_bytes
+        self._hashes = None
+        self._hashes_dirty = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls):
+        """The cache configured by environment variables, or None if disabled."""
+        root = os.environ.get("BLENDER_PROBE_WHEEL_CACHE")
+        if not root:
+            return None
+        budget = os.environ.get("BLENDER_PROBE_WHEEL_CACHE_MB", DEFAULT_SHARED_CACHE_MB)
+        try:
+            budget_mb = float(budget)
+        except ValueError:
+            budget_mb = DEFAULT_SHARED_CACHE_MB
+        return cls(
+            os.path.abspath(os.path.expanduser(root)), int(budget_mb * 1024 * 1024)
+        )
+
+    # --- hashing ------------------------------------------------------------
+
+    def _load_hashes(self):
+        if self._hashes is None:
+            try:
+                with open(
+                    os.path.join(self.root, _HASHES_FILE), encoding="utf-8"
+                ) as fh:
+                    self._hashes = json.load(fh)
+            except (OSError, ValueError):
+                self._hashes = {}
+        return self._hashes
+
+    def wheel_hash(self, whl_path):
+        """SHA-256 of a .whl, re-computed only when its size or mtime changed."""
+        key = os.path.realpath(whl_path)
+        signature = _wheel_signature(whl_path)
+        with self._lock:
+            known = self._load_hashes().get(key)
+        if known and signature and known[0] == signature:
+            return known[1]
+        with open(whl_path, "rb") as fh:
+            digest = hashlib.file_digest(fh, "sha256").hexdigest()
+        with self._lock:
+            self._hashes[key] = [signature, digest]
+            self._hashes_dirty = True
+        return digest
+
+    def save_hashes(self):
+        with self._lock:
+            if not self._hashes_dirty:
+                return
+            hashes = {k: v for k, v in self._hashes.items() if os.path.exists(k)}
+            self._hashes_dirty = False
+        path = os.path.join(self.root, _HASHES_FILE)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(hashes, fh)
+            os.replace(tmp, path)
+        except OSError as e:
+            log(f"Could not save wheel hashes: {e}")
+
+    # --- entries ------------------------------------------------------------
+
+    def extract(self, whl_path, project_root=None):
+        """Return the shared extracted dir of a wheel, unpacking it if needed (or None).
+
+        With a ``project_root`` the entry is referenced by that project before
+        its lock is released, so a concurrent collection cannot delete it
+        before :meth:`finish` runs.
+        """
+        name = os.path.basename(whl_path)
+        try:
+            digest = self.wheel_hash(whl_path)
+        except OSError as e:
+            log(f"Failed to hash wheel {name}: {e}")
+            return None
+
+        dest = os.path.join(self.entries_root, digest)
+
+        def write_marker(path):
+            with open(os.path.join(path, _ENTRY_MARKER), "w", encoding="utf-8") as fh:
+                json.dump({"wheel": name, "bytes": _tree_size(path)}, fh)
+
+        def claim(path):
+            self._add_reference(path, project_root)
+
+        try:
+            reused = _extract_atomically(
+                whl_path,
+                dest,
+                _is_complete_entry,
+                write_marker,
+                claim if project_root is not None else None,
+            )
+        except Exception as e:
+            log(f"Failed to extract wheel {name}: {e}")
+            return None
+
+        if reused:
+            self.touch([dest])
+            log(f"Using shared cached wheel: {name}")
+            return dest
+        log(f"Extracted wheel into shared cache: {name}")
+        return dest
+
+    def touch(self, entry_dirs):
+        """Record a use of these entries, for LRU eviction."""
+        for entry in entry_dirs:
+            try:
+                os.utime(os.path.join(entry, _ENTRY_MARKER))
+            except OSError:
+                pass
+
+    def _entries(self):
+        """Names of the entry directories (not their lock files or temp dirs)."""
+        try:
+            names = os.listdir(self.entries_root)
+        except OSError:
+            return []
+        return sorted(n for n in names if "." not in n)
+
+    def _remove_leftovers(self, now):
+        """Delete temp dirs that extractions killed midway left behind."""
+        try:
+            names = os.listdir(self.entries_root)
+        except OSError:
+            return
+        for name in names:
+            if _TMP_INFIX not in name and _OLD_INFIX not in name:
+                continue
+            path = os.path.join(self.entries_root, name)
+            try:
+                if now - os.stat(path).st_mtime > _PARTIAL_ENTRY_GRACE:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def update_references(self, project_root, mounted_dirs):
+        """Record that ``project_root`` now uses exactly the entries in ``mounted_dirs``."""
+        used = {os.path.basename(d) for d in mounted_dirs}
+        ref = _project_ref(project_root)
+        for digest in self._entries():
+            entry = os.path.join(self.entries_root, digest)
+            if digest in used:
+                self._add_reference(entry, project_root)
+                continue
+            ref_path = os.path.join(entry, _REFS_DIR, ref)
+            try:
+                if os.path.exists(ref_path):
+                    os.remove(ref_path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _add_reference(entry, project_root):
+        refs_dir = os.path.join(entry, _REFS_DIR)
+        try:
+            os.makedirs(refs_dir, exist_ok=True)
+            with open(
+                os.path.join(refs_dir, _project_ref(project_root)),
+                "w",
+                encoding="utf-8",
+            ) as fh:
+                fh.write(os.path.realpath(project_root))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _live_references(entry):
+        """Reference files of projects that still exist; dead ones are removed."""
+        refs_dir = os.path.join(entry, _REFS_DIR)
+        live = 0
+        try:
+            names = os.listdir(refs_dir)
+        except OSError:
+            return 0
+        for name in names:
+            path = os.path.join(refs_dir, name)
+            try:
+                with open(path, encoding="utf-8") as fh:
+                    project = fh.read().strip()
+            except OSError:
+                continue
+            if project and os.path.isdir(project):
+                live += 1
+            else:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return live
+
+    def _remove(self, entry):
+        """Delete an entry unless another process is extracting, checking or using it."""
+        try:
+            with _file_lock(_lock_path(entry), blocking=False):
+                # A launch may have referenced it since the caller looked.
+                if self._live_references(entry):
+                    return False
+                shutil.rmtree(entry, ignore_errors=True)
+        except OSError:  # including BlockingIOError: in use, try next time
+            return False
+        return True
+
+    def collect_garbage(self, keep=()):
+        """Evict least recently used unreferenced entries while over budget.
+
+        Entries in ``keep`` (the dirs just mounted), entries a live project
+        references and entries used within :data:`_RECENT_ENTRY_GRACE` are
+        never evicted; damaged entries always are. Returns the names of the
+        removed entries.
+        """
+        keep = {os.path.basename(d) for d in keep}
+        removed = []
+        total = 0
+        candidates = []  # (last used, size, digest) of evictable entries
+        now = time.time()
+        self._remove_leftovers(now)
+        for digest in self._entries():
+            entry = os.path.join(self.entries_root, digest)
+            marker = os.path.join(entry, _ENTRY_MARKER)
+            try:
+                last_used = os.stat(marker).st_mtime
+                with open(marker, encoding="utf-8") as fh:
+                    size = int(json.load(fh).get("bytes", 0))
+            except (OSError, ValueError, AttributeError):
+                # Extractions are renamed into place complete, so an entry
+                # without a readable marker is damaged.
+                if digest not in keep and self._remove(entry):
+                    removed.append(digest)
+                continue
+            total += size
+            if (
+                digest not in keep
+                and now - last_used > _RECENT_ENTRY_GRACE
+                and not self._live_references(entry)
+            ):
+                candidates.append((last_used, size, digest))
+
+        for _used, size, digest in sorted(candidates):
+            if total <= self.budget_bytes:
+                break
+            if self._remove(os.path.join(self.entries_root, digest)):
+                removed.append(digest)
+                total -= size
+
+        if removed:
+            log(f"Removed {len(removed)} unused wheel(s) from the shared cache.")
+        if total > self.budget_bytes:
+            log(
+                f"Shared wheel cache holds {total / (1024 * 1024):.0f} MB, over its "
+                f"{self.budget_bytes / (1024 * 1024):.0f} MB budget "
+                "(BLENDER_PROBE_WHEEL_CACHE_MB), in wheels still in use."
+            )
+        return removed
+
+    def finish(self, project_root, mounted_dirs):
+        """Bookkeeping after a project mounted its wheels from this cache."""
+        self.update_references(project_root, mounted_dirs)
+        self.collect_garbage(keep=mounted_dirs)
+        self.save_hashes()
+
+
+# --- resolution index ---------------------------------------------------------
+#
+# Resolving dependencies means parsing the manifest, globbing wheels/, stat-ing
+# every wheel and checking every extraction. Its outcome -- the sys.path
+# entries in order plus the messages worth repeating -- is saved to
+# .blender_probe/resolution.json together with a stat signature of every path
+# it looked at (including ones that were missing). The next launch stats those
+# paths in one pass and, if nothing changed, mounts the saved entries without
+# resolving again. A touched but otherwise identical manifest still counts as
+# unchanged: its content hash is compared when its signature differs.
+
+_RESOLUTION_INDEX = "resolution.json"
+# Bump whenever resolution logic changes, so older indexes are ignored.
+_RESOLUTION_VERSION = 1
+
+
+def _stat_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
         return None
+    return f"{st.st_size}:{st.st_mtime_ns}"
 
-    log(f"Extracted wheel: {stem}")
-    return dest
+
+def _file_sha256(path):
+    try:
+        with open(path, "rb") as fh:
+            return hashlib.file_digest(fh, "sha256").hexdigest()
+    except OSError:
+        return None
+
+
+class _Resolution:
+    """What one dependency resolution mounted, said, and depended on."""
+
+    def __init__(self):
+        self.paths = []
+        self.messages = []
+        self.inputs = {}  # path -> stat signature (None: did not exist)
+        self.manifest_hash = None
+        self.complete = True  # False: something failed and should be retried
+
+    def note(self, message):
+        """Log a message that is repeated whenever this resolution is reused."""
+        self.messages.append(message)
+        log(message)
+
+    def depend(self, path):
+        """Make a change to ``path`` (including its creation) invalidate the result."""
+        if path not in self.inputs:
+            self.inputs[path] = _stat_signature(path)
+
+    def to_index(self, key):
+        return {
+            "key": key,
+            "inputs": self.inputs,
+            "manifest_hash": self.manifest_hash,
+            "paths": self.paths,
+            "messages": self.messages,
+        }
+
+    def mount(self, path):
+        """Add ``path`` to sys.path; True if it was not there yet."""
+        if path not in self.paths:
+            self.paths.append(path)
+        if path in sys.path:
+            return False
+        sys.path.append(path)
+        return True
+
+
+def _resolution_key(addon_name, shared_cache):
+    """Everything besides files that the resolution depends on."""
+    return {
+        "version": _RESOLUTION_VERSION,
+        "addon": addon_name,
+        "python": list(sys.version_info[:2]),
+        "platform": sys.platform,
+        "machine": platform.machine(),
+        "shared_cache": shared_cache.root if shared_cache is not None else None,
+    }
+
+
+def _load_resolution(index_path, key, manifest_path):
+    """The saved resolution if none of its inputs changed, else None."""
+    try:
+        with open(index_path, encoding="utf-8") as fh:
+            index = json.load(fh)
+        if index["key"] != key:
+            return None
+        inputs = index["inputs"]
+        current = {path: _stat_signature(path) for path in inputs}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+    touched = False
+    for path, signature in inputs.items():
+        if current[path] == signature:
+            continue
+        if path == manifest_path and _file_sha256(path) == index.get("manifest_hash"):
+            inputs[path] = current[path]  # touched, not edited
+            touched = True
+            continue
+        return None
+    if touched:
+        _save_resolution(index_path, index)  # so the next launch skips the hash
+    return index
+
+
+def _save_resolution(index_path, index):
+    tmp = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(index, fh)
+        os.replace(tmp, index_path)
+    except OSError as e:
+        log(f"Could not save the dependency resolution: {e}")
 
 
-def _read_manifest_wheels(manifest_path):
+def _read_manifest_wheels(manifest_path, resolution=None):
     """Return the wheel paths declared in the manifest's top-level ``wheels`` array.
 
     Returns a (possibly empty) list of the declared paths, or ``None`` when the
@@ -192,80 +741,117 @@ def _read_manifest_wheels(manifest_path):
     block a Run/Debug. An empty list means "the manifest declares no wheels", which
     is faithful to Blender installing nothing.
     """
+    resolution = resolution or _Resolution()
+    resolution.depend(manifest_path)
     if not os.path.isfile(manifest_path):
         return None
 
     try:
         with open(manifest_path, "rb") as fh:
-            data = tomllib.load(fh)
-    except (OSError, tomllib.TOMLDecodeError) as e:
-        log(f"Could not parse {os.path.basename(manifest_path)}: {e}")
+            content = fh.read()
+        resolution.manifest_hash = hashlib.sha256(content).hexdigest()
+        data = tomllib.loads(content.decode("utf-8"))
+    except (OSError, UnicodeDecodeError, tomllib.TOMLDecodeError) as e:
+        resolution.note(f"Could not parse {os.path.basename(manifest_path)}: {e}")
         return None
 
     wheels = data.get("wheels")
     if wheels is None:
         return []
     if not isinstance(wheels, list):
-        log("Manifest 'wheels' is not a list; ignoring it.")
+        resolution.note("Manifest 'wheels' is not a list; ignoring it.")
         return []
     return [w for w in wheels if isinstance(w, str)]
 
 
-def _mount_wheels(wheel_paths, cache_root):
+def _mount_wheels(
+    wheel_paths, cache_root, shared_cache=None, resolution=None, project_root=None
+):
     """Extract each wheel into the cache and add the extracted dir to sys.path.
 
     Extracting (rather than appending the raw .whl) is what lets wheels with
     compiled extensions import: a native .so/.pyd cannot be loaded from inside a
     zip via zipimport. Wheels built for other platforms are skipped.
+
+    Extraction runs on a small thread pool; the extracted dirs are still added
+    to sys.path in ``wheel_paths`` order, whichever finishes first. With a
+    ``shared_cache`` wheels are extracted there instead of under ``cache_root``,
+    and referenced by ``project_root``. Returns the extracted dirs.
     """
+    resolution = resolution or _Resolution()
     mounted = 0
     skipped = 0
+    compatible = []
     for whl in wheel_paths:
-        if not _wheel_is_compatible(whl):
-            log(f"Skipping wheel for another platform: {os.path.basename(whl)}")
+        if _wheel_is_compatible(whl):
+            compatible.append(whl)
+        else:
+            resolution.note(
+                f"Skipping wheel for another platform: {os.path.basename(whl)}"
+            )
             skipped += 1
-            continue
 
-        dest = _extract_wheel(whl, cache_root)
-        if dest and dest not in sys.path:
-            sys.path.append(dest)
+    def extract(whl):
+        if shared_cache is not None:
+            return shared_cache.extract(whl, project_root)
+        return _extract_wheel(whl, cache_root, resolution)
+
+    workers = min(len(compatible), MAX_EXTRACT_WORKERS, os.cpu_count() or 1)
+    if workers > 1:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="Blender Probe wheels"
+        ) as pool:
+            extracted = list(pool.map(extract, compatible))
+    else:
+        extracted = [extract(whl) for whl in compatible]
+
+    for dest in extracted:
+        if not dest:
+            resolution.complete = False  # retry the failed wheel next launch
+            continue
+        resolution.depend(dest)
+        if resolution.mount(dest):
             mounted += 1
 
     if mounted:
-        log(f"Mounted {mounted} wheel(s) for development.")
+        resolution.note(f"Mounted {mounted} wheel(s) for development.")
     if skipped:
-        log(f"Skipped {skipped} wheel(s) not matching this platform.")
+        resolution.note(f"Skipped {skipped} wheel(s) not matching this platform.")
+    return [dest for dest in extracted if dest]
 
 
-def _warn_unlisted_wheels(wheels_dir, mounted_paths):
+def _warn_unlisted_wheels(wheels_dir, mounted_paths, resolution=None):
     """Warn about .whl files in wheels/ that the manifest does not list.
 
     Blender only installs manifest-listed wheels, so an unlisted file would be
     absent once the extension is installed even though it is sitting in the folder.
     Surfacing it here catches that dev/prod divergence early.
     """
+    resolution = resolution or _Resolution()
     if not os.path.isdir(wheels_dir):
         return
 
     mounted = {os.path.normpath(p) for p in mounted_paths}
     for whl in sorted(glob.glob(os.path.join(wheels_dir, "*.whl"))):
         if os.path.normpath(whl) not in mounted:
-            log(
+            resolution.note(
                 "Wheel present but not listed in manifest 'wheels', so Blender "
                 f"will not install it: {os.path.basename(whl)}"
             )
 
 
-def _mount_venv_fallback(project_root):
+def _mount_venv_fallback(project_root, resolution=None):
     """Add a local ``.venv`` site-packages to sys.path (non-wheel projects)."""
+    resolution = resolution or _Resolution()
     venv_lib = os.path.join(project_root, ".venv", "lib")
+    resolution.depend(venv_lib)
     if os.path.exists(venv_lib):
         for item in os.listdir(venv_lib):
             site_packages = os.path.join(venv_lib, item, "site-packages")
+            resolution.depend(site_packages)
             if os.path.isdir(site_packages):
-                if site_packages not in sys.path:
-                    sys.path.append(site_packages)
-                    log(f"Added local venv site-packages: {item}")
+                if resolution.mount(site_packages):
+                    resolution.note(f"Added local venv site-packages: {item}")
                     break
 
 
@@ -274,20 +860,58 @@ def setup_dependencies(project_root, addon_name):
         return
 
     addon_dir = os.path.join(project_root, addon_name)
-    wheels_dir = os.path.join(addon_dir, "wheels")
     manifest_path = os.path.join(addon_dir, "blender_manifest.toml")
+    index_path = os.path.join(project_root, ".blender_probe", _RESOLUTION_INDEX)
+    shared_cache = SharedWheelCache.from_environment()
+    key = _resolution_key(addon_name, shared_cache)
+
+    index = _load_resolution(index_path, key, manifest_path)
+    if index is not None:
+        for message in index["messages"]:
+            log(message)
+        for path in index["paths"]:
+            if path not in sys.path:
+                sys.path.append(path)
+        if shared_cache is not None:
+            # References are unchanged; only record the use for LRU eviction.
+            # Collection scans every entry and runs on the next resolve.
+            shared_cache.touch(index["paths"])
+        return
+
+    resolution = _Resolution()
+    _resolve_dependencies(
+        project_root, addon_dir, manifest_path, shared_cache, resolution
+    )
+    if resolution.complete:
+        _save_resolution(index_path, resolution.to_index(key))
+
+
+def _resolve_dependencies(
+    project_root, addon_dir, manifest_path, shared_cache, resolution
+):
+    wheels_dir = os.path.join(addon_dir, "wheels")
     cache_root = os.path.join(project_root, ".blender_probe", "wheels")
+    resolution.depend(wheels_dir)  # its mtime changes when a wheel is added or removed
 
-    declared = _read_manifest_wheels(manifest_path)
+    declared = _read_manifest_wheels(manifest_path, resolution)
 
     if declared is None:
         # Manifest missing or unparsable: fall back to scanning wheels/ so a
         # transient edit can't block development.
         if os.path.isdir(wheels_dir):
-            log("Manifest unavailable; falling back to scanning wheels/ directory.")
-            _mount_wheels(sorted(glob.glob(os.path.join(wheels_dir, "*.whl"))), cache_root)
+            resolution.note(
+                "Manifest unavailable; falling back to scanning wheels/ directory."
+            )
+            wheel_paths = sorted(glob.glob(os.path.join(wheels_dir, "*.whl")))
+            for whl in wheel_paths:
+                resolution.depend(whl)
+            mounted = _mount_wheels(
+                wheel_paths, cache_root, shared_cache, resolution, project_root
+            )
+            if shared_cache is not None:
+                shared_cache.finish(project_root, mounted)
         else:
-            _mount_venv_fallback(project_root)
+            _mount_venv_fallback(project_root, resolution)
         return
 
     # Manifest-driven: mount exactly what Blender would install, resolving each
@@ -295,14 +919,19 @@ def setup_dependencies(project_root, addon_name):
     wheel_paths = []
     for entry in declared:
         resolved = os.path.normpath(os.path.join(addon_dir, entry))
+        resolution.depend(resolved)
         if os.path.isfile(resolved):
             wheel_paths.append(resolved)
         else:
-            log(f"Manifest lists a wheel that is missing on disk: {entry}")
+            resolution.note(f"Manifest lists a wheel that is missing on disk: {entry}")
 
     if wheel_paths or os.path.isdir(wheels_dir):
-        _warn_unlisted_wheels(wheels_dir, wheel_paths)
-        _mount_wheels(wheel_paths, cache_root)
+        _warn_unlisted_wheels(wheels_dir, wheel_paths, resolution)
+        mounted = _mount_wheels(
+            wheel_paths, cache_root, shared_cache, resolution, project_root
+        )
+        if shared_cache is not None:
+            shared_cache.finish(project_root, mounted)
     else:
         # Nothing bundled and no wheels/ dir: offer the local venv as a dev aid.
-        _mount_venv_fallback(project_root)
+        _mount_venv_fallback(project_root, resolution)
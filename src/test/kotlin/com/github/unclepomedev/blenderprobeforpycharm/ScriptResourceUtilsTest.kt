@@ -79,6 +79,20 @@ class ScriptResourceUtilsTest : BaseBlenderTest() {
         }
     }
 
+    fun testExtractScriptsToTempDir_KeepsPackageLayout() {
+        val entryPoint = ScriptResourceUtils.extractScriptsToTempDir(
+            "probe_server.py", "blender_probe/__init__.py", "blender_probe/protocol.py"
+        )
+
+        try {
+            val packageDir = File(entryPoint.parentFile, "blender_probe")
+            assertTrue("package must be importable", File(packageDir, "__init__.py").exists())
+            assertTrue("package module must land inside it", File(packageDir, "protocol.py").exists())
+        } finally {
+            FileUtil.delete(entryPoint.parentFile)
+        }
+    }
+
     fun testExtractScriptsToTempDir_NotFound() {
         try {
             ScriptResourceUtils.extractScriptsToTempDir(INVALID_SCRIPT_NAME)
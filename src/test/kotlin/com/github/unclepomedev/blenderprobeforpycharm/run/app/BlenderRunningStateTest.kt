@@ -2,6 +2,7 @@ package com.github.unclepomedev.blenderprobeforpycharm.run.app
 
 import com.github.unclepomedev.blenderprobeforpycharm.BaseBlenderTest
 import com.github.unclepomedev.blenderprobeforpycharm.settings.BlenderSettings
+import java.io.File
 
 class BlenderRunningStateTest : BaseBlenderTest() {
 
@@ -28,4 +29,20 @@ class BlenderRunningStateTest : BaseBlenderTest() {
             "--factory-startup" in params
         )
     }
+
+    fun testSocketPathUsedOnLinuxOnly() {
+        val tempDir = File("/tmp/blender_probe_scripts")
+
+        assertEquals(
+            "/tmp/blender_probe_scripts/probe.sock",
+            BlenderRunningState.socketPathFor(tempDir, isLinux = true)
+        )
+        assertNull(BlenderRunningState.socketPathFor(tempDir, isLinux = false))
+    }
+
+    fun testOverlongSocketPathFallsBackToTcp() {
+        val tempDir = File("/tmp/" + "x".repeat(120))
+
+        assertNull(BlenderRunningState.socketPathFor(tempDir, isLinux = true))
+    }
 }
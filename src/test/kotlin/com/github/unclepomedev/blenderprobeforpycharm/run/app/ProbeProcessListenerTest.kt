@@ -4,6 +4,7 @@ import com.github.unclepomedev.blenderprobeforpycharm.BaseBlenderTest
 import com.github.unclepomedev.blenderprobeforpycharm.BlenderProbeManager
 import com.intellij.execution.process.NopProcessHandler
 import com.intellij.execution.process.ProcessEvent
+import com.intellij.execution.process.ProcessOutputTypes
 import com.intellij.openapi.util.io.FileUtil
 import java.io.File
 
@@ -19,4 +20,22 @@ class ProbeProcessListenerTest : BaseBlenderTest() {
         assertFalse("temp dir should be deleted", tempDir.exists())
         assertNull("active port should be cleared", BlenderProbeManager.activePort)
     }
+
+    fun testSocketAnnouncementSelectsUnixSocket() {
+        val tempDir = FileUtil.createTempDirectory("blender_probe_test", null)
+        val listener = ProbeProcessListener(tempDir)
+        BlenderProbeManager.activePort = 12345
+
+        listener.onTextAvailable(
+            ProcessEvent(NopProcessHandler(), "BLENDER_PROBE_SOCKET::/tmp/probe.sock\n"),
+            ProcessOutputTypes.STDOUT
+        )
+
+        assertEquals("/tmp/probe.sock", BlenderProbeManager.activeSocketPath)
+        assertNull("a socket announcement replaces the TCP port", BlenderProbeManager.activePort)
+        assertTrue(BlenderProbeManager.isConnected)
+
+        listener.processTerminated(ProcessEvent(NopProcessHandler()))
+        assertFalse(BlenderProbeManager.isConnected)
+    }
 }
@@ -40,4 +40,9 @@ class BlenderSettingsTest : BaseBlenderTest() {
         settings.loadState(newState)
         assertFalse(settings.state.useFactoryStartup)
     }
-}
\ No newline at end of file
+
+    fun testIncrementalReloadDefaultsToFalse() {
+        val settings = BlenderSettings.getInstance(project)
+        assertFalse("hot reload should purge the whole add-on by default", settings.state.incrementalReload)
+    }
+}
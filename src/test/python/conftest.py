@@ -9,7 +9,9 @@ it lets us test the fix without launching Blender.
 """
 
 import os
+import socket
 import sys
+import threading
 import types
 
 import pytest
@@ -93,11 +95,43 @@ def probe(monkeypatch):
         "BLENDER_PROBE_PYDEVD_PATH",
         "BLENDER_PROBE_PROJECT_ROOT",
         "BLENDER_PROBE_ADDON_NAME",
+        "BLENDER_PROBE_SOCKET_PATH",
     ):
         monkeypatch.delenv(var, raising=False)
 
     while not probe_server.execution_queue.empty():
         probe_server.execution_queue.get_nowait()
     probe_server.server_running = False
+    probe_server._last_activity = 0.0
+    probe_server._dispatch_interval = probe_server.IDLE_INTERVAL
+    probe_server._tick_returned_at = None
+    probe_server.metrics.reset()
+    probe_server.import_graphs.clear()
+    probe_server.reload_history.clear()
+    probe_server.import_profiles.clear()
+    probe_server._active_tasks.clear()
+    probe_server._preflight = probe_server.PreflightCompiler()
+    probe_server._sampler.stop()
+    probe_server._sampler.reset()
+    probe_server._callbacks = probe_server.CallbackInstrumentation()
+    probe_server._leaks.stop()
+    probe_server._leaks = probe_server.LeakTracker()
 
     return probe_server
+
+
+@pytest.fixture
+def server(probe):
+    """Run a ProbeTransport on an ephemeral loopback port; yield it."""
+    from blender_probe import transport
+
+    listener = socket.create_server(("127.0.0.1", 0))
+    loop = transport.ProbeTransport(
+        listener, on_message=probe.handle_message, max_clients=4
+    )
+    thread = threading.Thread(target=loop.serve_forever, daemon=True)
+    thread.start()
+    loop.address = listener.getsockname()
+    yield loop
+    loop.stop()
+    thread.join(timeout=2)
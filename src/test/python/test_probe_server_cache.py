@@ -0,0 +1,138 @@
+"""Tests for the reload-surviving addon cache (``probe_cache`` and its command)."""
+
+import sys
+
+import pytest
+
+import probe_cache
+
+ADDON = "cachedaddon"
+
+# Each import of the addon counts how often it had to build its table.
+_INIT = (
+    "import probe_cache\n"
+    "import cachebuilds\n"
+    "def _build():\n"
+    "    cachebuilds.count += 1\n"
+    "    return bytes(100)\n"
+    "TABLE = probe_cache.get_cache(__name__).get_or_compute('table', VERSION, _build)\n"
+    "def register():\n    pass\n"
+    "def unregister():\n    pass\n"
+)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """A small private store in place of the shared one."""
+    fresh = probe_cache._Store(max_bytes=1000, max_entries=3)
+    monkeypatch.setattr(probe_cache, "_store", fresh)
+    return fresh
+
+
+def test_entries_are_matched_by_key_and_version(store):
+    cache = probe_cache.get_cache("a")
+    cache.put("lut", b"v1", version=1)
+
+    assert cache.get("lut", version=1) == b"v1"
+    assert cache.get("lut", version=2, default="stale") == "stale"
+    assert "lut" not in cache  # the stale entry was dropped, not kept around
+
+
+def test_namespaces_do_not_share_keys(store):
+    probe_cache.get_cache("a").put("lut", 1)
+
+    assert probe_cache.get_cache("b").get("lut") is None
+
+
+def test_least_recently_used_entries_are_evicted_first(store):
+    cache = probe_cache.get_cache("a")
+    for key in "xyz":
+        cache.put(key, key, size=300)
+    cache.get("x")  # now y is the least recently used
+
+    cache.put("w", "w", size=300)
+
+    assert [key in cache for key in "wxyz"] == [True, True, False, True]
+    assert store.bytes == 900
+    assert probe_cache.status()["namespaces"]["a"]["evictions"] == 1
+
+
+def test_entry_count_is_bounded_too(store):
+    cache = probe_cache.get_cache("a")
+    for key in "wxyz":
+        cache.put(key, key, size=1)
+
+    assert "w" not in cache and len(store.entries) == 3
+
+
+def test_value_larger_than_the_cache_is_not_stored(store):
+    cache = probe_cache.get_cache("a")
+    cache.put("small", 1, size=10)
+
+    assert not cache.put("huge", b"", size=5000)
+    assert "small" in cache and "huge" not in cache
+
+
+def test_estimate_size_counts_buffers_and_containers():
+    assert probe_cache.estimate_size(memoryview(bytes(4096))) == 4096
+    assert probe_cache.estimate_size([b"x" * 1000]) > 1000
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    module = type(sys)("cachebuilds")
+    module.count = 0
+    monkeypatch.setitem(sys.modules, "cachebuilds", module)
+    return module
+
+
+@pytest.fixture
+def addon(tmp_path, monkeypatch, probe, store, builds):
+    addon_dir = tmp_path / ADDON
+    addon_dir.mkdir()
+    (addon_dir / "__init__.py").write_text("VERSION = 1\n" + _INIT)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield addon_dir
+    for key in [k for k in sys.modules if k == ADDON or k.startswith(ADDON + ".")]:
+        del sys.modules[key]
+
+
+def test_cached_data_survives_reloads_until_its_version_changes(probe, addon, builds):
+    probe.deep_reload_addon(ADDON)
+    probe.deep_reload_addon(ADDON)
+    assert builds.count == 1
+    assert sys.modules[ADDON].TABLE == bytes(100)
+
+    (addon / "__init__.py").write_text("VERSION = 2\n" + _INIT)
+    probe.deep_reload_addon(ADDON)
+
+    assert builds.count == 2
+
+
+def test_cache_command_reports_and_clears(probe, addon, builds):
+    probe.deep_reload_addon(ADDON)
+
+    status = probe.process_command({"action": "cache"})
+    assert status["namespaces"][ADDON]["entries"] == 1
+    assert status["namespaces"][ADDON]["misses"] == 1
+
+    status = probe.process_command(
+        {"action": "cache", "op": "clear", "namespace": ADDON}
+    )
+    assert status["entries"] == 0
+    probe.deep_reload_addon(ADDON)
+    assert builds.count == 2
+
+
+def test_cache_command_rejects_unknown_op(probe):
+    with pytest.raises(ValueError, match="Unknown cache op"):
+        probe.process_command({"action": "cache", "op": "explode"})
+
+
+def test_malformed_size_setting_falls_back_to_the_default(monkeypatch, capsys):
+    monkeypatch.setenv("BLENDER_PROBE_CACHE_MB", "1GB")
+    assert probe_cache._max_bytes_from_environment() == 256 * 1024 * 1024
+    assert "Ignoring BLENDER_PROBE_CACHE_MB='1GB'" in capsys.readouterr().out
+
+    monkeypatch.setenv("BLENDER_PROBE_CACHE_MB", "0.5")
+    assert probe_cache._max_bytes_from_environment() == 512 * 1024
@@ -0,0 +1,259 @@
+"""Tests for callback latency instrumentation (``callbacks`` and its command)."""
+
+import gc
+import importlib
+import sys
+import types
+import weakref
+
+import pytest
+
+from blender_probe.callbacks import BUCKETS_MS, CallbackInstrumentation
+
+ADDON = "callbackaddon"
+
+_INIT = (
+    "import bpy\n"
+    "calls = []\n"
+    "def tick():\n    calls.append('tick')\n    return 1.0\n"
+    "def on_load(*args):\n    calls.append('load')\n"
+    "def draw():\n    calls.append('draw')\n"
+    "_handle = None\n"
+    "def register():\n"
+    "    global _handle\n"
+    "    bpy.app.timers.register(tick, first_interval=0.1)\n"
+    "    bpy.app.handlers.load_post.append(on_load)\n"
+    "    _handle = bpy.types.SpaceView3D.draw_handler_add(draw, (), 'WINDOW', 'POST_PIXEL')\n"
+    "def unregister():\n"
+    "    bpy.types.SpaceView3D.draw_handler_remove(_handle, 'WINDOW')\n"
+    "    bpy.app.handlers.load_post.remove(on_load)\n"
+    "    if bpy.app.timers.is_registered(tick):\n"
+    "        bpy.app.timers.unregister(tick)\n"
+)
+
+
+class FakeSpaceView3D:
+    """``bpy.types.SpaceView3D`` with a draw handler registry."""
+
+    handlers = {}
+
+    @classmethod
+    def draw_handler_add(cls, callback, args, region_type, draw_type):
+        handle = object()
+        cls.handlers[handle] = callback
+        return handle
+
+    @classmethod
+    def draw_handler_remove(cls, handle, region_type):
+        del cls.handlers[handle]
+
+
+@pytest.fixture
+def fake_bpy(probe, monkeypatch):
+    FakeSpaceView3D.handlers = {}
+    handlers = types.SimpleNamespace(load_post=[], depsgraph_update_post=[])
+    monkeypatch.setattr(probe.bpy.app, "handlers", handlers, raising=False)
+    monkeypatch.setattr(
+        probe.bpy,
+        "types",
+        types.SimpleNamespace(SpaceView3D=FakeSpaceView3D),
+        raising=False,
+    )
+    yield probe.bpy
+    probe._callbacks.uninstall()
+
+
+@pytest.fixture
+def addon(tmp_path, monkeypatch, fake_bpy):
+    addon_dir = tmp_path / ADDON
+    addon_dir.mkdir()
+    (addon_dir / "__init__.py").write_text(_INIT)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield addon_dir
+    for key in [k for k in sys.modules if k == ADDON or k.startswith(ADDON + ".")]:
+        del sys.modules[key]
+
+
+def _instrumentation(*packages):
+    instrumentation = CallbackInstrumentation()
+    instrumentation.packages.update(packages)
+    instrumentation.enabled = True
+    return instrumentation
+
+
+def test_wrapper_counts_calls_errors_and_buckets_latency(monkeypatch):
+    instrumentation = _instrumentation(__name__)
+    clock = iter([0.0, 0.0003, 1.0, 1.2])
+    monkeypatch.setattr(
+        "blender_probe.callbacks.time.perf_counter", lambda: next(clock)
+    )
+
+    def flaky(fail):
+        if fail:
+            raise ValueError("boom")
+        return "ok"
+
+    wrapped = instrumentation.wrap("timer", flaky)
+    assert wrapped(False) == "ok"
+    with pytest.raises(ValueError):
+        wrapped(True)
+
+    (row,) = instrumentation.report()
+    assert row["kind"] == "timer"
+    assert row["callback"].endswith("flaky")
+    assert (row["calls"], row["errors"]) == (2, 1)
+    assert row["max_ms"] == pytest.approx(200)
+    assert row["histogram"]["<=0.5ms"] == 1
+    assert (
+        row["histogram"][f"<={BUCKETS_MS[-1]}ms"] == 0 and row["histogram"]["more"] == 1
+    )
+
+
+def test_wrapper_keeps_function_attributes_such_as_persistent():
+    def handler(*args):
+        pass
+
+    handler._bpy_persistent = True
+
+    wrapped = _instrumentation(__name__).wrap("handler:load_post", handler)
+
+    assert wrapped._bpy_persistent is True
+    assert wrapped.__wrapped__ is handler
+
+
+def test_report_orders_callbacks_by_total_time_and_honours_limit():
+    instrumentation = _instrumentation()
+    instrumentation._record("timer:a.cheap", 0.001, False)
+    instrumentation._record("timer:a.costly", 0.002, False)
+    instrumentation._record("timer:a.costly", 0.002, False)
+
+    assert [r["callback"] for r in instrumentation.report()] == ["a.costly", "a.cheap"]
+    assert len(instrumentation.report(limit=1)) == 1
+
+
+def test_only_functions_of_the_instrumented_package_are_wrapped(probe):
+    instrumentation = _instrumentation("myaddon")
+    timers = probe.bpy.app.timers
+    instrumentation.install(timers)
+
+    def foreign():
+        pass
+
+    timers.register(foreign)
+
+    assert timers.registered[0]["func"] is foreign
+
+
+def test_wrapped_timer_stays_unregisterable_by_the_original_function(probe):
+    instrumentation = _instrumentation(__name__)
+    timers = probe.bpy.app.timers
+    instrumentation.install(timers)
+
+    def tick():
+        return None
+
+    timers.register(tick, first_interval=0.5, persistent=True)
+
+    (entry,) = timers.registered
+    assert entry["func"] is not tick and entry["func"].__wrapped__ is tick
+    assert (entry["first_interval"], entry["persistent"]) == (0.5, True)
+    assert timers.is_registered(tick)
+    timers.unregister(tick)
+    assert timers.registered == []
+
+
+def test_finished_timers_do_not_keep_their_function_alive(probe):
+    instrumentation = _instrumentation(__name__)
+    timers = probe.bpy.app.timers
+    instrumentation.install(timers)
+    alive = []
+
+    for _ in range(3):  # a one-shot timer from each of three reloads
+
+        def once():
+            return None
+
+        timers.register(once)
+        alive.append(weakref.ref(once))
+    del once
+
+    timers.registered.pop(0)["func"]()  # returned None, so Blender drops it
+    gc.collect()
+    assert alive[0]() is None
+
+    timers.simulate_file_load()  # the others were not persistent
+    timers.register(lambda: 1.0)  # the next registration forgets them
+    gc.collect()
+    assert [ref() for ref in alive] == [None, None, None]
+
+
+def test_reload_instruments_the_addons_callbacks_and_reports_them(
+    probe, addon, fake_bpy
+):
+    probe.callbacks_command({"op": "enable", "module_name": ADDON})
+    probe.deep_reload_addon(ADDON)
+    module = sys.modules[ADDON]
+
+    fake_bpy.app.timers.call(fake_bpy.app.timers.registered[0]["func"])
+    fake_bpy.app.handlers.load_post[0]()
+    next(iter(FakeSpaceView3D.handlers.values()))()
+
+    assert module.calls == ["tick", "load", "draw"]
+    report = probe.callbacks_command({"op": "report"})
+    assert report["enabled"] and report["modules"] == [ADDON]
+    assert {row["kind"] for row in report["callbacks"]} == {
+        "timer",
+        "handler:load_post",
+        "draw:FakeSpaceView3D/WINDOW/POST_PIXEL",
+    }
+    assert all(row["calls"] == 1 for row in report["callbacks"])
+
+
+def test_addon_unregister_still_finds_its_wrapped_handlers(probe, addon, fake_bpy):
+    probe.callbacks_command({"op": "enable", "module_name": ADDON})
+    probe.deep_reload_addon(ADDON)
+
+    sys.modules[ADDON].unregister()
+
+    assert fake_bpy.app.handlers.load_post == []
+    assert fake_bpy.app.timers.registered == []
+    assert FakeSpaceView3D.handlers == {}
+
+
+def test_enable_wraps_handlers_already_registered(probe, addon, fake_bpy):
+    importlib.import_module(ADDON).register()
+    on_load = sys.modules[ADDON].on_load
+
+    probe.callbacks_command({"op": "enable", "module_name": ADDON})
+
+    assert fake_bpy.app.handlers.load_post[0].__wrapped__ is on_load
+    probe.callbacks_command({"op": "disable"})
+    assert fake_bpy.app.handlers.load_post == [on_load]
+
+
+def test_one_shot_handler_can_remove_itself_while_wrapped(probe, addon, fake_bpy):
+    probe.callbacks_command({"op": "enable", "module_name": ADDON})
+    probe.deep_reload_addon(ADDON)
+    module = sys.modules[ADDON]
+
+    def once(*args):
+        fake_bpy.app.handlers.load_post.remove(once)
+
+    once.__module__ = ADDON
+    fake_bpy.app.handlers.load_post.append(once)
+    probe._callbacks.wrap_handlers(fake_bpy.app.handlers)
+    wrapper = fake_bpy.app.handlers.load_post[-1]
+    assert wrapper is not once
+
+    wrapper()  # removes itself; would raise ValueError without the swap
+    fake_bpy.app.handlers.load_post[0]()  # a handler that stays is re-wrapped
+
+    assert once not in fake_bpy.app.handlers.load_post
+    assert fake_bpy.app.handlers.load_post[0].__wrapped__ is module.on_load
+    (row,) = [r for r in probe._callbacks.report() if r["callback"].endswith("once")]
+    assert row["calls"] == 1
+
+
+def test_callbacks_command_rejects_unknown_op(probe):
+    with pytest.raises(ValueError, match="Unknown callbacks op"):
+        probe.callbacks_command({"op": "explode"})
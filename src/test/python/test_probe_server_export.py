@@ -0,0 +1,177 @@
+"""Tests for bulk RNA array export (``rna_export`` and the export_array command).
+
+Blender's RNA collections are faked with just what ``export_array`` relies on:
+item attributes, ``bl_rna.properties[...].type`` and a ``foreach_get`` that
+fills a flat buffer.
+"""
+
+import array
+import socket
+import sys
+import types
+
+import pytest
+
+from blender_probe import protocol, rna_export
+
+
+class FakeItem:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+        self.bl_rna = types.SimpleNamespace(
+            properties={
+                name: types.SimpleNamespace(type=_rna_type(value))
+                for name, value in values.items()
+            }
+        )
+
+
+def _rna_type(value):
+    while isinstance(value, (list, tuple)):
+        value = value[0]
+    return {bool: "BOOLEAN", int: "INT"}.get(type(value), "FLOAT")
+
+
+def _flatten(value):
+    if isinstance(value, (list, tuple)):
+        return [x for v in value for x in _flatten(v)]
+    return [value]
+
+
+# The buffer formats Blender's foreach_get copies into without converting each item.
+_RAW_FORMATS = {"FLOAT": "f", "INT": "i", "BOOLEAN": "?"}
+
+
+def _fill(buffer, values):
+    view = memoryview(buffer)
+    assert view.format == _RAW_FORMATS[_rna_type(values)], "slow foreach_get path"
+    assert len(values) == len(view), "foreach_get needs an exactly sized buffer"
+    for i, value in enumerate(values):
+        view[i] = value
+
+
+class FakeCollection(list):
+    def foreach_get(self, attribute, buffer):
+        _fill(buffer, [x for item in self for x in _flatten(getattr(item, attribute))])
+
+
+class FakeArray(list):
+    def foreach_get(self, buffer):
+        _fill(buffer, list(self))
+
+
+class FakeMesh:
+    def __init__(self, vertices):
+        self.vertices = FakeCollection(vertices)
+        self.uv_layers = {"UVMap": types.SimpleNamespace(data=FakeCollection())}
+
+    def path_resolve(self, path):
+        if path == "vertices":
+            return self.vertices
+        if path == 'uv_layers["UVMap"].data':
+            return self.uv_layers["UVMap"].data
+        raise ValueError(f"Path {path!r} not found")
+
+
+class FakeImage:
+    def __init__(self, pixels):
+        self.pixels = FakeArray(pixels)
+        self.bl_rna = types.SimpleNamespace(
+            properties={"pixels": types.SimpleNamespace(type="FLOAT")}
+        )
+
+
+def _data():
+    vertices = [
+        FakeItem(co=(float(i), i + 0.5, -1.0), index=i, select=bool(i % 2))
+        for i in range(4)
+    ]
+    return types.SimpleNamespace(
+        meshes={"Cube": FakeMesh(vertices), "Empty Mesh": FakeMesh([])},
+        images={"Render": FakeImage([0.25] * 8)},
+    )
+
+
+def test_exports_vector_attribute_of_every_item():
+    meta, buffer = rna_export.export_array(_data(), 'meshes["Cube"].vertices', "co")
+
+    assert meta["dtype"] == "float32"
+    assert meta["shape"] == [4, 3]
+    assert meta["nbytes"] == 4 * 3 * 4
+    assert meta["byteorder"] == sys.byteorder
+    assert list(buffer[:6]) == [0.0, 0.5, -1.0, 1.0, 1.5, -1.0]
+
+
+@pytest.mark.parametrize(
+    "attribute, dtype, values",
+    [("index", "int32", [0, 1, 2, 3]), ("select", "bool", [0, 1, 0, 1])],
+)
+def test_dtype_follows_the_rna_property_type(attribute, dtype, values):
+    meta, buffer = rna_export.export_array(
+        _data(), "bpy.data.meshes['Cube'].vertices", attribute
+    )
+
+    assert (meta["dtype"], meta["shape"]) == (dtype, [4])
+    assert list(buffer) == values
+    assert meta["nbytes"] == len(values) * memoryview(buffer).itemsize
+
+
+def test_exports_array_property_of_a_single_struct():
+    meta, buffer = rna_export.export_array(_data(), 'images["Render"]', "pixels")
+
+    assert (meta["dtype"], meta["shape"]) == ("float32", [8])
+    assert list(buffer) == [0.25] * 8
+
+
+def test_empty_collection_exports_empty_buffer():
+    meta, buffer = rna_export.export_array(
+        _data(), 'meshes["Empty Mesh"].uv_layers["UVMap"].data', "uv"
+    )
+
+    assert meta["count"] == 0 and len(buffer) == 0
+
+
+@pytest.mark.parametrize(
+    "path, attribute, message",
+    [
+        ("Cube.vertices", "co", "Expected a path"),
+        ('objects["Cube"]', "co", "no collection"),
+        ('meshes["Sphere"].vertices', "co", "no item"),
+        ('meshes["Cube"].edges', "co", "Cannot resolve"),
+        ('meshes["Cube"].vertices', "normal", "no attribute"),
+    ],
+)
+def test_bad_requests_raise_export_error(path, attribute, message):
+    with pytest.raises(rna_export.ExportError, match=message):
+        rna_export.export_array(_data(), path, attribute)
+
+
+def test_export_command_streams_raw_bytes_to_session(probe, server, monkeypatch):
+    """End to end: the array comes back as the result frame's binary body."""
+    count = 5000
+    vertices = [FakeItem(co=(float(i), 0.0, 1.0)) for i in range(count)]
+    monkeypatch.setattr(
+        probe.bpy,
+        "data",
+        types.SimpleNamespace(meshes={"Big": FakeMesh(vertices)}),
+        raising=False,
+    )
+    # Force a chunked reply: the body is far larger than one section may be.
+    server.max_chunk_size = 4096
+
+    with socket.create_connection(server.address, timeout=2) as sock:
+        command = {"id": 1, "action": "export_array", "path": 'meshes["Big"].vertices'}
+        sock.sendall(protocol.encode_frame({**command, "attribute": "co"}))
+        assert protocol.read_frame(sock)["type"] == "ack"
+        while not probe.execution_queue.empty() or probe._active_tasks:
+            probe.main_thread_loop()
+
+        frame = protocol.recv_frame(sock, max_chunk_size=4096)
+
+    record = frame.message
+    assert record["status"] == "ok"
+    assert record["result"]["shape"] == [count, 3]
+    values = array.array("f")
+    values.frombytes(bytes(frame.body))
+    assert len(values) == count * 3
+    assert values[3 * 1234 : 3 * 1234 + 3].tolist() == [1234.0, 0.0, 1.0]
@@ -0,0 +1,185 @@
+"""Tests for incremental hot reload (``import_graph`` + ``deep_reload_addon``).
+
+A small addon package is written to a temp dir; every module appends its name
+to a shared log when executed, so the tests can see exactly which modules a
+reload re-ran and which were left cached.
+"""
+
+import importlib
+import os
+import sys
+import types
+
+import pytest
+
+from blender_probe.import_graph import AddonImportGraph
+
+ADDON = "incaddon"
+
+_FILES = {
+    "__init__.py": (
+        "from . import ops, panel\n"
+        "def register():\n    _log.log.append('register')\n"
+        "def unregister():\n    _log.log.append('unregister')\n"
+    ),
+    "ops.py": "from .util import helper\n",
+    "util.py": "def helper():\n    return 1\n",
+    "panel.py": "X = 1\n",
+    "lazy.py": "Y = 1\n",
+}
+
+
+def _write(addon_dir, name, body):
+    # Every module records its own execution; `_log` lives outside the package.
+    path = addon_dir / name
+    path.write_text(
+        "import incaddon_exec_log as _log\n_log.log.append(__name__)\n" + body
+    )
+    # Make sure the stat signature moves even on coarse-mtime filesystems.
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+
+@pytest.fixture
+def addon(tmp_path, monkeypatch):
+    addon_dir = tmp_path / ADDON
+    addon_dir.mkdir()
+    for name, body in _FILES.items():
+        _write(addon_dir, name, body)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    exec_log = types.ModuleType("incaddon_exec_log")
+    exec_log.log = []
+    monkeypatch.setitem(sys.modules, "incaddon_exec_log", exec_log)
+    yield addon_dir, exec_log.log
+    for key in [k for k in sys.modules if k == ADDON or k.startswith(ADDON + ".")]:
+        del sys.modules[key]
+
+
+def _load(probe, log):
+    importlib.import_module(ADDON)
+    importlib.import_module(f"{ADDON}.lazy")
+    probe._refresh_import_graph(ADDON)
+    log.clear()
+
+
+def test_graph_finds_changed_module_and_its_importers(probe, addon):
+    addon_dir, log = addon
+    _load(probe, log)
+    graph = probe.import_graphs[ADDON]
+
+    _write(addon_dir, "util.py", "def helper():\n    return 2\n")
+
+    assert graph.changed() == {f"{ADDON}.util"}
+    assert graph.modules_to_reload() == {ADDON, f"{ADDON}.ops", f"{ADDON}.util"}
+
+
+def test_touch_without_content_change_is_not_a_change(probe, addon):
+    addon_dir, log = addon
+    _load(probe, log)
+
+    _write(addon_dir, "panel.py", _FILES["panel.py"])  # same content, new mtime
+
+    assert probe.import_graphs[ADDON].changed() == set()
+
+
+def test_incremental_reload_reexecutes_only_affected_modules(probe, addon):
+    addon_dir, log = addon
+    _load(probe, log)
+    old_panel = sys.modules[f"{ADDON}.panel"]
+
+    _write(addon_dir, "util.py", "def helper():\n    return 2\n")
+    result = probe.deep_reload_addon(ADDON, mode="incremental")
+
+    executed = {entry for entry in log if entry.startswith(ADDON)}
+    assert executed == {ADDON, f"{ADDON}.ops", f"{ADDON}.util"}
+    assert log.count("register") == 1 and log.count("unregister") == 1
+    assert sys.modules[f"{ADDON}.panel"] is old_panel  # untouched, still cached
+    assert sys.modules[f"{ADDON}.ops"].helper() == 2
+    assert result["mode"] == "incremental"
+    assert result["purged"] == 3
+
+
+def test_incremental_reload_reimports_lazily_loaded_leaf(probe, addon):
+    addon_dir, log = addon
+    _load(probe, log)
+
+    _write(addon_dir, "lazy.py", "Y = 2\n")
+    probe.deep_reload_addon(ADDON, mode="incremental")
+
+    # Nothing imports lazy statically, but it was loaded before, so it comes back.
+    assert sys.modules[f"{ADDON}.lazy"].Y == 2
+    assert {e for e in log if e.startswith(ADDON)} == {f"{ADDON}.lazy"}
+
+
+def test_incremental_reload_without_graph_falls_back_to_full(probe, addon, capsys):
+    _, log = addon
+    importlib.import_module(ADDON)  # loaded, but never indexed
+    log.clear()
+
+    result = probe.deep_reload_addon(ADDON, mode="incremental")
+
+    assert result["mode"] == "full"
+    assert {ADDON, f"{ADDON}.ops", f"{ADDON}.util", f"{ADDON}.panel"} <= set(log)
+    assert "doing a full reload" in capsys.readouterr().out
+
+
+def test_relative_imports_resolve_against_the_importing_package(tmp_path):
+    pkg = tmp_path / "relpkg"
+    (pkg / "sub").mkdir(parents=True)
+    (pkg / "__init__.py").write_text("")
+    (pkg / "sub" / "__init__.py").write_text("from .. import top\n")
+    (pkg / "sub" / "leaf.py").write_text("from . import sibling\nfrom ..top import T\n")
+    (pkg / "sub" / "sibling.py").write_text("")
+    (pkg / "top.py").write_text("T = 1\n")
+
+    modules = {}
+    for name, rel in [
+        ("relpkg", "__init__.py"),
+        ("relpkg.sub", "sub/__init__.py"),
+        ("relpkg.sub.leaf", "sub/leaf.py"),
+        ("relpkg.sub.sibling", "sub/sibling.py"),
+        ("relpkg.top", "top.py"),
+    ]:
+        mod = types.ModuleType(name)
+        mod.__file__ = str(pkg / rel)
+        if rel.endswith("__init__.py"):
+            mod.__path__ = [os.path.dirname(mod.__file__)]
+        modules[name] = mod
+
+    graph = AddonImportGraph("relpkg")
+    graph.refresh(modules)
+
+    assert graph.importers({"relpkg.top"}) == {
+        "relpkg.top",
+        "relpkg.sub",
+        "relpkg.sub.leaf",
+    }
+    assert graph.importers({"relpkg.sub.sibling"}) == {
+        "relpkg.sub.sibling",
+        "relpkg.sub.leaf",
+    }
+
+
+def test_file_saved_during_a_reload_is_reloaded_by_the_next_one(
+    probe, addon, monkeypatch
+):
+    addon_dir, log = addon
+    _load(probe, log)
+    _write(addon_dir, "panel.py", "X = 2\n")
+    real_import = importlib.import_module
+
+    def import_then_save(name, *args):
+        module = real_import(name, *args)
+        if name == ADDON:  # the editor saves again while the reload is running
+            _write(addon_dir, "panel.py", "X = 3\n")
+        return module
+
+    monkeypatch.setattr(probe.importlib, "import_module", import_then_save)
+    probe.deep_reload_addon(ADDON, mode="incremental")
+    assert sys.modules[f"{ADDON}.panel"].X == 2
+    monkeypatch.setattr(probe.importlib, "import_module", real_import)
+
+    result = probe.deep_reload_addon(ADDON, mode="incremental")
+
+    assert sys.modules[f"{ADDON}.panel"].X == 3
+    assert result["purged"] >= 1
@@ -0,0 +1,98 @@
+"""Tests for leak tracking across hot reloads (``leak_tracker`` and its command)."""
+
+import sys
+import types
+
+import pytest
+
+ADDON = "leakyaddon"
+
+# register() hands the Panel class to a registry outside the addon (standing
+# in for Blender's RNA), and unregister() forgets to take it back when `leak`
+# is set; `grow` allocates 200 KB per registration that is never freed.
+_INIT = (
+    "import leakregistry\n"
+    "class Panel:\n    pass\n"
+    "def register():\n"
+    "    leakregistry.classes.append(Panel)\n"
+    "    if leakregistry.grow:\n"
+    "        leakregistry.blobs.append(bytearray(200 * 1024))\n"
+    "def unregister():\n"
+    "    if not leakregistry.leak:\n"
+    "        leakregistry.classes.remove(Panel)\n"
+)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    module = types.ModuleType("leakregistry")
+    module.classes, module.blobs, module.leak, module.grow = [], [], False, False
+    monkeypatch.setitem(sys.modules, "leakregistry", module)
+    return module
+
+
+@pytest.fixture
+def addon(tmp_path, monkeypatch, probe, registry):
+    addon_dir = tmp_path / ADDON
+    addon_dir.mkdir()
+    (addon_dir / "__init__.py").write_text(_INIT)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    probe.deep_reload_addon(ADDON)
+    yield addon_dir
+    probe._leaks.stop()
+    for key in [k for k in sys.modules if k == ADDON or k.startswith(ADDON + ".")]:
+        del sys.modules[key]
+
+
+def test_clean_reloads_leave_no_stale_generations(probe, addon):
+    probe.deep_reload_addon(ADDON)
+    probe.deep_reload_addon(ADDON)
+
+    report = probe.process_command({"action": "leaks"})
+
+    assert report["generations"] == 3
+    assert report["stale"] == []
+    assert not report["tracing"]
+
+
+def test_class_kept_alive_by_a_missed_unregister_is_reported(probe, addon, registry):
+    registry.leak = True
+    probe.deep_reload_addon(ADDON)
+    probe.deep_reload_addon(ADDON)
+
+    report = probe.process_command({"action": "leaks"})
+
+    assert report["stale_classes"] == 2
+    assert [g["generation"] for g in report["stale"]] == [1, 2]
+    assert report["stale"][0]["classes"] == [f"{ADDON}.Panel"]
+    assert (
+        report["stale"][0]["modules"] == []
+    )  # only the class survived, not its module
+
+
+def test_tracing_reports_the_allocation_site_that_grows(probe, addon, registry):
+    registry.grow = True
+    probe.process_command({"action": "leaks", "op": "start"})
+    probe.deep_reload_addon(ADDON)
+    probe.deep_reload_addon(ADDON)
+
+    report = probe.process_command({"action": "leaks", "limit": 3})
+
+    assert report["tracing"]
+    since_start = report["growth_since_start"][0]
+    assert since_start["site"][0].endswith("__init__.py:7")
+    assert since_start["size_diff_kb"] >= 400
+    assert report["growth_last_reload"][0]["size_diff_kb"] >= 200
+
+
+def test_stop_ends_tracing(probe, addon):
+    probe.process_command({"action": "leaks", "op": "start"})
+
+    report = probe.process_command({"action": "leaks", "op": "stop"})
+
+    assert not report["tracing"] and "growth_since_start" not in report
+
+
+def test_leaks_command_rejects_unknown_op(probe):
+    with pytest.raises(ValueError, match="Unknown leaks op"):
+        probe.process_command({"action": "leaks", "op": "explode"})
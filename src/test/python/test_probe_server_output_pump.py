@@ -0,0 +1,126 @@
+"""Tests for the non-blocking stdout/stderr pump (``output_pump``)."""
+
+import threading
+import types
+
+import pytest
+
+from blender_probe.output_pump import OutputPump
+
+
+class SlowStream:
+    """A stream whose writes block until released, like a full pipe."""
+
+    def __init__(self):
+        self.parts = []
+        self.released = threading.Event()
+
+    def write(self, text):
+        self.released.wait(5)
+        self.parts.append(text)
+
+    def flush(self):
+        pass
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+
+@pytest.fixture
+def fake_sys():
+    stdout, stderr = SlowStream(), SlowStream()
+    namespace = types.SimpleNamespace(stdout=stdout, stderr=stderr)
+    yield namespace
+    stdout.released.set()
+    stderr.released.set()
+
+
+@pytest.fixture
+def pump(fake_sys):
+    pump = OutputPump(max_chars=100)
+    pump.install(fake_sys)
+    yield pump
+    pump.uninstall(fake_sys)
+
+
+def test_writes_return_while_the_real_stream_is_blocked(pump, fake_sys):
+    real = fake_sys.stdout._target
+
+    print("hello", file=fake_sys.stdout)
+    print("world", file=fake_sys.stdout)
+
+    assert real.parts == []  # nothing got through yet, but print did not block
+    real.released.set()
+    assert pump.drain()
+    assert real.text == "hello\nworld\n"
+
+
+def test_overflow_is_dropped_counted_and_reported(pump, fake_sys):
+    real = fake_sys.stdout._target
+
+    fake_sys.stdout.write("a" * 80)
+    fake_sys.stdout.write("b" * 50)  # does not fit: dropped
+    real.released.set()
+    assert pump.drain()
+    fake_sys.stdout.write("c\n")
+    assert pump.drain()
+
+    assert (
+        real.text
+        == "a" * 80 + "\n[BlenderProbe] ... 50 characters of output dropped\nc\n"
+    )
+    assert pump.stats()["dropped_writes"] == 1 and pump.stats()["dropped_chars"] == 50
+
+
+def test_marker_lines_are_never_dropped_and_keep_their_place(pump, fake_sys):
+    real = fake_sys.stdout._target
+
+    fake_sys.stdout.write("x" * 100)  # buffer now full
+    pump.write_line("BLENDER_PROBE_PORT::1234")
+    fake_sys.stdout.write("lost")
+    real.released.set()
+    assert pump.drain()
+
+    assert real.text.splitlines()[:2] == ["x" * 100, "BLENDER_PROBE_PORT::1234"]
+
+
+def test_stdout_and_stderr_share_one_ordered_queue(pump, fake_sys):
+    fake_sys.stdout.write("1")
+    fake_sys.stderr.write("2")
+    fake_sys.stdout.write("3")
+    fake_sys.stdout._target.released.set()
+    fake_sys.stderr._target.released.set()
+    assert pump.drain()
+
+    assert fake_sys.stdout._target.text == "13"
+    assert fake_sys.stderr._target.text == "2"
+
+
+def test_uninstall_restores_the_original_streams(fake_sys):
+    original = fake_sys.stdout
+    pump = OutputPump(max_chars=100)
+    pump.install(fake_sys)
+    fake_sys.stdout.write("pending")
+    original.released.set()
+
+    pump.uninstall(fake_sys)
+
+    assert fake_sys.stdout is original
+    assert original.text == "pending"
+
+
+def test_announce_goes_through_the_pump_when_enabled(
+    probe, pump, fake_sys, monkeypatch
+):
+    monkeypatch.setattr(probe, "_output_pump", pump)
+    fake_sys.stdout.write("y" * 100)
+
+    probe.announce("BLENDER_PROBE_SOCKET::/tmp/probe.sock")
+    fake_sys.stdout._target.released.set()
+    assert pump.drain()
+
+    assert fake_sys.stdout._target.text.endswith(
+        "BLENDER_PROBE_SOCKET::/tmp/probe.sock\n"
+    )
+    assert probe.process_command({"action": "stats"})["output"]["dropped_writes"] == 0
@@ -0,0 +1,138 @@
+"""Tests for the off-main-thread pre-flight compile of reloads (``preflight``)."""
+
+import importlib.util
+import os
+import socket
+import sys
+import time
+
+import pytest
+
+from blender_probe import protocol
+from blender_probe.preflight import PreflightCompiler, PreflightError
+
+ADDON = "preflightaddon"
+
+
+def _write(path, text):
+    path.write_text(text)
+    # Make sure the stat signature moves even on coarse-mtime filesystems.
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+
+@pytest.fixture
+def addon(tmp_path, monkeypatch):
+    addon_dir = tmp_path / ADDON
+    (addon_dir / "sub").mkdir(parents=True)
+    _write(addon_dir / "__init__.py", "from . import ops\ndef register():\n    pass\n")
+    _write(addon_dir / "ops.py", "X = 1\n")
+    _write(addon_dir / "sub" / "__init__.py", "")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield addon_dir
+    for key in [k for k in sys.modules if k == ADDON or k.startswith(ADDON + ".")]:
+        del sys.modules[key]
+
+
+def test_compiles_sources_into_the_import_cache(addon):
+    assert PreflightCompiler().check(ADDON) == 2  # __init__ and ops; sub is unused
+
+    cached = importlib.util.cache_from_source(str(addon / "ops.py"))
+    assert os.path.exists(cached)
+
+
+def test_files_the_addon_never_imports_cannot_block_a_reload(addon):
+    importlib.import_module(ADDON)
+    (addon / "tests").mkdir()
+    _write(addon / "tests" / "test_ops.py", "def broken(:\n")
+    _write(addon / "scratch.py", "def broken(:\n")
+
+    assert PreflightCompiler().check(ADDON) == 2
+
+
+def test_new_module_imported_by_a_changed_one_is_checked(addon):
+    importlib.import_module(ADDON)
+    compiler = PreflightCompiler()
+    compiler.check(ADDON)
+    _write(addon / "helpers.py", "def broken(:\n")
+    _write(addon / "ops.py", "from .helpers import *\nX = 1\n")
+
+    with pytest.raises(PreflightError) as excinfo:
+        compiler.check(ADDON)
+
+    assert excinfo.value.path == str(addon / "helpers.py")
+
+
+def test_only_changed_sources_are_recompiled(addon):
+    compiler = PreflightCompiler()
+    compiler.check(ADDON)
+
+    assert compiler.check(ADDON) == 0
+    _write(addon / "ops.py", "X = 2\n")
+    assert compiler.check(ADDON) == 1
+
+
+def test_syntax_error_names_file_and_line(addon):
+    _write(addon / "ops.py", "X = 1\ndef broken(:\n")
+
+    with pytest.raises(PreflightError) as excinfo:
+        PreflightCompiler().check(ADDON)
+
+    assert excinfo.value.path == str(addon / "ops.py")
+    assert excinfo.value.lineno == 2
+    assert "SyntaxError" in str(excinfo.value)
+
+
+def test_broken_save_never_reaches_the_main_thread(probe, addon):
+    importlib.import_module(ADDON)
+    live = sys.modules[ADDON]
+    _write(addon / "ops.py", "def broken(:\n")
+    replies = []
+    command = probe.Command(
+        {"id": 1, "action": "reload", "module_name": ADDON}, reply=replies.append
+    )
+
+    assert probe.preflight_reload(command) is False
+
+    assert probe.execution_queue.empty()
+    assert sys.modules[ADDON] is live  # still registered, never purged
+    (record,) = replies
+    assert record["status"] == "error"
+    assert record["result"] == {
+        "preflight": "failed",
+        "file": str(addon / "ops.py"),
+        "line": 1,
+    }
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_clean_reload_is_queued_after_preflight(probe, server, addon):
+    with socket.create_connection(server.address, timeout=2) as sock:
+        sock.sendall(
+            protocol.encode_frame({"id": 1, "action": "reload", "module_name": ADDON})
+        )
+        assert protocol.read_frame(sock) == {"id": 1, "type": "ack"}
+
+        _wait_until(lambda: not probe.execution_queue.empty())
+        assert probe.execution_queue.get_nowait().id == 1
+
+
+def test_broken_reload_is_rejected_without_the_main_thread(probe, server, addon):
+    _write(addon / "__init__.py", "def register(:\n")
+    with socket.create_connection(server.address, timeout=2) as sock:
+        sock.sendall(
+            protocol.encode_frame({"id": 2, "action": "reload", "module_name": ADDON})
+        )
+        assert protocol.read_frame(sock)["type"] == "ack"
+
+        record = protocol.read_frame(sock)  # main_thread_loop never ran
+
+    assert record["status"] == "error"
+    assert "__init__.py:1" in record["error"]
+    assert probe.execution_queue.empty()
@@ -0,0 +1,161 @@
+"""Tests for the ``profile`` command (cProfile capture on the main thread)."""
+
+import marshal
+import pstats
+import sys
+import types
+
+import pytest
+
+
+def _slow_function():
+    return sum(i * i for i in range(20000))
+
+
+def _run(probe, message):
+    replies = []
+    probe.enqueue_command(
+        probe.Command({"id": 1, **message}, reply=lambda *a: replies.append(a))
+    )
+    while not replies:
+        probe.main_thread_loop()
+    ((record, *body),) = replies
+    return record, body[0] if body else None
+
+
+def _functions(data):
+    return {name for (_file, _line, name) in marshal.loads(data)}
+
+
+@pytest.fixture
+def ops(probe, monkeypatch):
+    calls = []
+
+    def cube_add(context, **properties):
+        calls.append((context, properties))
+        _slow_function()
+        return {"FINISHED"}
+
+    fake = types.SimpleNamespace(
+        mesh=types.SimpleNamespace(primitive_cube_add=cube_add)
+    )
+    monkeypatch.setattr(probe.bpy, "ops", fake)
+    return calls
+
+
+def test_profiles_an_operator_and_returns_pstats(probe, ops):
+    record, data = _run(
+        probe,
+        {
+            "action": "profile",
+            "target": "operator",
+            "idname": "mesh.primitive_cube_add",
+            "properties": {"size": 2},
+        },
+    )
+
+    assert record["status"] == "ok", record["error"]
+    assert ops == [("EXEC_DEFAULT", {"size": 2})]
+    assert record["result"]["operator_result"] == ["FINISHED"]
+    assert "_slow_function" in _functions(data)
+    assert any("_slow_function" in row["function"] for row in record["result"]["top"])
+
+
+def test_profiles_a_reload(probe, monkeypatch):
+    monkeypatch.setattr(
+        probe, "deep_reload_addon", lambda name, mode="full": _slow_function()
+    )
+
+    record, data = _run(
+        probe, {"action": "profile", "target": "reload", "module_name": "addon"}
+    )
+
+    assert record["status"] == "ok"
+    assert "_slow_function" in _functions(data)
+
+
+def test_duration_profile_spans_ticks_and_sees_other_main_thread_work(
+    probe, monkeypatch
+):
+    monkeypatch.setattr(probe, "TICK_BUDGET", 0)
+    replies = []
+    probe.enqueue_command(
+        probe.Command(
+            {"id": 1, "action": "profile", "target": "duration", "seconds": 0.05},
+            reply=lambda *a: replies.append(a),
+        )
+    )
+
+    while not replies:
+        probe.main_thread_loop()
+        _slow_function()  # what Blender would run between timer ticks
+
+    ((record, data),) = replies
+    assert record["status"] == "ok"
+    assert record["result"]["elapsed_ms"] >= 50
+    assert "_slow_function" in _functions(data)
+    assert sys.getprofile() is None  # profiler switched off again
+
+
+def test_duration_profile_is_resumed_once_per_tick(probe, monkeypatch):
+    """Profiling must not spin the main thread it is measuring."""
+    real = probe._profile_duration
+    resumes = []
+    inners = []
+
+    def counting(cmd, seconds):
+        inner = real(cmd, seconds)
+        inners.append(inner)
+        while True:
+            next(inner)
+            resumes.append(1)
+            yield
+
+    monkeypatch.setattr(probe, "_profile_duration", counting)
+    probe.enqueue_command(
+        probe.Command({"action": "profile", "target": "duration", "seconds": 5})
+    )
+    probe.main_thread_loop()  # starts the command
+
+    try:
+        for tick in range(1, 4):
+            probe.main_thread_loop()
+            assert len(resumes) == tick
+    finally:
+        probe._active_tasks.clear()
+        inners[0].close()  # stops the profiler
+    assert sys.getprofile() is None
+
+
+def test_writes_prof_file_under_project(probe, ops, tmp_path, monkeypatch):
+    monkeypatch.setenv("BLENDER_PROBE_PROJECT_ROOT", str(tmp_path))
+
+    record, data = _run(
+        probe,
+        {
+            "action": "profile",
+            "target": "operator",
+            "idname": "mesh.primitive_cube_add",
+            "output": True,
+        },
+    )
+
+    path = record["result"]["file"]
+    assert path.startswith(str(tmp_path / ".blender_probe" / "profiles"))
+    assert open(path, "rb").read() == data
+    assert pstats.Stats(path).total_calls == record["result"]["total_calls"]
+
+
+@pytest.mark.parametrize(
+    "message, error",
+    [
+        ({"target": "operator", "idname": "mesh.nope"}, "Unknown operator"),
+        ({"target": "duration", "seconds": 0}, "seconds must be"),
+        ({"target": "everything"}, "Unknown profile target"),
+    ],
+)
+def test_bad_profile_requests_are_reported(probe, ops, message, error):
+    record, _ = _run(probe, {"action": "profile", **message})
+
+    assert record["status"] == "error"
+    assert error in record["error"]
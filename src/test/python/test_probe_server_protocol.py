@@ -0,0 +1,266 @@
+"""Tests for the probe server's wire protocol: framing and connection handling.
+
+These run the real selector loop (``transport.ProbeTransport``) on a loopback
+port, wired to ``probe_server.handle_message``, and talk to it over plain
+sockets so the exact bytes a Kotlin client would exchange are exercised.
+"""
+
+import json
+import socket
+import threading
+
+import pytest
+
+from blender_probe import protocol, transport
+
+
+def _frame(message):
+    return protocol.encode_frame(message)
+
+
+def _connect(server):
+    return socket.create_connection(server.address, timeout=2)
+
+
+@pytest.fixture
+def client_pair(server):
+    """Yield a client socket connected to the running server."""
+    sock = _connect(server)
+    yield sock
+    sock.close()
+
+
+# --- framing ------------------------------------------------------------------
+
+
+def test_encode_frame_has_padded_ascii_header():
+    frame = protocol.encode_frame({"action": "ping"})
+    header, body = frame[: protocol.HEADER_SIZE], frame[protocol.HEADER_SIZE :]
+
+    assert int(header.decode("ascii").strip()) == len(body)
+    assert json.loads(body) == {"action": "ping"}
+
+
+def test_read_frame_rejects_oversized_header():
+    a, b = socket.socketpair()
+    with a, b:
+        a.sendall(f"{protocol.MAX_CHUNK_SIZE + 1:<{protocol.HEADER_SIZE}}".encode())
+        with pytest.raises(protocol.ProtocolError, match="too large"):
+            protocol.read_frame(b)
+
+
+def test_read_frame_returns_none_on_clean_close():
+    a, b = socket.socketpair()
+    with b:
+        a.close()
+        assert protocol.read_frame(b) is None
+
+
+def test_frame_decoder_handles_arbitrary_fragmentation():
+    stream = _frame({"id": 1}) + _frame({"id": 2, "pad": "x" * 300}) + _frame({"id": 3})
+    decoder = protocol.FrameDecoder()
+
+    # Byte-at-a-time is the worst case a non-blocking socket can deliver.
+    frames = [f for i in range(len(stream)) for f in decoder.feed(stream[i : i + 1])]
+
+    assert [f.message["id"] for f in frames] == [1, 2, 3]
+    assert decoder.buffered == 0
+
+
+def test_frame_decoder_enforces_size_limit_from_header_alone():
+    decoder = protocol.FrameDecoder(max_chunk_size=100)
+    with pytest.raises(protocol.ProtocolError, match="too large"):
+        decoder.feed(b"101".ljust(protocol.HEADER_SIZE))
+
+
+def test_binary_body_is_received_in_place():
+    payload = bytes(range(256)) * 64
+    header_and_json, body = protocol.encode_frame({"id": 1}, payload)
+    decoder = protocol.FrameDecoder()
+    a, b = socket.socketpair()
+    with a, b:
+        a.sendall(header_and_json)
+        a.sendall(body)
+
+        frame = None
+        while frame is None:
+            target = decoder.buffer()
+            if decoder._state == decoder._BODY:
+                # recv_into must be writing into the final body buffer itself.
+                assert target.obj is decoder._target
+            frame = decoder.advance(b.recv_into(target))
+
+    assert frame.message == {"id": 1}
+    assert frame.body == payload
+
+
+def test_chunked_body_limit_applies_per_chunk_not_per_message():
+    payload = b"x" * 1000
+    parts = protocol.encode_chunked_frame({"id": 2}, payload, chunk_size=100)
+    decoder = protocol.FrameDecoder(max_chunk_size=128)
+
+    frames = [f for part in parts for f in decoder.feed(part)]
+
+    assert len(frames) == 1
+    assert frames[0].body == payload  # 10x the limit in total, fine when chunked
+
+
+def test_unchunked_body_over_limit_is_rejected():
+    header_and_json, _ = protocol.encode_frame({"id": 3}, b"x" * 200)
+    decoder = protocol.FrameDecoder(max_chunk_size=128)
+    with pytest.raises(protocol.ProtocolError, match="too large"):
+        decoder.feed(header_and_json)
+
+
+def test_json_only_frames_keep_the_original_header_format():
+    # Older clients write just the decimal length; that must stay valid.
+    frame = protocol.encode_frame({"action": "ping"})
+    assert frame[: protocol.HEADER_SIZE].split() == [
+        str(len(frame) - protocol.HEADER_SIZE).encode()
+    ]
+
+
+# --- connection handling ------------------------------------------------------
+
+
+def test_legacy_one_shot_command_is_acked_and_closed(probe, client_pair):
+    client_pair.sendall(_frame({"action": "ping"}))
+
+    assert client_pair.recv(16) == b"ACK"
+    assert client_pair.recv(16) == b""  # server closed the connection
+    assert probe.execution_queue.get_nowait().message == {"action": "ping"}
+
+
+def test_persistent_session_carries_many_commands(probe, client_pair):
+    # Pipeline several frames before reading any reply, as a busy IDE would.
+    for i in range(1, 4):
+        client_pair.sendall(_frame({"id": i, "action": "ping"}))
+
+    replies = [protocol.read_frame(client_pair) for _ in range(3)]
+
+    assert [r["id"] for r in replies] == [1, 2, 3]
+    assert all(r["type"] == "ack" for r in replies)
+    queued = [probe.execution_queue.get_nowait() for _ in range(3)]
+    assert [q.id for q in queued] == [1, 2, 3]
+
+
+def test_session_receives_completion_record_after_main_thread_runs(probe, client_pair):
+    client_pair.sendall(_frame({"id": "a", "action": "ping"}))
+    assert protocol.read_frame(client_pair) == {"id": "a", "type": "ack"}
+
+    probe.main_thread_loop()  # what Blender's timer would do
+
+    record = protocol.read_frame(client_pair)
+    assert record["id"] == "a"
+    assert record["type"] == "result"
+    assert record["status"] == "ok"
+    assert record["result"] == "pong"
+
+
+def test_bad_header_drops_connection(probe, client_pair):
+    client_pair.sendall(b"not-a-number".ljust(protocol.HEADER_SIZE))
+
+    assert client_pair.recv(16) == b""
+    assert probe.execution_queue.empty()
+
+
+def test_many_clients_share_one_io_thread(probe, server):
+    threads_before = threading.active_count()
+    clients = [_connect(server) for _ in range(3)]
+    try:
+        for i, sock in enumerate(clients):
+            sock.sendall(_frame({"id": i, "action": "ping"}))
+        acks = [protocol.read_frame(sock) for sock in clients]
+
+        assert [a["id"] for a in acks] == [0, 1, 2]
+        # No thread per connection any more.
+        assert threading.active_count() == threads_before
+    finally:
+        for sock in clients:
+            sock.close()
+
+
+def test_connections_beyond_limit_are_refused(server):
+    clients = [_connect(server) for _ in range(server.max_clients)]
+    try:
+        # Make sure the loop has accepted all of them before the extra one.
+        for i, sock in enumerate(clients):
+            sock.sendall(_frame({"id": i, "action": "ping"}))
+            protocol.read_frame(sock)
+
+        extra = _connect(server)
+        with extra:
+            assert extra.recv(16) == b""  # closed straight away
+    finally:
+        for sock in clients:
+            sock.close()
+
+
+def test_session_command_carries_its_binary_body(probe, client_pair):
+    payload = b"\x00\x01" * 5000
+    for part in protocol.encode_chunked_frame(
+        {"id": 9, "action": "ping"}, payload, 4096
+    ):
+        client_pair.sendall(part)
+
+    assert protocol.read_frame(client_pair)["type"] == "ack"
+    command = probe.execution_queue.get_nowait()
+    assert command.body == payload
+
+
+def test_single_reply_larger_than_output_cap_is_delivered(
+    probe, server, client_pair, monkeypatch
+):
+    # The cap bounds a backlog for a client that stopped reading, not one big reply.
+    server.max_pending_output = 1000
+    payload = bytes(5000)
+    monkeypatch.setattr(
+        probe, "process_command", lambda cmd: probe.BinaryResult({}, payload)
+    )
+
+    client_pair.sendall(_frame({"id": 1, "action": "export_array"}))
+    assert protocol.read_frame(client_pair)["type"] == "ack"
+    probe.main_thread_loop()
+
+    frame = protocol.recv_frame(client_pair)
+    assert frame.message["status"] == "ok"
+    assert frame.body == payload
+
+
+# --- unix domain socket -------------------------------------------------------
+
+unix_only = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs AF_UNIX")
+
+
+@unix_only
+def test_listener_uses_unix_socket_path_from_environment(probe, tmp_path, monkeypatch):
+    path = str(tmp_path / "probe.sock")
+    (tmp_path / "probe.sock").write_text("stale")  # left behind by a crashed session
+    monkeypatch.setenv("BLENDER_PROBE_SOCKET_PATH", path)
+
+    listener, announcement = probe._create_listener()
+    loop = transport.ProbeTransport(listener, on_message=probe.handle_message)
+    thread = threading.Thread(target=loop.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert announcement == f"BLENDER_PROBE_SOCKET::{path}"
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(2)
+            sock.connect(path)
+            sock.sendall(_frame({"id": 1, "action": "ping"}))
+            assert protocol.read_frame(sock) == {"id": 1, "type": "ack"}
+    finally:
+        loop.stop()
+        thread.join(timeout=2)
+
+
+@unix_only
+def test_unusable_socket_path_falls_back_to_tcp(probe, tmp_path, monkeypatch):
+    monkeypatch.setenv(
+        "BLENDER_PROBE_SOCKET_PATH", str(tmp_path / "missing" / "probe.sock")
+    )
+
+    listener, announcement = probe._create_listener()
+    with listener:
+        assert listener.family == socket.AF_INET
+        assert announcement == f"BLENDER_PROBE_PORT::{listener.getsockname()[1]}"
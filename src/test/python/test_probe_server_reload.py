@@ -18,7 +18,7 @@ def test_communication_survives_file_switch(probe, capsys):
     assert entry["persistent"] is True
 
     # Commands are processed before the switch.
-    probe.execution_queue.put({"action": "ping"})
+    probe.enqueue_command(probe.Command({"action": "ping"}))
     probe.main_thread_loop()
     assert "Pong" in capsys.readouterr().out
 
@@ -32,7 +32,7 @@ def test_communication_survives_file_switch(probe, capsys):
     )
 
     # And communication still works after the switch.
-    probe.execution_queue.put({"action": "ping"})
+    probe.enqueue_command(probe.Command({"action": "ping"}))
     timers.call(probe.main_thread_loop)
     assert "Pong" in capsys.readouterr().out
 
@@ -43,12 +43,14 @@ def test_bad_command_does_not_stop_draining(probe, capsys):
     If it did, Blender would unregister the timer and reproduce the same
     silent-death symptom the persistence fix addresses.
     """
-    probe.execution_queue.put("not-a-dict")  # process_command will raise
-    probe.execution_queue.put({"action": "ping"})
+    probe.enqueue_command(probe.Command("not-a-dict"))  # process_command will raise
+    probe.enqueue_command(probe.Command({"action": "ping"}))
 
     result = probe.main_thread_loop()
 
-    assert result == 0.1  # returned normally -> Blender keeps the timer alive
+    # Returned normally -> Blender keeps the timer alive, on the fast cadence
+    # because work was just processed.
+    assert result == probe.ACTIVE_INTERVAL
     out = capsys.readouterr().out
     assert "Error processing command" in out  # bad item was caught + logged
     assert "Pong" in out  # the good item that followed still ran
@@ -58,9 +60,13 @@ def test_bad_command_does_not_stop_draining(probe, capsys):
 def test_reload_command_dispatches_to_deep_reload(probe, monkeypatch):
     """A reload command (what a file save sends) routes to deep_reload_addon."""
     calls = []
-    monkeypatch.setattr(probe, "deep_reload_addon", lambda name: calls.append(name))
+    monkeypatch.setattr(
+        probe, "deep_reload_addon", lambda name, **kwargs: calls.append(name)
+    )
 
-    probe.execution_queue.put({"action": "reload", "module_name": "threed_bitmap"})
+    probe.enqueue_command(
+        probe.Command({"action": "reload", "module_name": "threed_bitmap"})
+    )
     probe.main_thread_loop()
 
     assert calls == ["threed_bitmap"]
@@ -69,10 +75,257 @@ def test_reload_command_dispatches_to_deep_reload(probe, monkeypatch):
 def test_reload_without_module_name_is_ignored(probe, monkeypatch):
     """A reload missing module_name should be a no-op, not a crash."""
     calls = []
-    monkeypatch.setattr(probe, "deep_reload_addon", lambda name: calls.append(name))
+    monkeypatch.setattr(
+        probe, "deep_reload_addon", lambda name, **kwargs: calls.append(name)
+    )
 
-    probe.execution_queue.put({"action": "reload"})
+    probe.enqueue_command(probe.Command({"action": "reload"}))
     result = probe.main_thread_loop()
 
     assert calls == []
-    assert result == 0.1
+    assert result == probe.ACTIVE_INTERVAL
+
+
+def test_completion_record_reports_success_and_output(probe, monkeypatch):
+    """The record sent back carries status, timing and what the command printed."""
+
+    def fake_reload(name, **kwargs):
+        print(f"reloading {name}")
+        return {"module": name, "purged": 3}
+
+    monkeypatch.setattr(probe, "deep_reload_addon", fake_reload)
+    replies = []
+
+    probe.enqueue_command(
+        probe.Command(
+            {"id": 7, "action": "reload", "module_name": "addon"}, reply=replies.append
+        )
+    )
+    probe.main_thread_loop()
+
+    (record,) = replies
+    assert record["id"] == 7
+    assert record["type"] == "result"
+    assert record["status"] == "ok"
+    assert record["result"] == {"module": "addon", "purged": 3}
+    assert "reloading addon" in record["output"]
+    assert record["duration_ms"] >= 0 and record["queued_ms"] >= 0
+
+
+def test_stream_kept_by_a_command_stops_recording_once_it_completes(probe, monkeypatch):
+    """A handler grabbing sys.stdout during a reload must not grow the old record."""
+    kept = []
+
+    def fake_reload(name, **kwargs):
+        kept.append(probe.sys.stdout)  # e.g. logging.StreamHandler() at import time
+        print("during")
+
+    monkeypatch.setattr(probe, "deep_reload_addon", fake_reload)
+    capture = probe._OutputCapture()
+    with capture:
+        probe.process_command({"action": "reload", "module_name": "addon"})
+
+    kept[0].write("after\n" * 1000)
+
+    assert "during" in capture.text
+    assert "after" not in capture.text
+
+
+def test_completion_record_reports_reload_failure(probe, tmp_path, monkeypatch):
+    """A reload whose import fails is reported as an error, with its traceback."""
+    pkg = tmp_path / "broken_addon"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("raise RuntimeError('boom at import')\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    replies = []
+
+    probe.enqueue_command(
+        probe.Command(
+            {"id": 8, "action": "reload", "module_name": "broken_addon"},
+            reply=replies.append,
+        )
+    )
+    probe.main_thread_loop()
+
+    (record,) = replies
+    assert record["status"] == "error"
+    assert "boom at import" in record["error"]
+    assert "RuntimeError" in record["traceback"]
+
+
+def test_idle_loop_backs_off_to_idle_interval(probe):
+    """With nothing queued the timer must not keep waking at the fast rate."""
+    probe._dispatch_interval = probe.ACTIVE_INTERVAL  # just left an active burst
+
+    intervals = [probe.main_thread_loop() for _ in range(10)]
+
+    assert intervals[0] < probe.IDLE_INTERVAL
+    assert intervals[-1] == probe.IDLE_INTERVAL
+    assert intervals == sorted(intervals)  # monotonic back-off, no oscillation
+
+
+def test_idle_backoff_continues_up_to_a_configured_interval(probe, monkeypatch):
+    monkeypatch.setattr(probe, "IDLE_INTERVAL", 1.0)
+    probe._dispatch_interval = probe.ACTIVE_INTERVAL
+
+    intervals = [probe.main_thread_loop() for _ in range(10)]
+
+    assert any(0.1 < interval < 1.0 for interval in intervals)  # past the old cap
+    assert intervals[-1] == 1.0
+
+
+def test_malformed_numeric_setting_falls_back_to_its_default(
+    probe, monkeypatch, capsys
+):
+    monkeypatch.setenv("BLENDER_PROBE_IDLE_INTERVAL_MS", "250ms")
+    assert probe._env_number("BLENDER_PROBE_IDLE_INTERVAL_MS", 100) == 100
+    assert "Ignoring BLENDER_PROBE_IDLE_INTERVAL_MS='250ms'" in capsys.readouterr().out
+
+    monkeypatch.setenv("BLENDER_PROBE_IDLE_INTERVAL_MS", " 250 ")
+    assert probe._env_number("BLENDER_PROBE_IDLE_INTERVAL_MS", 100) == 250
+
+
+def test_enqueue_rearms_fast_cadence(probe):
+    """Work arriving from the socket thread switches the next tick to fast mode."""
+    for _ in range(10):
+        probe.main_thread_loop()  # settle into the idle cadence
+
+    probe.enqueue_command(probe.Command({"action": "ping"}))
+
+    assert probe.main_thread_loop() == probe.ACTIVE_INTERVAL
+    assert probe.execution_queue.empty()
+
+
+def _reload(probe, module, replies, command_id, mode="full"):
+    message = {
+        "id": command_id,
+        "action": "reload",
+        "module_name": module,
+        "mode": mode,
+    }
+    probe.enqueue_command(probe.Command(message, reply=replies.append))
+
+
+def test_burst_of_reloads_runs_only_the_newest(probe, monkeypatch):
+    """Several saves in a row for one add-on must cost exactly one reload."""
+    calls = []
+    monkeypatch.setattr(
+        probe, "deep_reload_addon", lambda name, **kwargs: calls.append(name)
+    )
+    replies = []
+
+    for i in range(5):
+        _reload(probe, "addon", replies, i)
+    _reload(probe, "other_addon", replies, "x")
+    probe.main_thread_loop()
+
+    assert calls == ["addon", "other_addon"]
+    statuses = {r["id"]: r["status"] for r in replies}
+    assert statuses == {**{i: "superseded" for i in range(4)}, 4: "ok", "x": "ok"}
+    assert replies[0]["result"] == {"superseded_by": 1}
+
+
+def test_superseding_reload_keeps_the_broader_mode(probe, monkeypatch):
+    modes = []
+    monkeypatch.setattr(
+        probe, "deep_reload_addon", lambda name, mode="full": modes.append(mode)
+    )
+
+    _reload(probe, "addon", [], 1, mode="full")
+    _reload(probe, "addon", [], 2, mode="incremental")
+    probe.main_thread_loop()
+
+    assert modes == ["full"]
+
+
+def test_ping_is_not_stuck_behind_queued_reloads(probe, monkeypatch):
+    order = []
+    monkeypatch.setattr(
+        probe, "deep_reload_addon", lambda name, **kwargs: order.append(name)
+    )
+    monkeypatch.setattr(
+        probe,
+        "log",
+        lambda message: order.append("ping") if "Pong" in message else None,
+    )
+
+    _reload(probe, "a", [], 1)
+    _reload(probe, "b", [], 2)
+    probe.enqueue_command(probe.Command({"action": "ping"}))
+
+    assert probe.execution_queue.qsize() == 3
+    probe.main_thread_loop()
+    assert order == ["ping", "a", "b"]
+    assert probe.execution_queue.empty()
+
+
+def test_tick_stops_taking_work_once_budget_is_spent(probe, monkeypatch):
+    """A burst of slow commands is spread over several ticks, not one long freeze."""
+    clock = [0.0]  # a fake perf_counter, so the test does not depend on sleep accuracy
+
+    def slow_reload(name, **kwargs):
+        clock[0] += 0.015
+
+    monkeypatch.setattr(probe.time, "perf_counter", lambda: clock[0])
+    monkeypatch.setattr(probe, "TICK_BUDGET", 0.02)
+    monkeypatch.setattr(probe, "deep_reload_addon", slow_reload)
+    for name in "abcd":
+        probe.enqueue_command(probe.Command({"action": "reload", "module_name": name}))
+
+    probe.main_thread_loop()
+    assert probe.execution_queue.qsize() == 2  # two commands filled the budget
+
+    assert probe.main_thread_loop() == probe.ACTIVE_INTERVAL  # rest comes right after
+    assert probe.execution_queue.empty()
+
+
+def test_cooperative_command_runs_one_step_per_tick(probe, monkeypatch):
+    """A generator command yields to Blender between steps and reports its return value."""
+    steps = []
+
+    def stepwise(cmd):
+        for i in range(3):
+            steps.append(i)
+            yield
+        return "done"
+
+    monkeypatch.setattr(probe, "TICK_BUDGET", 0)
+    monkeypatch.setattr(probe, "process_command", stepwise)
+    replies = []
+    probe.enqueue_command(
+        probe.Command({"id": 1, "action": "long"}, reply=replies.append)
+    )
+
+    probe.main_thread_loop()  # starts the command: nothing has run yet
+    for expected in ([0], [0, 1], [0, 1, 2]):
+        probe.main_thread_loop()
+        assert steps == expected
+    assert replies == []
+
+    probe.main_thread_loop()
+    (record,) = replies
+    assert (record["status"], record["result"]) == ("ok", "done")
+    assert not probe._active_tasks
+
+
+def test_yielding_tasks_are_resumed_once_per_tick_within_the_default_budget(
+    probe, monkeypatch
+):
+    """A task that only yields must not be spun until the budget runs out."""
+    assert probe.TICK_BUDGET > 0
+    resumed = {"a": 0, "b": 0}
+
+    def forever(cmd):
+        while True:
+            resumed[cmd["action"]] += 1
+            yield
+
+    monkeypatch.setattr(probe, "process_command", forever)
+    for action in "ab":
+        probe.enqueue_command(probe.Command({"action": action}))
+    probe.main_thread_loop()  # starts both commands
+
+    for tick in range(1, 4):
+        probe.main_thread_loop()
+        assert resumed == {"a": tick, "b": tick}
+    probe._active_tasks.clear()
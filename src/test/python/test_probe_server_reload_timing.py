@@ -0,0 +1,208 @@
+"""Tests for the per-phase timing breakdown of hot reloads (``reload_timing``)."""
+
+import importlib
+import sys
+import threading
+import types
+
+import pytest
+
+from blender_probe import reload_timing
+
+ADDON = "timedaddon"
+
+_FILES = {
+    "__init__.py": (
+        "import bpy\n"
+        "from . import fast, slow\n"
+        "class Panel:\n    pass\n"
+        "def register():\n    bpy.utils.register_class(Panel)\n"
+        "def unregister():\n    pass\n"
+    ),
+    "fast.py": "X = 1\n",
+    "slow.py": "import time\ntime.sleep(0.05)\n",
+}
+
+
+@pytest.fixture
+def addon(tmp_path, monkeypatch):
+    addon_dir = tmp_path / ADDON
+    addon_dir.mkdir()
+    for name, body in _FILES.items():
+        (addon_dir / name).write_text(body)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield addon_dir
+    for key in [k for k in sys.modules if k == ADDON or k.startswith(ADDON + ".")]:
+        del sys.modules[key]
+
+
+@pytest.fixture
+def utils(probe, monkeypatch):
+    """A fake ``bpy.utils`` whose register_class records what it was given."""
+    registered = []
+    monkeypatch.setattr(
+        probe.bpy,
+        "utils",
+        types.SimpleNamespace(register_class=registered.append),
+        raising=False,
+    )
+    return registered
+
+
+def test_reload_reports_every_phase(probe, addon, utils):
+    timings = probe.deep_reload_addon(ADDON)["timings"]
+
+    assert timings["status"] == "ok"
+    assert set(timings["phases"]) == {"unregister", "purge", "import", "register"}
+    assert timings["total_ms"] >= sum(timings["phases"].values()) - 1
+
+
+def test_import_breakdown_attributes_time_to_the_slow_submodule(probe, addon, utils):
+    imports = probe.deep_reload_addon(ADDON)["timings"]["imports"]
+
+    by_module = {entry["module"]: entry for entry in imports}
+    assert set(by_module) == {ADDON, f"{ADDON}.fast", f"{ADDON}.slow"}
+    assert imports[0]["module"] == f"{ADDON}.slow"  # slowest self time first
+    assert by_module[f"{ADDON}.slow"]["self_ms"] >= 40
+    # The package's inclusive time covers its submodules, its self time does not.
+    assert by_module[ADDON]["ms"] >= 40
+    assert by_module[ADDON]["self_ms"] < by_module[ADDON]["ms"]
+
+
+def test_timing_hook_leaves_no_trace_on_modules(probe, addon, utils):
+    probe.deep_reload_addon(ADDON)
+
+    module = sys.modules[f"{ADDON}.slow"]
+    assert type(module.__loader__).__name__ != "_TimedLoader"
+    assert module.__spec__.loader is module.__loader__
+    assert not any(type(f).__name__ == "ImportTimer" for f in sys.meta_path)
+
+
+def test_module_sees_its_real_loader_while_it_executes(tmp_path, monkeypatch):
+    (tmp_path / "loadercheck.py").write_text(
+        "import importlib.machinery\n"
+        "REAL = isinstance(__loader__, importlib.machinery.SourceFileLoader)\n"
+        "SPEC = __spec__.loader is __loader__\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    timer = reload_timing.ImportTimer()
+    try:
+        with timer:
+            module = importlib.import_module("loadercheck")
+    finally:
+        sys.modules.pop("loadercheck", None)
+
+    assert module.REAL and module.SPEC
+    assert [r[0] for r in timer.records] == ["loadercheck"]
+
+
+def test_imports_on_other_threads_are_not_timed(tmp_path, monkeypatch):
+    (tmp_path / "otherthread.py").write_text("X = 1\n")
+    (tmp_path / "ownthread.py").write_text("X = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    timer = reload_timing.ImportTimer()
+    try:
+        with timer:
+            worker = threading.Thread(
+                target=importlib.import_module, args=("otherthread",)
+            )
+            worker.start()
+            worker.join()
+            importlib.import_module("ownthread")
+        other = sys.modules["otherthread"]
+    finally:
+        sys.modules.pop("otherthread", None)
+        sys.modules.pop("ownthread", None)
+
+    assert [r[0] for r in timer.records] == ["ownthread"]
+    assert type(other.__spec__.loader).__name__ != "_TimedLoader"
+
+
+def test_register_breakdown_times_each_class(probe, addon, utils):
+    timings = probe.deep_reload_addon(ADDON)["timings"]
+
+    assert [entry["class"] for entry in timings["classes"]] == [f"{ADDON}.Panel"]
+    assert [cls.__name__ for cls in utils] == ["Panel"]  # the real call still happened
+    assert probe.bpy.utils.register_class == utils.append  # and the wrapper is gone
+
+
+def test_history_keeps_failed_reloads_and_is_bounded(probe, addon, utils, monkeypatch):
+    monkeypatch.setattr(probe, "reload_history", probe.collections.deque(maxlen=2))
+    probe.deep_reload_addon(ADDON)
+    (addon / "fast.py").write_text("raise RuntimeError('broken')\n")
+    with pytest.raises(RuntimeError):
+        probe.deep_reload_addon(ADDON)
+    (addon / "fast.py").write_text(_FILES["fast.py"])
+    probe.deep_reload_addon(ADDON)
+
+    history = probe.process_command({"action": "reload_history"})
+
+    assert [entry["status"] for entry in history] == ["error", "ok"]  # oldest dropped
+    assert (
+        probe.process_command({"action": "reload_history", "limit": 1}) == history[-1:]
+    )
+
+
+@pytest.fixture
+def heavy_dependency(tmp_path, addon):
+    """A third-party module, imported by the addon, that is slow to import."""
+    (tmp_path / "heavydep.py").write_text("import time\ntime.sleep(0.03)\n")
+    (addon / "fast.py").write_text("import heavydep\nX = 1\n")
+    yield
+    sys.modules.pop("heavydep", None)
+
+
+def test_import_profile_includes_dependencies_nested_under_their_importer(
+    probe, addon, utils, heavy_dependency
+):
+    timings = probe.deep_reload_addon(ADDON)["timings"]
+    result = probe.process_command({"action": "import_profile"})
+
+    # The reload breakdown stays limited to the addon's own modules.
+    assert "heavydep" not in {entry["module"] for entry in timings["imports"]}
+    assert result.value["module"] == ADDON and result.value["source"] == "reload"
+    slowest = {entry["module"]: entry for entry in result.value["slowest"]}
+    assert slowest["heavydep"]["self_ms"] >= 25
+    assert slowest[f"{ADDON}.fast"]["ms"] >= slowest["heavydep"]["ms"]
+    lines = result.body.decode("utf-8").splitlines()
+    assert lines[0] == "import time: self [us] | cumulative | imported package"
+    names = [line.split(" | ")[-1] for line in lines[1:]]
+    depth = {name.strip(): (len(name) - len(name.lstrip())) // 2 for name in names}
+    assert depth[ADDON] == 0
+    assert depth[f"{ADDON}.fast"] == 1
+    assert depth["heavydep"] == 2
+
+
+def test_enabling_the_dev_addon_records_an_import_profile(
+    probe, addon, utils, monkeypatch
+):
+    monkeypatch.setenv("BLENDER_PROBE_ADDON_NAME", ADDON)
+    monkeypatch.setattr(
+        probe.bpy.ops.preferences,
+        "addon_enable",
+        lambda module: importlib.import_module(module),
+    )
+
+    probe.enable_dev_addon()
+
+    result = probe.process_command({"action": "import_profile", "module_name": ADDON})
+    assert result.value["source"] == "enable"
+    assert {entry["module"] for entry in result.value["slowest"]} >= {
+        ADDON,
+        f"{ADDON}.slow",
+    }
+
+
+def test_import_profile_without_a_recorded_load_is_an_error(probe):
+    with pytest.raises(ValueError, match="No import profile"):
+        probe.process_command({"action": "import_profile", "module_name": "nothing"})
+
+
+def test_format_importtime_matches_the_interpreters_layout():
+    records = [("child", 0.000250, 0.000250, 1), ("parent", 0.001, 0.00075, 0)]
+
+    assert reload_timing.format_importtime(records).splitlines() == [
+        "import time: self [us] | cumulative | imported package",
+        "import time:       250 |        250 |   child",
+        "import time:       750 |       1000 | parent",
+    ]
@@ -0,0 +1,131 @@
+"""Tests for transactional reloads: a failed reload restores the previous version."""
+
+import importlib
+import os
+import sys
+
+import pytest
+
+ADDON = "rollbackaddon"
+
+_INIT = (
+    "import bpy\n"
+    "from . import ops\n"
+    "class Panel:\n    pass\n"
+    "def register():\n"
+    "    bpy.utils.register_class(Panel)\n"
+    "    bpy.utils.register_class(ops.Operator)\n"
+    "def unregister():\n"
+    "    bpy.utils.unregister_class(ops.Operator)\n"
+    "    bpy.utils.unregister_class(Panel)\n"
+)
+
+
+def _write(path, text):
+    path.write_text(text)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+
+class FakeUtils:
+    """``bpy.utils`` that tracks registered classes and rejects duplicates."""
+
+    def __init__(self):
+        self.registered = []
+
+    def register_class(self, cls):
+        if cls in self.registered:
+            raise ValueError(f"{cls.__name__} already registered")
+        self.registered.append(cls)
+
+    def unregister_class(self, cls):
+        if cls not in self.registered:
+            raise RuntimeError(f"{cls.__name__} not registered")
+        self.registered.remove(cls)
+
+
+@pytest.fixture
+def utils(probe, monkeypatch):
+    fake = FakeUtils()
+    monkeypatch.setattr(probe.bpy, "utils", fake, raising=False)
+    return fake
+
+
+@pytest.fixture
+def addon(tmp_path, monkeypatch, probe, utils):
+    addon_dir = tmp_path / ADDON
+    addon_dir.mkdir()
+    _write(addon_dir / "__init__.py", _INIT)
+    _write(addon_dir / "ops.py", "class Operator:\n    VERSION = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    importlib.import_module(ADDON).register()
+    yield addon_dir
+    for key in [k for k in sys.modules if k == ADDON or k.startswith(ADDON + ".")]:
+        del sys.modules[key]
+
+
+def test_failed_import_restores_previous_modules(probe, addon, utils):
+    old_init, old_ops = sys.modules[ADDON], sys.modules[f"{ADDON}.ops"]
+    _write(
+        addon / "ops.py",
+        "class Operator:\n    VERSION = 2\nraise RuntimeError('typo')\n",
+    )
+
+    with pytest.raises(probe.ReloadRolledBack, match="typo"):
+        probe.deep_reload_addon(ADDON)
+
+    assert sys.modules[ADDON] is old_init
+    assert sys.modules[f"{ADDON}.ops"] is old_ops
+    assert [cls.__name__ for cls in utils.registered] == ["Panel", "Operator"]
+    assert utils.registered[1].VERSION == 1  # the old class, straight from memory
+
+
+def test_failed_register_unregisters_what_the_new_version_registered(
+    probe, addon, utils
+):
+    old_init = sys.modules[ADDON]
+    _write(
+        addon / "__init__.py",
+        _INIT.replace(
+            "bpy.utils.register_class(ops.Operator)", "raise RuntimeError('late')"
+        ),
+    )
+
+    with pytest.raises(probe.ReloadRolledBack):
+        probe.deep_reload_addon(ADDON)
+
+    assert sys.modules[ADDON] is old_init
+    # Only the old Panel/Operator are registered; the new Panel was undone.
+    assert utils.registered == [old_init.Panel, old_init.ops.Operator]
+    (report,) = probe.reload_history
+    assert report["rolled_back"] is True
+    assert "rollback" in report["phases"]
+
+
+def test_new_submodules_of_a_failed_reload_are_dropped(probe, addon, utils):
+    old_init = sys.modules[ADDON]
+    _write(addon / "extra.py", "X = 1\n")
+    _write(
+        addon / "__init__.py",
+        "from . import extra\n" + _INIT + "raise RuntimeError('x')\n",
+    )
+
+    with pytest.raises(probe.ReloadRolledBack):
+        probe.deep_reload_addon(ADDON)
+
+    assert f"{ADDON}.extra" not in sys.modules
+    assert sys.modules[ADDON] is old_init
+
+
+def test_first_load_failure_is_reported_without_rollback(
+    probe, tmp_path, monkeypatch, utils
+):
+    pkg = tmp_path / "neverloaded"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("raise RuntimeError('boom')\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    with pytest.raises(RuntimeError, match="boom") as excinfo:
+        probe.deep_reload_addon("neverloaded")
+
+    assert not isinstance(excinfo.value, probe.ReloadRolledBack)
@@ -0,0 +1,83 @@
+"""Tests for the main-thread sampling profiler (``sampler`` and its command)."""
+
+import threading
+import time
+
+from blender_probe.sampler import IDLE_FRAME, StackSampler
+
+
+def _busy_leaf(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _busy_outer(seconds):
+    _busy_leaf(seconds)
+
+
+def test_sample_records_the_target_threads_stack_root_first():
+    sampler = StackSampler(threading.get_ident())
+
+    sampler.sample()
+
+    (line,) = sampler.folded().splitlines()
+    stack, count = line.rsplit(" ", 1)
+    assert count == "1"
+    assert stack.split(";")[-1].startswith("sample (sampler.py:")
+    assert (
+        "test_sample_records_the_target_threads_stack_root_first"
+        in stack.split(";")[-2]
+    )
+
+
+def test_thread_without_python_code_counts_as_idle():
+    sampler = StackSampler(thread_id=-1)  # no such thread: nothing running
+
+    sampler.sample()
+
+    assert sampler.folded() == f"{IDLE_FRAME} 1\n"
+    assert sampler.status()["idle_samples"] == 1
+
+
+def test_background_sampling_finds_the_hot_function():
+    sampler = StackSampler(threading.get_ident())
+    sampler.start(interval=0.001)
+    try:
+        _busy_outer(0.2)
+    finally:
+        sampler.stop()
+
+    status = sampler.status()
+    assert not status["running"]
+    assert status["samples"] >= 10
+    heaviest = sampler.folded().splitlines()[0]
+    assert "_busy_outer" in heaviest and "_busy_leaf" in heaviest
+
+
+def test_reset_clears_samples():
+    sampler = StackSampler(threading.get_ident())
+    sampler.sample()
+
+    sampler.reset()
+
+    assert sampler.folded() == ""
+    assert sampler.status()["samples"] == 0
+
+
+def test_sampler_command_start_dump_stop(probe):
+    probe._sampler.thread_id = threading.get_ident()
+
+    status = probe.process_command(
+        {"action": "sampler", "op": "start", "interval_ms": 1}
+    )
+    assert status["running"] and status["interval_ms"] == 1
+    _busy_outer(0.1)
+    dump = probe.process_command({"action": "sampler", "op": "dump", "reset": True})
+    probe.process_command({"action": "sampler", "op": "stop"})
+
+    assert dump.value["samples"] > 0
+    assert "_busy_leaf" in bytes(dump.body).decode("utf-8")
+    assert (
+        probe.process_command({"action": "sampler"})["samples"] < dump.value["samples"]
+    )
@@ -0,0 +1,96 @@
+"""Tests for the server's live metrics (``metrics`` and the ``stats`` command)."""
+
+import socket
+import time
+
+import pytest
+
+from blender_probe import metrics, protocol
+
+
+def test_ring_buffer_keeps_only_the_latest_samples():
+    buffer = metrics.RingBuffer(size=4)
+    for value in range(1, 11):
+        buffer.add(value)
+
+    assert buffer.window() == [7, 8, 9, 10]
+    summary = buffer.summary()
+    assert (summary["count"], summary["window"]) == (10, 4)
+    assert (summary["min"], summary["max"], summary["last"]) == (7, 10, 10)
+    assert summary["p50"] == 8 and summary["p95"] == 10
+
+
+def test_empty_ring_buffer_summary():
+    assert metrics.RingBuffer(size=4).summary() == {"count": 0}
+
+
+def test_series_count_is_bounded(monkeypatch):
+    monkeypatch.setattr(metrics, "MAX_SERIES", 2)
+    registry = metrics.Metrics(window=4)
+    for action in ("a", "b", "c", "d"):
+        registry.observe(f"duration_ms.{action}", 1.0)
+
+    series = registry.snapshot()["series"]
+    assert sorted(series) == ["duration_ms.a", "duration_ms.b", "duration_ms.other"]
+    assert series["duration_ms.other"]["count"] == 2
+
+
+def test_commands_are_counted_and_timed(probe):
+    probe.enqueue_command(probe.Command({"action": "ping"}))
+    probe.enqueue_command(
+        probe.Command({"action": "export_array"})
+    )  # missing arguments
+    probe.main_thread_loop()
+
+    stats = probe.process_command({"action": "stats"})
+
+    assert stats["counters"] == {"commands.ok": 1, "commands.error": 1}
+    assert stats["series"]["duration_ms.ping"]["count"] == 1
+    assert stats["series"]["queued_ms.export_array"]["count"] == 1
+    assert stats["series"]["queue_depth"]["max"] == 2
+    assert stats["transport"] is None  # no socket server in this test
+
+
+def test_tick_lag_is_measured_against_the_requested_interval(probe, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(probe.time, "perf_counter", lambda: clock[0])
+    interval = probe.main_thread_loop()
+
+    clock[0] += interval + 0.030  # Blender ran the timer 30 ms late
+    probe.main_thread_loop()
+
+    assert probe.metrics.snapshot()["series"]["tick_lag_ms"]["last"] == pytest.approx(
+        30
+    )
+
+
+def test_reset_clears_after_reading(probe):
+    probe.main_thread_loop()
+
+    first = probe.process_command({"action": "stats", "reset": True})
+    second = probe.process_command({"action": "stats"})
+
+    assert "queue_depth" in first["series"]
+    assert second["series"] == {}
+
+
+def test_transport_counts_connections_and_bytes(probe, server, monkeypatch):
+    monkeypatch.setattr(probe, "_transport", server)
+    with socket.create_connection(server.address, timeout=2) as sock:
+        frame = protocol.encode_frame({"id": 1, "action": "ping"})
+        sock.sendall(frame)
+        ack = protocol.read_frame(sock)
+        assert ack["type"] == "ack"
+
+        # The I/O thread counts a send just after it; give it a moment.
+        deadline = time.monotonic() + 2
+        while (
+            server.bytes_out < len(protocol.encode_frame(ack))
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.005)
+        stats = probe.process_command({"action": "stats"})["transport"]
+
+    assert stats["connections"] == 1 and stats["accepted"] == 1
+    assert stats["bytes_in"] == len(frame)
+    assert stats["bytes_out"] == len(protocol.encode_frame(ack))
@@ -12,8 +12,12 @@ The logic lives in ``wheels.py``, which is free of any ``bpy`` dependency, so
 these tests import it directly -- no running Blender or fake ``bpy`` required.
 """
 
+import json
 import os
+import shutil
 import sys
+import threading
+import time
 import zipfile
 
 import pytest
@@ -127,7 +131,9 @@ def test_unparsable_name_defaults_to_compatible():
 
 
 def test_extract_wheel_unpacks_contents(tmp_path):
-    whl = _make_wheel(tmp_path, "pkg-1.0-py3-none-any.whl", {"pkg/__init__.py": "V = 1\n"})
+    whl = _make_wheel(
+        tmp_path, "pkg-1.0-py3-none-any.whl", {"pkg/__init__.py": "V = 1\n"}
+    )
     cache = str(tmp_path / "cache")
 
     dest = wheels_mod._extract_wheel(whl, cache)
@@ -138,7 +144,9 @@ def test_extract_wheel_unpacks_contents(tmp_path):
 
 
 def test_extract_wheel_is_cached(tmp_path, monkeypatch):
-    whl = _make_wheel(tmp_path, "pkg-1.0-py3-none-any.whl", {"pkg/__init__.py": "V = 1\n"})
+    whl = _make_wheel(
+        tmp_path, "pkg-1.0-py3-none-any.whl", {"pkg/__init__.py": "V = 1\n"}
+    )
     cache = str(tmp_path / "cache")
 
     zip_opens = {"count": 0}
@@ -175,17 +183,80 @@ def test_extract_wheel_reextracts_when_wheel_changes(tmp_path, monkeypatch):
         assert "999" in fh.read()  # stale cache was refreshed
 
 
+def test_concurrent_extractions_of_one_wheel_unpack_it_once(tmp_path, monkeypatch):
+    whl = _make_wheel(
+        tmp_path, "pkg-1.0-py3-none-any.whl", {"pkg/__init__.py": "V = 1\n"}
+    )
+    cache = str(tmp_path / "cache")
+    extractions = []
+    real_extractall = zipfile.ZipFile.extractall
+
+    def slow_extractall(self, path, *args, **kwargs):
+        extractions.append(path)
+        time.sleep(0.05)  # keep the others waiting on the lock meanwhile
+        return real_extractall(self, path, *args, **kwargs)
+
+    monkeypatch.setattr(zipfile.ZipFile, "extractall", slow_extractall)
+    start = threading.Barrier(4, timeout=5)
+    results = []
+
+    def launch():
+        start.wait()
+        results.append(wheels_mod._extract_wheel(whl, cache))
+
+    threads = [threading.Thread(target=launch) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(extractions) == 1
+    assert extractions[0] != results[0]  # unpacked beside the final dir, then renamed
+    assert results == [os.path.join(cache, "pkg-1.0-py3-none-any")] * 4
+    assert os.listdir(cache) == ["pkg-1.0-py3-none-any"]
+
+
+def test_failed_reextraction_keeps_using_the_previous_extraction(tmp_path):
+    name = "pkg-1.0-py3-none-any.whl"
+    whl = _make_wheel(tmp_path, name, {"pkg/__init__.py": "V = 1\n"})
+    cache = str(tmp_path / "cache")
+    dest = wheels_mod._extract_wheel(whl, cache)
+
+    with open(whl, "wb") as fh:
+        fh.write(b"not a zip file")
+    os.utime(whl, (os.stat(whl).st_atime + 100, os.stat(whl).st_mtime + 100))
+    resolution = wheels_mod._Resolution()
+
+    assert wheels_mod._extract_wheel(whl, cache, resolution) == dest
+    assert not resolution.complete  # tried again on the next launch
+    assert os.path.isfile(os.path.join(dest, "pkg", "__init__.py"))
+    assert os.listdir(cache) == [os.path.basename(dest)]  # no temp dir left behind
+
+
+def test_failed_first_extraction_is_not_mounted(tmp_path):
+    whl = tmp_path / "pkg-1.0-py3-none-any.whl"
+    whl.write_bytes(b"not a zip file")
+
+    assert wheels_mod._extract_wheel(str(whl), str(tmp_path / "cache")) is None
+
+
 # --- manifest parsing ---------------------------------------------------------
 
 
 def test_read_manifest_wheels_parses_declared_list(tmp_path):
     manifest = _write_manifest(tmp_path, ["./wheels/a.whl", "./wheels/b.whl"])
-    assert wheels_mod._read_manifest_wheels(manifest) == ["./wheels/a.whl", "./wheels/b.whl"]
+    assert wheels_mod._read_manifest_wheels(manifest) == [
+        "./wheels/a.whl",
+        "./wheels/b.whl",
+    ]
 
 
 def test_read_manifest_wheels_missing_file_returns_none(tmp_path):
     # None -> caller falls back to scanning the wheels/ directory.
-    assert wheels_mod._read_manifest_wheels(os.path.join(str(tmp_path), "nope.toml")) is None
+    assert (
+        wheels_mod._read_manifest_wheels(os.path.join(str(tmp_path), "nope.toml"))
+        is None
+    )
 
 
 def test_read_manifest_wheels_absent_array_returns_empty(tmp_path):
@@ -200,15 +271,41 @@ def test_read_manifest_wheels_malformed_returns_none(tmp_path, capsys):
     assert "Could not parse" in capsys.readouterr().out
 
 
+def test_mount_wheels_extracts_concurrently_but_mounts_in_listed_order(
+    tmp_path, monkeypatch, isolate_imports
+):
+    monkeypatch.setattr(wheels_mod.os, "cpu_count", lambda: 4)
+    both_running = threading.Barrier(2, timeout=5)
+
+    def fake_extract(whl, cache_root, resolution=None):
+        both_running.wait()  # fails unless the two extractions overlap
+        if whl.endswith("first.whl"):
+            time.sleep(0.05)  # the first listed wheel finishes last
+        return os.path.join(cache_root, os.path.basename(whl))
+
+    monkeypatch.setattr(wheels_mod, "_extract_wheel", fake_extract)
+
+    wheels_mod._mount_wheels(["/w/first.whl", "/w/second.whl"], str(tmp_path))
+
+    mounted = [p for p in sys.path if p.startswith(str(tmp_path))]
+    assert mounted == [str(tmp_path / "first.whl"), str(tmp_path / "second.whl")]
+
+
 # --- end to end ---------------------------------------------------------------
 
 
-def test_setup_dependencies_mounts_only_listed_wheels(tmp_path, isolate_imports, capsys):
+def test_setup_dependencies_mounts_only_listed_wheels(
+    tmp_path, isolate_imports, capsys
+):
     addon = tmp_path / "myaddon"
     wheels = addon / "wheels"
     wheels.mkdir(parents=True)
-    _make_wheel(wheels, "listed-1.0-py3-none-any.whl", {"listed_pkg/__init__.py": "V = 1\n"})
-    _make_wheel(wheels, "extra-1.0-py3-none-any.whl", {"extra_pkg/__init__.py": "V = 2\n"})
+    _make_wheel(
+        wheels, "listed-1.0-py3-none-any.whl", {"listed_pkg/__init__.py": "V = 1\n"}
+    )
+    _make_wheel(
+        wheels, "extra-1.0-py3-none-any.whl", {"extra_pkg/__init__.py": "V = 2\n"}
+    )
     _write_manifest(addon, ["./wheels/listed-1.0-py3-none-any.whl"])
 
     wheels_mod.setup_dependencies(str(tmp_path), "myaddon")
@@ -237,7 +334,9 @@ def test_setup_dependencies_applies_platform_filter_to_listed(
     addon = tmp_path / "myaddon"
     wheels = addon / "wheels"
     wheels.mkdir(parents=True)
-    _make_wheel(wheels, "purepkg-1.0-py3-none-any.whl", {"purepkg/__init__.py": "V = 1\n"})
+    _make_wheel(
+        wheels, "purepkg-1.0-py3-none-any.whl", {"purepkg/__init__.py": "V = 1\n"}
+    )
     _make_wheel(
         wheels,
         "maconly-1.0-cp311-cp311-macosx_11_0_arm64.whl",
@@ -267,7 +366,7 @@ def test_setup_dependencies_warns_on_missing_listed_wheel(tmp_path, capsys):
     wheels_mod.setup_dependencies(str(tmp_path), "myaddon")  # must not raise
 
     assert "missing on disk" in capsys.readouterr().out
-    assert not (tmp_path / ".blender_probe").exists()
+    assert not (tmp_path / ".blender_probe" / "wheels").exists()
 
 
 def test_setup_dependencies_without_manifest_falls_back_to_glob(
@@ -279,7 +378,11 @@ def test_setup_dependencies_without_manifest_falls_back_to_glob(
     # No manifest at all -> scan wheels/ so development isn't blocked.
     wheels = tmp_path / "myaddon" / "wheels"
     wheels.mkdir(parents=True)
-    _make_wheel(wheels, "fallbackpkg-1.0-py3-none-any.whl", {"fallbackpkg/__init__.py": "V = 7\n"})
+    _make_wheel(
+        wheels,
+        "fallbackpkg-1.0-py3-none-any.whl",
+        {"fallbackpkg/__init__.py": "V = 7\n"},
+    )
     _make_wheel(
         wheels,
         "wrongplat-1.0-cp311-cp311-macosx_11_0_arm64.whl",
@@ -293,7 +396,9 @@ def test_setup_dependencies_without_manifest_falls_back_to_glob(
     assert fallbackpkg.V == 7
     assert "falling back to scanning" in capsys.readouterr().out
     extracted = [p.name for p in (tmp_path / ".blender_probe" / "wheels").iterdir()]
-    assert not any(n.startswith("wrongplat") for n in extracted)  # still platform-filtered
+    assert not any(
+        n.startswith("wrongplat") for n in extracted
+    )  # still platform-filtered
 
 
 def test_setup_dependencies_parse_error_falls_back_to_glob(
@@ -302,7 +407,9 @@ def test_setup_dependencies_parse_error_falls_back_to_glob(
     addon = tmp_path / "myaddon"
     wheels = addon / "wheels"
     wheels.mkdir(parents=True)
-    _make_wheel(wheels, "brokenmani-1.0-py3-none-any.whl", {"brokenmani/__init__.py": "V = 3\n"})
+    _make_wheel(
+        wheels, "brokenmani-1.0-py3-none-any.whl", {"brokenmani/__init__.py": "V = 3\n"}
+    )
     _write_manifest(addon, None, raw="wheels = [ this is broken\n")
 
     wheels_mod.setup_dependencies(str(tmp_path), "myaddon")
@@ -319,3 +426,355 @@ def test_setup_dependencies_noop_without_args():
     # Missing project root / addon name must not raise.
     wheels_mod.setup_dependencies("", "")
     wheels_mod.setup_dependencies(None, None)
+
+
+# --- resolution index ---------------------------------------------------------
+
+
+def _resolution_project(tmp_path):
+    addon = tmp_path / "myaddon"
+    wheels = addon / "wheels"
+    wheels.mkdir(parents=True)
+    _make_wheel(wheels, "first-1.0-py3-none-any.whl", {"first/__init__.py": "V = 1\n"})
+    _make_wheel(
+        wheels, "second-1.0-py3-none-any.whl", {"second/__init__.py": "V = 2\n"}
+    )
+    _make_wheel(wheels, "extra-1.0-py3-none-any.whl", {"extra/__init__.py": "V = 3\n"})
+    _write_manifest(
+        addon,
+        [
+            "./wheels/first-1.0-py3-none-any.whl",
+            "./wheels/second-1.0-py3-none-any.whl",
+            "./wheels/ghost-1.0-py3-none-any.whl",
+        ],
+    )
+    return addon
+
+
+def _mounted(tmp_path):
+    return [p for p in sys.path if p.startswith(str(tmp_path))]
+
+
+def test_unchanged_project_reuses_the_saved_resolution(
+    tmp_path, monkeypatch, isolate_imports, capsys
+):
+    _resolution_project(tmp_path)
+    wheels_mod.setup_dependencies(str(tmp_path), "myaddon")
+    first_paths = _mounted(tmp_path)
+    first_out = capsys.readouterr().out
+    sys.path[:] = [p for p in sys.path if p not in first_paths]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("resolved again although nothing changed")
+
+    for name in ("_read_manifest_wheels", "_extract_wheel", "_warn_unlisted_wheels"):
+        monkeypatch.setattr(wheels_mod, name, fail)
+    wheels_mod.setup_dependencies(str(tmp_path), "myaddon")
+
+    assert _mounted(tmp_path) == first_paths
+    assert [os.path.basename(p) for p in first_paths] == [
+        "first-1.0-py3-none-any",
+        "second-1.0-py3-none-any",
+    ]
+    out = capsys.readouterr().out
+    for message in (
+        "missing on disk: ./wheels/ghost",
+        "not listed in manifest",
+        "Mounted 2",
+    ):
+        assert message in first_out and message in out
+
+
+def test_touched_but_identical_manifest_keeps_the_resolution(
+    tmp_path, monkeypatch, isolate_imports
+):
+    addon = _resolution_project(tmp_path)
+    wheels_mod.setup_dependencies(str(tmp_path), "myaddon")
+    manifest = addon / "blender_manifest.toml"
+    manifest.write_text(manifest.read_text())
+    os.utime(manifest, (time.time() + 5, time.time() + 5))
+
+    monkeypatch.setattr(
+        wheels_mod, "_read_manifest_wheels", lambda *a: pytest.fail("re-parsed")
+    )
+    wheels_mod.setup_dependencies(str(tmp_path), "myaddon")
+
+    index = json.loads((tmp_path / ".blender_probe" / "resolution.json").read_text())
+    assert index["inputs"][str(manifest)] == wheels_mod._stat_signature(str(manifest))
+
+
+@pytest.mark.parametrize(
+    "change", ["manifest", "new wheel", "extraction deleted", "wheel rebuilt"]
+)
+def test_any_changed_input_resolves_again(tmp_path, isolate_imports, capsys, change):
+    addon = _resolution_project(tmp_path)
+    wheels_mod.setup_dependencies(str(tmp_path), "myaddon")
+    capsys.readouterr()
+    later = time.time() + 5
+    if change == "manifest":
+        _write_manifest(addon, ["./wheels/first-1.0-py3-none-any.whl"])
+    elif change == "new wheel":
+        _make_wheel(
+            addon / "wheels", "late-1.0-py3-none-any.whl", {"late/__init__.py": ""}
+        )
+        os.utime(addon / "wheels", (later, later))
+    elif change == "extraction deleted":
+        shutil.rmtree(
+            tmp_path / ".blender_probe" / "wheels" / "second-1.0-py3-none-any"
+        )
+    else:
+        whl = addon / "wheels" / "second-1.0-py3-none-any.whl"
+        _make_wheel(addon / "wheels", whl.name, {"second/__init__.py": "V = 22\n"})
+        os.utime(whl, (later, later))
+
+    wheels_mod.setup_dependencies(str(tmp_path), "myaddon")
+
+    out = capsys.readouterr().out
+    expected = {
+        "manifest": "Using cached wheel: first",
+        "new wheel": "late-1.0-py3-none-any.whl",
+        "extraction deleted": "Extracted wheel: second",
+        "wheel rebuilt": "Extracted wheel: second",
+    }[change]
+    assert expected in out
+
+
+def test_resolution_with_a_failed_extraction_is_not_saved(
+    tmp_path, monkeypatch, isolate_imports
+):
+    _resolution_project(tmp_path)
+    monkeypatch.setattr(wheels_mod, "_extract_wheel", lambda whl, *args: None)
+
+    wheels_mod.setup_dependencies(str(tmp_path), "myaddon")
+
+    assert not (tmp_path / ".blender_probe" / "resolution.json").exists()
+
+
+# --- shared cache -------------------------------------------------------------
+
+
+def _project(root, name, wheels, content=None):
+    """A project whose addon's manifest lists ``wheels`` (created with the given content)."""
+    addon = root / name / "myaddon"
+    (addon / "wheels").mkdir(parents=True)
+    for whl in wheels:
+        pkg = whl.split("-")[0]
+        _make_wheel(
+            addon / "wheels",
+            whl,
+            {f"{pkg}/__init__.py": content or f"NAME = {whl!r}\n"},
+        )
+    _write_manifest(addon, [f"./wheels/{w}" for w in wheels])
+    return root / name
+
+
+@pytest.fixture
+def shared_cache(tmp_path, monkeypatch):
+    root = tmp_path / "shared"
+    monkeypatch.setenv("BLENDER_PROBE_WHEEL_CACHE", str(root))
+    return root
+
+
+def _entries(shared_root):
+    entries = shared_root / "entries"
+    return sorted(p.name for p in entries.iterdir()) if entries.exists() else []
+
+
+def test_identical_wheels_are_extracted_once_across_projects(
+    tmp_path, shared_cache, isolate_imports
+):
+    a = _project(tmp_path, "a", ["dep-1.0-py3-none-any.whl"], content="V = 1\n")
+    b = _project(tmp_path, "b", ["dep-1.0-py3-none-any.whl"], content="V = 1\n")
+
+    wheels_mod.setup_dependencies(str(a), "myaddon")
+    wheels_mod.setup_dependencies(str(b), "myaddon")
+
+    (digest,) = _entries(shared_cache)
+    assert (
+        len(list((shared_cache / "entries" / digest / ".blender_probe_refs").iterdir()))
+        == 2
+    )
+    assert not (
+        a / ".blender_probe" / "wheels"
+    ).exists()  # nothing extracted per project
+    import dep
+
+    assert dep.V == 1
+
+
+def _markers_by_wheel(shared_root):
+    markers = {}
+    for digest in _entries(shared_root):
+        marker = shared_root / "entries" / digest / ".blender_probe_entry"
+        markers[json.loads(marker.read_text())["wheel"]] = marker
+    return markers
+
+
+def _last_used(marker, minutes_ago):
+    used = time.time() - wheels_mod._RECENT_ENTRY_GRACE - minutes_ago * 60
+    os.utime(marker, (used, used))
+
+
+def _age_entries(shared_root):
+    """Make every entry old enough to be evicted."""
+    for marker in _markers_by_wheel(shared_root).values():
+        _last_used(marker, 1)
+
+
+def test_dependency_bump_keeps_the_old_version_until_over_budget(
+    tmp_path, shared_cache, monkeypatch, isolate_imports
+):
+    project = _project(tmp_path, "p", ["dep-1.0-py3-none-any.whl"])
+    wheels_mod.setup_dependencies(str(project), "myaddon")
+    (old,) = _entries(shared_cache)
+
+    addon = project / "myaddon"
+    _make_wheel(
+        addon / "wheels", "dep-2.0-py3-none-any.whl", {"dep/__init__.py": "V = 2\n"}
+    )
+    _write_manifest(addon, ["./wheels/dep-2.0-py3-none-any.whl"])
+    wheels_mod.setup_dependencies(str(project), "myaddon")
+    assert old in _entries(shared_cache)  # within budget: kept for reuse
+
+    monkeypatch.setenv("BLENDER_PROBE_WHEEL_CACHE_MB", "0")
+    _age_entries(shared_cache)
+    (project / ".blender_probe" / "resolution.json").unlink()
+    wheels_mod.setup_dependencies(str(project), "myaddon")
+
+    (new,) = _entries(shared_cache)
+    assert new != old
+
+
+def test_entry_survives_while_another_live_project_uses_it(
+    tmp_path, shared_cache, monkeypatch, isolate_imports
+):
+    monkeypatch.setenv("BLENDER_PROBE_WHEEL_CACHE_MB", "0")
+    user = _project(tmp_path, "user", ["dep-1.0-py3-none-any.whl"], content="V = 1\n")
+    other = _project(tmp_path, "other", ["dep-1.0-py3-none-any.whl"], content="V = 1\n")
+    wheels_mod.setup_dependencies(str(user), "myaddon")
+    wheels_mod.setup_dependencies(str(other), "myaddon")
+    shared = _entries(shared_cache)
+    _age_entries(shared_cache)
+
+    _write_manifest(other / "myaddon", [])  # `other` drops the dependency
+    wheels_mod.setup_dependencies(str(other), "myaddon")
+    assert _entries(shared_cache) == shared
+
+    shutil.rmtree(user)  # the checkout still using it is deleted
+    wheels_mod.setup_dependencies(str(other), "myaddon")
+    assert _entries(shared_cache) == shared  # a warm launch does not collect
+
+    (other / ".blender_probe" / "resolution.json").unlink()
+    wheels_mod.setup_dependencies(str(other), "myaddon")  # resolves again
+    assert _entries(shared_cache) == []
+
+
+def test_entry_extracted_by_a_launch_in_progress_is_not_collected(
+    tmp_path, shared_cache, monkeypatch, isolate_imports
+):
+    monkeypatch.setenv("BLENDER_PROBE_WHEEL_CACHE_MB", "0")
+    a = _project(tmp_path, "a", ["adep-1.0-py3-none-any.whl"])
+    b = _project(tmp_path, "b", ["bdep-1.0-py3-none-any.whl"])
+    # `a` has extracted its wheel but not finished launching yet.
+    cache = wheels_mod.SharedWheelCache(str(shared_cache), budget_bytes=0)
+    whl = a / "myaddon" / "wheels" / "adep-1.0-py3-none-any.whl"
+    dest = cache.extract(str(whl), str(a))
+    _age_entries(shared_cache)
+
+    wheels_mod.setup_dependencies(str(b), "myaddon")
+
+    assert os.path.isdir(dest)
+    cache.finish(str(a), [dest])
+    assert set(_markers_by_wheel(shared_cache)) == {
+        "adep-1.0-py3-none-any.whl",
+        "bdep-1.0-py3-none-any.whl",
+    }
+
+
+def test_recently_used_entries_are_not_evicted(
+    tmp_path, shared_cache, monkeypatch, isolate_imports
+):
+    monkeypatch.setenv("BLENDER_PROBE_WHEEL_CACHE_MB", "0")
+    a = _project(tmp_path, "a", ["adep-1.0-py3-none-any.whl"])
+    b = _project(tmp_path, "b", ["bdep-1.0-py3-none-any.whl"])
+    cache = wheels_mod.SharedWheelCache(str(shared_cache), budget_bytes=0)
+    cache.extract(str(a / "myaddon" / "wheels" / "adep-1.0-py3-none-any.whl"))
+
+    wheels_mod.setup_dependencies(str(b), "myaddon")
+
+    assert "adep-1.0-py3-none-any.whl" in _markers_by_wheel(shared_cache)
+
+
+def test_unused_entries_are_evicted_least_recently_used_first(
+    tmp_path, shared_cache, monkeypatch, isolate_imports
+):
+    a, b, c = (_project(tmp_path, n, [f"{n}dep-1.0-py3-none-any.whl"]) for n in "abc")
+    wheels_mod.setup_dependencies(str(a), "myaddon")
+    wheels_mod.setup_dependencies(str(b), "myaddon")
+    shutil.rmtree(a)
+    shutil.rmtree(b)  # neither entry is referenced any more
+    markers = _markers_by_wheel(shared_cache)
+    _last_used(markers["adep-1.0-py3-none-any.whl"], 1)
+    _last_used(markers["bdep-1.0-py3-none-any.whl"], 2)
+    size = json.loads(markers["bdep-1.0-py3-none-any.whl"].read_text())["bytes"]
+    monkeypatch.setenv("BLENDER_PROBE_WHEEL_CACHE_MB", str(2.5 * size / (1024 * 1024)))
+
+    wheels_mod.setup_dependencies(str(c), "myaddon")
+
+    assert set(_markers_by_wheel(shared_cache)) == {
+        "adep-1.0-py3-none-any.whl",
+        "cdep-1.0-py3-none-any.whl",
+    }
+
+
+def test_entries_in_use_are_kept_over_budget_and_reported(
+    tmp_path, shared_cache, monkeypatch, isolate_imports, capsys
+):
+    a, b, c = (_project(tmp_path, n, [f"{n}dep-1.0-py3-none-any.whl"]) for n in "abc")
+    wheels_mod.setup_dependencies(str(a), "myaddon")
+    wheels_mod.setup_dependencies(str(b), "myaddon")
+    markers = _markers_by_wheel(shared_cache)
+    _age_entries(shared_cache)
+    size = json.loads(markers["bdep-1.0-py3-none-any.whl"].read_text())["bytes"]
+    # Room for two entries, but another Blender may have any of the three on
+    # sys.path, so none of them can go.
+    monkeypatch.setenv("BLENDER_PROBE_WHEEL_CACHE_MB", str(2.5 * size / (1024 * 1024)))
+    capsys.readouterr()
+
+    wheels_mod.setup_dependencies(str(c), "myaddon")
+
+    assert set(_markers_by_wheel(shared_cache)) == {
+        "adep-1.0-py3-none-any.whl",
+        "bdep-1.0-py3-none-any.whl",
+        "cdep-1.0-py3-none-any.whl",
+    }
+    assert "over its" in capsys.readouterr().out
+
+
+def test_unchanged_wheels_are_not_hashed_again(
+    tmp_path, shared_cache, monkeypatch, isolate_imports
+):
+    project = _project(tmp_path, "p", ["dep-1.0-py3-none-any.whl"])
+    wheels_mod.setup_dependencies(str(project), "myaddon")
+
+    def fail(*args):
+        raise AssertionError("re-hashed an unchanged wheel")
+
+    monkeypatch.setattr(wheels_mod.hashlib, "file_digest", fail)
+    wheels_mod.setup_dependencies(str(project), "myaddon")
+
+
+def test_gc_skips_locked_entries_and_removes_only_stale_temp_dirs(tmp_path):
+    cache = wheels_mod.SharedWheelCache(str(tmp_path / "shared"), budget_bytes=0)
+    entries = tmp_path / "shared" / "entries"
+    (entries / "aaaa").mkdir(parents=True)  # unreferenced, without a marker
+    (entries / "bbbb.tmp-1-2").mkdir()
+    (entries / "cccc.tmp-3-4").mkdir()
+    old = time.time() - wheels_mod._PARTIAL_ENTRY_GRACE - 10
+    os.utime(entries / "bbbb.tmp-1-2", (old, old))
+
+    with wheels_mod._file_lock(wheels_mod._lock_path(str(entries / "aaaa"))):
+        assert cache.collect_garbage() == []
+    assert sorted(p.name for p in entries.iterdir()) == ["aaaa", "cccc.tmp-3-4"]
+
+    assert cache.collect_garbage() == ["aaaa"]